@@ -65,7 +65,11 @@ if "developer_utils" not in globals():
 import importlib
 from .setup import developer_utils
 importlib.reload(developer_utils)
-modules = developer_utils.setup_addon_modules(__path__, __name__, "bpy" in locals())
+# Submodules need Blender. Outside of it, e.g. under the tests, they are imported on demand
+if "bpy" in locals():
+    modules = developer_utils.setup_addon_modules(__path__, __name__, "bpy" in locals())
+else:
+    modules = []
 
 # ---------------------------------------------------------------------------------------#
 # -------------------------------------------------------------------------- FUNCTIONS --#
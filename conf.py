@@ -24,7 +24,11 @@
 # ---------------------------------------------------------------------------------------#
 # ---------------------------------------------------------------------------- IMPORTS --#
 import os
-import bpy
+# Check for Blender
+try:
+    import bpy
+except ImportError:
+    pass
 from .utils.io import IO
 
 # ---------------------------------------------------------------------------------------#
@@ -60,6 +64,58 @@ server_threads = []
 # if set to true, will be used to cancel existing/future threads from starting
 threading_halt = False
 
+# -------------------------------------
+# MaterialX import plan cache
+
+# directory of the cached import plans, empty uses the Blender user data directory
+import_cache_dir = ""
+# evict the least recently used plans once the cache grows beyond this many bytes
+import_cache_size = 64 * 1024 * 1024
+
+# -------------------------------------
+# MaterialX Standard Library loading
+
+# warn when parsing the Standard Library takes longer than this many seconds
+std_lib_load_budget = 0.25
+
+# -------------------------------------
+# MaterialX import planning
+
+# threads that plan the materials of an import
+import_plan_workers = 4
+
+# -------------------------------------
+# MaterialX texture prefetch
+
+# threads that stat and probe the textures of an import
+texture_prefetch_workers = 8
+
+# -------------------------------------
+# MaterialX document cache
+
+# parsed documents kept in memory
+document_cache_entries = 8
+# summed .mtlx file size of the parsed documents kept in memory
+document_cache_bytes = 256 * 1024 * 1024
+
+# -------------------------------------
+# Socket registries
+
+# alternate ids and color overrides kept per registry before the entries of removed
+# nodes are pruned
+socket_registry_size = 4096
+
+# -------------------------------------
+# Logging, see utils/io.py
+
+# level of the add-on's output: 'DEBUG', 'INFO', 'WARNING' or 'ERROR'
+log_level = 'INFO'
+# levels of single subsystems, i.e. {'read': 'DEBUG'} to only debug imports.
+# Subsystems: 'read', 'write' and 'extension', the node classes of an export
+log_levels = {}
+# also log to this file, i.e. for render farm runs. Empty disables the file log
+log_file = ""
+
 # -------------------------------------
 # Custom icon usage
 
@@ -102,6 +158,7 @@ def load_icons():
 # REGISTRATION
 # -----------------------------------------------------------------------------
 def register():
+    IO.configure()
     # load_icons()
     # bpy.utils.register_module(__name__)
     # For preview icons
@@ -116,6 +173,7 @@ def register():
         load_icons()
 
 def unregister():
+    IO.close()
     # bpy.utils.unregister_module(__name__)
     # de-reg/load the pcoll
     # global use_icons, preview_collections
@@ -37,6 +37,11 @@ import random
 import bpy
 from bpy.props import *
 from ..properties.dynamic_property import node_parameter
+from .base_socket import get_socket_mtlx_type, purge_socket_registries
+
+# bl_idname -> MaterialX type of the Node.mtlx_type getter, see get_node_type_rule()
+node_type_table = {}
+shader_node_categories = False # the built-in '_NEW_' shader node categories exist
 
 # ---------------------------------------------------------------------------------------#
 # -------------------------------------------------------------------------- FUNCTIONS --#
@@ -80,36 +85,58 @@ def get_sockets(node):
     """Returns a joined list of input and output sockets for the passed in node"""
     return list(node.inputs) + list(node.outputs)
 
+def get_node_type_rule(bl_idname):
+    """
+    MaterialX type of every node of a bl_idname.
+    None means the type of the node's first output socket, or 'shader' without outputs
+    """
+    if shader_node_categories:
+        # Environment textures keep the type of their first output, as they always have
+        if 'Image' in bl_idname:
+            return 'image'
+        elif 'Bsdf' in bl_idname:
+            return repr(('shader', bl_idname))
+        elif bl_idname == 'ShaderNodeAddShader' \
+                or bl_idname == 'ShaderNodeMixShader':
+            return repr(('shader', bl_idname))
+        return None
+    else:
+        if 'Renderman' in bl_idname:
+            return 'shader'
+        return None
+
+def refresh_node_type_table():
+    """
+    Rebuild node_type_table. Called at registration and whenever this add-on registers
+    or unregisters node categories. Every node type listed in a shader node category is
+    resolved up front, other node types on their first read.
+    """
+    global shader_node_categories
+    node_type_table.clear()
+    items = list(MaterialXNode.iter_node_bpy_types())
+    shader_node_categories = bool(items)
+    for item in items:
+        bl_idname = getattr(item, 'nodetype', None)
+        if bl_idname:
+            node_type_table[bl_idname] = get_node_type_rule(bl_idname)
+
 def set_materialx_node_type(self):
     """
     Set MaterialX Type for a node.
     :param self: a blender node
     :return: MaterialX type
     """
-    for item in MaterialXNode.iter_node_bpy_types():
-        # ''''''
-        if ('Image' or 'Environment') in self.bl_idname:
-            mtlx_type = 'image'
-        elif 'Bsdf' in self.bl_idname:
-            mtlx_type = repr(('shader', self.bl_idname))
-        elif self.bl_idname == 'ShaderNodeAddShader' \
-                or self.bl_idname == 'ShaderNodeMixShader':
-            mtlx_type = repr(('shader', self.bl_idname))
+    bl_idname = self.bl_idname
+    try:
+        mtlx_type = node_type_table[bl_idname]
+    except KeyError:
+        mtlx_type = node_type_table[bl_idname] = get_node_type_rule(bl_idname)
+    if mtlx_type is None:
+        if len(self.outputs) > 0:
+            mtlx_type = get_socket_mtlx_type(self.outputs[0])
         else:
-            if len(self.outputs) > 0:
-                mtlx_type = self.outputs[0].mtlx_type
-            else:
-                mtlx_type = 'shader'
-        return mtlx_type
-    else:
-        if 'Renderman' in self.bl_idname:
             mtlx_type = 'shader'
-        elif 'Pxr' in self.bl_idname:
-            if len(self.outputs) > 0:
-                mtlx_type = self.outputs[0].mtlx_type
-            else:
-                mtlx_type = self.outputs[0].mtlx_type
-        return mtlx_type
+    return mtlx_type
 
 # ---------------------------------------------------------------------------------------#
 # ---------------------------------------------------------------------------- CLASSES --#
@@ -533,6 +560,7 @@ class CustomCyclesNode(CustomBlenderNodeGroup):
 
     def free(self):
         if self.node_tree.users == 1:
+            purge_socket_registries(self.node_tree)
             bpy.data.node_groups.remove(self.node_tree, do_unlink=True)
 
 
@@ -609,11 +637,13 @@ def register():
     bpy.types.Node.get_node_tree = get_node_tree
     bpy.types.Node.get_sockets = get_sockets
     bpy.types.Node.mtlx_type = StringProperty(get=set_materialx_node_type)
+    refresh_node_type_table()
 
 
 def unregister():
     """Blender's unregister function. Removes methods and classes from Blender"""
     del bpy.types.Node.mtlx_type
+    node_type_table.clear()
     del bpy.types.Node.get_sockets
     del bpy.types.Node.get_node_tree
     del bpy.types.Node.is_output_node
@@ -35,10 +35,11 @@
 # ---------------------------------------------------------------------------- IMPORTS --#
 import bpy
 from bpy.props import *
-from collections import defaultdict
+from bpy.app.handlers import persistent
+from ... import conf
+from ...utils.io import IO
 from ...utils.enum_items import enumItemsFromList
-socket_color_override = dict()
-alt_socket_ids = defaultdict(list)
+tree_link_index = dict() # node_tree.as_pointer() -> SocketLinkIndex
 
 # ---------------------------------------------------------------------------------------#
 # -------------------------------------------------------------------------- FUNCTIONS --#
@@ -58,11 +59,205 @@ def get_socket_index(socket, node = None):
         return list(node.outputs).index(socket)
     return list(node.inputs).index(socket)
 
+def get_topology_key(node_tree):
+    """
+    Changes whenever nodes or links are added to or removed from the node tree. Two
+    len() calls, so it is cheap enough to check on every query. Renames and relinks
+    keep the counts, those drop the index through invalidate_link_index().
+    """
+    return len(node_tree.nodes), len(node_tree.links)
+
+def get_link_index(node_tree):
+    """Returns the SocketLinkIndex of a node tree, rebuilt if its topology changed"""
+    key = node_tree.as_pointer()
+    index = tree_link_index.get(key)
+    topology = get_topology_key(node_tree)
+    if index is None or index.topology != topology:
+        index = tree_link_index[key] = SocketLinkIndex(node_tree, topology)
+    return index
+
+def invalidate_link_index(node_tree=None):
+    """
+    Drop the SocketLinkIndex of a node tree, or of every node tree if None.
+    Called after links are changed from Python, and for every node tree edited in the
+    node editor, see invalidate_updated_trees().
+    """
+    if node_tree is None:
+        tree_link_index.clear()
+    else:
+        tree_link_index.pop(node_tree.as_pointer(), None)
+
 def is_mtlx_node_socket(socket):
     """Returns declared variable as True or False, and sets to False by default"""
     return getattr(socket, "_is_mtlx_node_socket", False)
+
+def purge_socket_registries(node_tree=None):
+    """
+    Drop the registry entries of a node tree's sockets, or of every socket if None
+    :return: number of dropped entries
+    """
+    if node_tree is None:
+        count = len(alt_socket_ids) + len(socket_color_override)
+        alt_socket_ids.clear()
+        socket_color_override.clear()
+        return count
+    return (alt_socket_ids.purge_tree(node_tree.name) +
+            socket_color_override.purge_tree(node_tree.name))
+
+def get_socket_registry_size():
+    """Returns the entries and pruned entries of the socket registries, for monitoring"""
+    return {'alt_socket_ids': len(alt_socket_ids),
+            'socket_color_override': len(socket_color_override),
+            'pruned': alt_socket_ids.pruned + socket_color_override.pruned,
+            'max_size': conf.socket_registry_size}
+
+def iter_node_trees():
+    """Yields every node tree of the .blend, node groups and embedded node trees"""
+    yield from bpy.data.node_groups
+    for datablocks in (bpy.data.materials, bpy.data.worlds, bpy.data.lamps):
+        for datablock in datablocks:
+            node_tree = getattr(datablock, 'node_tree', None)
+            if node_tree is not None:
+                yield node_tree
+
+def get_live_node_ids():
+    """Returns the (node tree name, node name) of every node, see to_socket_id()"""
+    return {(node_tree.name, node.name)
+            for node_tree in iter_node_trees() for node in node_tree.nodes}
+
+@persistent
+def clear_socket_registries(dummy):
+    """Every node tree is freed when a .blend is loaded"""
+    purge_socket_registries()
+    invalidate_link_index()
+
+@persistent
+def invalidate_updated_trees(scene):
+    """
+    Drop the SocketLinkIndex of every node tree updated since the last scene update.
+    Blender 2.79 has no topology version, and renames or links dragged in the node
+    editor never go through link_with() or remove_links().
+    """
+    if not tree_link_index:
+        return
+    data = bpy.data
+    if not (data.node_groups.is_updated or data.materials.is_updated or
+            data.worlds.is_updated or data.lamps.is_updated):
+        return
+    for node_group in data.node_groups:
+        if node_group.is_updated:
+            invalidate_link_index(node_group)
+    for datablocks in (data.materials, data.worlds, data.lamps):
+        for datablock in datablocks:
+            node_tree = getattr(datablock, 'node_tree', None)
+            if node_tree is not None and (datablock.is_updated or node_tree.is_updated):
+                invalidate_link_index(node_tree)
 # ---------------------------------------------------------------------------------------#
 # ---------------------------------------------------------------------------- CLASSES --#
+class SocketRegistry(object):
+    """
+    Mapping of stable socket IDs, see to_socket_id(), to per-socket data.
+    RNA wrappers cannot be weakly referenced, so entries are dropped with their node
+    tree, see purge_tree(). Once the registry grows beyond conf.socket_registry_size,
+    the entries of nodes that no longer exist are pruned. Entries of live sockets are
+    never dropped, so a large node tree may keep the registry above that size.
+    """
+    __slots__ = ('entries', 'default', 'limit', 'pruned')
+
+    def __init__(self, default=None):
+        self.entries = dict()
+        self.default = default # factory of the value of unknown sockets
+        self.limit = None # size that triggers the next prune, see prune()
+        self.pruned = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, socket_id):
+        return socket_id in self.entries
+
+    def get(self, socket_id):
+        """
+        Returns the value of a socket, a new default value for unknown sockets.
+        Reads never add entries, only set() does.
+        """
+        try:
+            return self.entries[socket_id]
+        except KeyError:
+            return None if self.default is None else self.default()
+
+    def set(self, socket_id, value):
+        self.entries[socket_id] = value
+        if len(self.entries) > (self.limit or conf.socket_registry_size):
+            self.prune()
+
+    def prune(self, live_node_ids=None):
+        """
+        Drop the entries of sockets whose node no longer exists
+        :return: number of dropped entries
+        """
+        if live_node_ids is None:
+            live_node_ids = get_live_node_ids()
+        stale = [key for key in self.entries if key[0] not in live_node_ids]
+        for key in stale:
+            del self.entries[key]
+        self.pruned += len(stale)
+        # Prune again once the live entries have doubled, not on every new socket
+        self.limit = max(conf.socket_registry_size, 2 * len(self.entries))
+        if len(self.entries) > conf.socket_registry_size:
+            IO.warning("%d live sockets in a socket registry, above the "
+                       "socket_registry_size of %d", len(self.entries),
+                       conf.socket_registry_size)
+        return len(stale)
+
+    def discard(self, socket_id):
+        self.entries.pop(socket_id, None)
+
+    def purge_tree(self, tree_name):
+        """Drop the entries of every socket of a node tree"""
+        stale = [key for key in self.entries if key[0][0] == tree_name]
+        for key in stale:
+            del self.entries[key]
+        return len(stale)
+
+    def clear(self):
+        self.entries.clear()
+        self.limit = None
+
+
+class SocketLinkIndex(object):
+    """
+    Position and linked sockets of every socket in a node tree, keyed by to_socket_id().
+    Built in one pass over the tree's nodes and links.
+    """
+    __slots__ = ('topology', 'positions', 'links')
+
+    def __init__(self, node_tree, topology=None):
+        tree_name = node_tree.name
+        self.topology = get_topology_key(node_tree) if topology is None else topology
+        self.positions = {} # socket id -> index in node.inputs or node.outputs
+        self.links = {} # socket id -> [(node name, socket identifier, socket index)]
+        for node in node_tree.nodes:
+            node_id = (tree_name, node.name)
+            for idx, socket in enumerate(node.inputs):
+                self.positions[(node_id, False, socket.identifier)] = idx
+            for idx, socket in enumerate(node.outputs):
+                self.positions[(node_id, True, socket.identifier)] = idx
+        for link in node_tree.links:
+            from_node, from_socket = link.from_node.name, link.from_socket.identifier
+            to_node, to_socket = link.to_node.name, link.to_socket.identifier
+            from_id = ((tree_name, from_node), True, from_socket)
+            to_id = ((tree_name, to_node), False, to_socket)
+            self.links.setdefault(from_id, []).append(
+                (to_node, to_socket, self.positions[to_id]))
+            self.links.setdefault(to_id, []).append(
+                (from_node, from_socket, self.positions[from_id]))
+
+    def get_links(self, socket_id):
+        """Returns [(node name, socket identifier, socket index)] linked to a socket"""
+        return self.links.get(socket_id, [])
+
+
 class MaterialXSocket(object):
     """Base MaterialXSocket Class. All other sockets Subclass this."""
 
@@ -150,9 +345,11 @@ class MaterialXSocket(object):
     def link_with(self, socket):
         """Link to another socket."""
         if self.is_output_socket:
-            return self.node_tree.links.new(socket, self)
+            link = self.node_tree.links.new(socket, self)
         else:
-            return self.node_tree.links.new(self, socket)
+            link = self.node_tree.links.new(self, socket)
+        invalidate_link_index(self.node_tree)
+        return link
 
 
     def remove(self):
@@ -169,6 +366,7 @@ class MaterialXSocket(object):
             for link in self.links:
                 tree.links.remove(link)
                 removed_link = True
+            invalidate_link_index(tree)
         return removed_link
 
     # def is_linked_to_type(self, data_type):
@@ -189,14 +387,9 @@ class MaterialXSocket(object):
     @property
     def node_link(self):
         # link = tuple(node, socket, index)
-        node_tree = self.node_tree
-        link_list = node_tree.links
-        for nodelink in link_list:
-            if nodelink.from_socket.identifier == self.identifier:
-                link = (nodelink.to_node.name,
-                        nodelink.to_socket.identifier,
-                        nodelink.to_socket.socket_index)
-                return link
+        links = get_link_index(self.node_tree).get_links(to_socket_id(self))
+        if links:
+            return links[0]
 
     @property
     def socket_index(self):
@@ -231,26 +424,25 @@ class MaterialXSocket(object):
 
     def free(self):
         """Method called to cleanup this socket upon removal."""
-        try:
-            del alt_socket_ids[self.get_temp_id()]
-        except: pass
-        try:
-            del socket_color_override[self.get_temp_id()]
-        except: pass
+        alt_socket_ids.discard(self.get_temp_id())
+        socket_color_override.discard(self.get_temp_id())
 
     @property
     def alt_ids(self):
-        """Returns an alternate socket identifiers."""
-        return alt_socket_ids[self.get_temp_id()]
+        """Returns an alternate socket identifiers. Changes are kept by the setter"""
+        return alt_socket_ids.get(self.get_temp_id())
 
     @alt_ids.setter
     def alt_ids(self, value):
         """Sets alternate socket identifier."""
-        alt_socket_ids[self.get_temp_id()] = value
+        alt_socket_ids.set(self.get_temp_id(), value)
 
     def get_temp_id(self):
-        """Returns a temporary identifier."""
-        return str(hash(self)) + self.identifier
+        """Returns the registry identifier, stable for as long as the socket exists."""
+        return to_socket_id(self)
+
+socket_color_override = SocketRegistry()
+alt_socket_ids = SocketRegistry(default=list)
 
 # Data types used to convert specific sockets from proprietary to MaterialX types
 # [0] = Blender Type, [1] = mtlx type
@@ -264,6 +456,11 @@ mtlx_data_types = [('STRING', 'string'),
                    ('SHADER', 'shader'),
                    ('CUSTOM', 'custom')]
 
+# Enumerated list of items of the mtlx datatype in the data type list.
+mtlx_data_type_items = enumItemsFromList([x[1] for x in mtlx_data_types])
+# (bl_idname, socket.type, renderman_type) -> (mtlx_data_types index, mtlx type)
+socket_type_cache = {}
+
 def get_socket_types(self, context):
     """
     Blender EnumProperty() call back function to retrieve dynamic list of enumerated items
@@ -271,26 +468,47 @@ def get_socket_types(self, context):
     :param context: current Blender context object
     :return: items = list('identifier', 'name', 'description', 'icon', 'index'
     """
-    # Get enumerated list of items of the mtlx datatype in the data type list.
-    items = enumItemsFromList([x[1] for x in mtlx_data_types])
-    return items
+    return mtlx_data_type_items
 
-def get_mtlx_type(self):
-    """Blender bpy.types.Property() getter. Called when the value is "read" """
+def resolve_socket_type(bl_idname, socket_type, renderman_type):
+    """
+    Resolve the MaterialX type of a socket class
+    :param renderman_type: the socket's renderman_type, None if it has none
+    :return: (index in mtlx_data_types, mtlx type), (None, None) if unknown
+    """
     # Check to see if it's a Renderman Node first
-    temp_type = self.type
-    if hasattr(self, 'renderman_type'):
-        temp_type = str(self.renderman_type).upper()
-        if self.renderman_type == 'float':
+    temp_type = socket_type
+    if renderman_type is not None:
+        temp_type = str(renderman_type).upper()
+        if renderman_type == 'float':
             temp_type = 'VALUE'
-        elif self.renderman_type == 'color':
+        elif renderman_type == 'color':
             temp_type = 'RGB'
-    if self.bl_idname == 'RendermanNodeSocketStruct':
+    if bl_idname == 'RendermanNodeSocketStruct':
         temp_type = 'SHADER'
-    elif self.bl_idname == 'RendermanShaderSocket':
+    elif bl_idname == 'RendermanShaderSocket':
         temp_type = 'SHADER'
     idx = set_mtlx_data_type(temp_type)
-    return idx
+    if idx is None:
+        return None, None
+    return idx, mtlx_data_types[idx][1]
+
+def get_socket_type(socket):
+    """Returns the cached (index, mtlx type) of a socket, shared by its socket class"""
+    key = (socket.bl_idname, socket.type, getattr(socket, 'renderman_type', None))
+    try:
+        return socket_type_cache[key]
+    except KeyError:
+        socket_type = socket_type_cache[key] = resolve_socket_type(*key)
+        return socket_type
+
+def get_socket_mtlx_type(socket):
+    """Returns the MaterialX type string of a socket without going through RNA"""
+    return get_socket_type(socket)[1]
+
+def get_mtlx_type(self):
+    """Blender bpy.types.Property() getter. Called when the value is "read" """
+    return get_socket_type(self)[0]
 
 
 def set_mtlx_data_type(data_type):
@@ -305,14 +523,9 @@ def set_mtlx_data_type(data_type):
 
 def get_node_link(socket):
     nlink = ''
-    node_tree = socket.get_node_tree()
-    link_list = node_tree.links
-    for nodelink in link_list:
-        if nodelink.to_socket.identifier == socket.identifier:
-            socket_index = nodelink.from_socket.get_socket_index
-            nlink = (nodelink.from_node.name,
-                    nodelink.from_socket.identifier,
-                     socket_index())
+    links = get_link_index(socket.get_node_tree()).get_links(to_socket_id(socket))
+    if links:
+        nlink = links[-1]
     return nlink
 
 
@@ -328,6 +541,8 @@ def register():
                                               get=get_mtlx_type)
     bpy.types.NodeSocket.socket_id = StringProperty()
     bpy.types.NodeSocket.get_linked_node = get_node_link
+    bpy.app.handlers.load_pre.append(clear_socket_registries)
+    bpy.app.handlers.scene_update_post.append(invalidate_updated_trees)
 
 def unregister():
     """Blender's unregister. Removes extended funcs and props from bpy.types classes."""
@@ -337,4 +552,11 @@ def unregister():
     del bpy.types.NodeSocket.get_node_tree
     del bpy.types.NodeSocket.socket_id
     del bpy.types.NodeSocket.mtlx_type
+    socket_type_cache.clear()
+    tree_link_index.clear()
+    if clear_socket_registries in bpy.app.handlers.load_pre:
+        bpy.app.handlers.load_pre.remove(clear_socket_registries)
+    if invalidate_updated_trees in bpy.app.handlers.scene_update_post:
+        bpy.app.handlers.scene_update_post.remove(invalidate_updated_trees)
+    purge_socket_registries()
     del bpy.types.NodeSocket.get_linked_node
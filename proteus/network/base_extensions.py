@@ -53,6 +53,9 @@ from bpy.props import *
 import mathutils
 from ...utils.io import IO
 from .materialx_network import MaterialXNetwork
+from . import export_names
+from ..base_types.base_socket import get_socket_mtlx_type
+from ..workers import mtlx_serializer
 
 # ---------------------------------------------------------------------------------------#
 # -------------------------------------------------------------------------- FUNCTIONS --#
@@ -104,6 +107,7 @@ class MtlxCustomNode(object):
         self.inputs = node.inputs  # node input sockets
         self.outputs = node.outputs  # node output sockets
         self.links = []  # links to or from this node
+        self.link_index = None  # the network's LinkIndex, set for each export
         # Private Vars, accessible via Property API
         self._mtlx_mat = None  # The MTLX Material()
         self._mtlx_node_def = None  # the nodedef()
@@ -155,20 +159,48 @@ class MtlxCustomNode(object):
         if self.doc.getNodeDef(self.mtlx_node_def_name) is not None:
             self.defined = True
             return
+        # Copy the Node Def if it was already built during a batch export
+        if self.copy_node_def():
+            return
 
-        # Add the Node Def to the Current MTLX Document
-        node_def = self.doc.addNodeDef(name=node_def_name,
-                                       node=self.mtlx_node,
-                                       type=node_type)
-        # Set CYCLES Node target
-        node_def.setTarget(self.mtlx_target)
-        # Create, Inputs, Outputs, and Parameters
-        self.create_mtlx_inputs(node_def, inputs)
-        self.create_mtlx_outputs(node_def, outputs)
-        self.create_mtlx_parameters(node_def, parameters)
+        # Add the Node Def, its Inputs, Outputs, and Parameters to the MTLX Document
+        node_def = mtlx_serializer.add_node_def(self.doc, node_def_name, self.mtlx_node,
+                                                node_type, self.mtlx_target, inputs,
+                                                outputs, parameters)
+        self.share_node_def(node_def)
         # Set flag to true to avoid duplicate NodeDef creation
         self.defined = True
 
+    def copy_node_def(self):
+        """
+        Copy this node's NodeDef from the network's shared NodeDef library
+
+        :return: True if the NodeDef was copied into the current document
+        :rtype: bool
+        """
+        library = getattr(self.mtlx_network, 'node_def_library', None)
+        if library is None:
+            return False
+        shared_def = library.getNodeDef(self.mtlx_node_def_name)
+        if shared_def is None:
+            return False
+        node_def = self.doc.addNodeDef(name=shared_def.getName(),
+                                       node=shared_def.getNodeString(),
+                                       type=shared_def.getType())
+        node_def.copyContentFrom(shared_def)
+        self.defined = True
+        return True
+
+    def share_node_def(self, node_def):
+        """Add a newly built NodeDef to the network's shared NodeDef library"""
+        library = getattr(self.mtlx_network, 'node_def_library', None)
+        if library is None or library.getNodeDef(node_def.getName()) is not None:
+            return
+        shared_def = library.addNodeDef(name=node_def.getName(),
+                                        node=node_def.getNodeString(),
+                                        type=node_def.getType())
+        shared_def.copyContentFrom(node_def)
+
     def pre_instantiate(self, node_graph):
         """Handle any remaining node setup before instantiation in a MTLX NodeGraph()"""
         # Set the MTLX Node Graph from a MTLX Material's passed in NodeGraph()
@@ -177,16 +209,11 @@ class MtlxCustomNode(object):
             # Remove the Node if it has already been instantiated once to prevent duplis
             self.mtlx_node_graph.removeNode(self.mtlx_name)
 
-        # Create and Add a Graph Node
-        self.mtlx_graph_node = self.add_graph_node(
-            node=self.mtlx_node, name=self.mtlx_name, type=self.mtlx_type)
-        # Set this node's location in the node_graph
-        self.mtlx_graph_node.setAttribute('xpos', str(self.location[0]))
-        self.mtlx_graph_node.setAttribute('ypos', str(self.location[1]))
-
-        # Set Graph Node Inputs and Parameters
-        self.set_graph_node_inputs(self.mtlx_inputs)
-        self.set_graph_node_parameters(self.mtlx_params)
+        # Create and Add a Graph Node at this node's location, with its Inputs and
+        # Parameters
+        self.mtlx_graph_node = mtlx_serializer.add_graph_node(
+            self.mtlx_node_graph, self.mtlx_node, self.mtlx_name, self.mtlx_type,
+            self.location, self.mtlx_inputs, self.mtlx_params)
 
         # Set flag to prevent duplicate instantiations
         self.instantiated = True
@@ -211,9 +238,33 @@ class MtlxCustomNode(object):
         )
         return mtlx_graph_node
 
+    def snapshot(self):
+        """
+        Capture this node as plain Python data, without touching the MaterialX Document
+
+        :return: {'name', 'idname', 'node', 'type', 'target', 'location', 'inputs',
+                  'outputs', 'params'}
+        :rtype: dict
+        """
+        self.mtlx_inputs = self.get_inputs()
+        self.mtlx_outputs = self.get_outputs()
+        self.mtlx_params = self.get_params()
+        self.set_mtlx_type()
+        return {'name': self.mtlx_name,
+                'idname': self.idname,
+                'node': self.mtlx_node,
+                'type': self.mtlx_type,
+                'target': self.mtlx_target,
+                'location': self.location,
+                'inputs': list(self.mtlx_inputs),
+                'outputs': list(self.mtlx_outputs),
+                'params': list(self.mtlx_params)}
+
     def init_doc(self):
         """Initializes the MTLX Document from the MTLX Material or creates a new one"""
-        if self.material:
+        if self.mtlx_network is not None:
+            doc = self.mtlx_network.document
+        elif self.material:
             doc = self.material.mtlx_network.document
         else:
             IO.debug("Creating New Doc")
@@ -286,9 +337,9 @@ class MtlxCustomNode(object):
         :rtype: list
         """
         socket_name = MaterialXNetwork.to_mtlx_name(socket.name) #Get a properly case name
-        mtlx_type = socket.mtlx_type
-        mtlx_name = socket.mtlx_name
-        if socket.mtlx_type == 'shader':
+        mtlx_type = get_socket_mtlx_type(socket)
+        mtlx_name = export_names.get_socket_name(socket)
+        if mtlx_type == 'shader':
             value = None
         else:
             value = socket.default_value
@@ -321,16 +372,16 @@ class MtlxCustomNode(object):
         socket_name = MaterialXNetwork.to_mtlx_name(socket_key)
         mtlx_name = ''
         if output is True:
-            mtlx_type = node.outputs[socket_key].mtlx_type
-            mtlx_name = node.outputs[socket_key].mtlx_name
-            if node.outputs[socket_key].mtlx_type == 'shader':
+            mtlx_type = get_socket_mtlx_type(node.outputs[socket_key])
+            mtlx_name = export_names.get_socket_name(node.outputs[socket_key])
+            if mtlx_type == 'shader':
                 value = None
             else:
                 value = node.outputs[socket_key].default_value
         else:
-            mtlx_type = node.inputs[socket_key].mtlx_type
-            mtlx_name = node.inputs[socket_key].mtlx_name
-            if node.inputs[socket_key].mtlx_type == 'shader':
+            mtlx_type = get_socket_mtlx_type(node.inputs[socket_key])
+            mtlx_name = export_names.get_socket_name(node.inputs[socket_key])
+            if mtlx_type == 'shader':
                 value = None
             else:
                 value = node.inputs[socket_key].default_value
@@ -400,24 +451,7 @@ class MtlxCustomNode(object):
         
         :return: 
         """
-        if len(inputs) >= 1:
-            in_type = inputs[0][1]
-            for input in inputs:
-                in_name, in_value, in_mtlx_name = input[0], input[2], input[3]
-                if in_value is not None:
-                    mtlx_input = mtlx_node.addInput(name=in_mtlx_name, type=input[1])
-                    try:
-                        mtlx_input.setValue(in_value, input[1])
-                    except IndexError:
-                        continue
-                else:
-                    try:
-                        mtlx_input = mtlx_node.addInput(name=in_mtlx_name, type=input[1])
-                    except LookupError:
-                        print("NON UNIQUE NAME ERROR")
-        # Output ONLY Node with no input sockets. Do nothing.
-        elif len(inputs) == 0:
-            pass
+        mtlx_serializer.create_inputs(mtlx_node, inputs)
 
     def create_mtlx_outputs(self, mtlx_node, outputs):
         """
@@ -430,17 +464,7 @@ class MtlxCustomNode(object):
 
         :return: 
         """
-        # Multioutput Node
-        if len(outputs) > 1:
-            out_type = 'multioutput'
-            mtlx_node.setType(out_type)
-            for output in outputs:
-                mtlx_node.addOutput(name=output[3], type=output[1])
-
-        # Single Output node output sockets are pre-defined by it's MTLX type
-        elif len(outputs) == 1:
-            for output in outputs:
-                mtlx_node.addOutput(name=output[3], type=output[1])
+        mtlx_serializer.create_outputs(mtlx_node, outputs)
 
     def create_mtlx_parameters(self, mtlx_node, parameters):
         """
@@ -453,36 +477,15 @@ class MtlxCustomNode(object):
 
         :return: 
         """
-
-        # Setup node parameters
-        if parameters is not None:
-            if len(parameters) >= 1:
-                for parameter in parameters:
-                    mtlx_node.addParameter(name=parameter[0], type=parameter[1])
-                    mtlx_node.setParameterValue(parameter[0], parameter[2], parameter[1])
+        mtlx_serializer.create_parameters(mtlx_node, parameters)
 
     def set_graph_node_inputs(self, inputs):
         """Set the inputs of a MaterialX Node instance"""
-
-        if len(inputs) >= 1:
-            in_type = inputs[0][1]
-            for input in inputs:
-                try:
-                    new_input = self.mtlx_graph_node.addInput(name=input[3],
-                                                              type=input[1])
-                    new_input.setInterfaceName(input[3])
-                except LookupError:
-                    print("NON UNIQUE NAME ERROR")
+        mtlx_serializer.create_graph_inputs(self.mtlx_graph_node, inputs)
 
     def set_graph_node_parameters(self, parameters):
         """Set the parameters of a MaterialX Node instance"""
-
-        if (parameters is not None) and (len(parameters) >= 1):
-            for parameter in parameters:
-                self.mtlx_graph_node.addParameter(name=parameter[0], type=parameter[1])
-                self.mtlx_graph_node.setParameterValue(parameter[0],
-                                                       parameter[2],
-                                                       parameter[1])
+        mtlx_serializer.create_parameters(self.mtlx_graph_node, parameters)
 
     def reset(self):
         """Reset this node to it's default state."""
@@ -506,10 +509,26 @@ class MtlxCustomNode(object):
     @property
     def node_links(self):
         """Node Links for this Node"""
-        return [x for x in self.mtlx_network.yield_node_links(self.node_tree.links)
+        if self.link_index is not None:
+            return self.link_index.get_links(self.mtlx_name)
+        return [x for x in self.mtlx_network.yield_node_links(None)
                 if self.mtlx_name == MaterialXNetwork.to_mtlx_name(x[0]) or
                 self.mtlx_name == MaterialXNetwork.to_mtlx_name(x[2])]
 
+    @property
+    def incoming_links(self):
+        """Node Links ending at this Node"""
+        if self.link_index is not None:
+            return self.link_index.get_incoming(self.mtlx_name)
+        return [x for x in self.node_links if x[2] == self.mtlx_name]
+
+    @property
+    def outgoing_links(self):
+        """Node Links starting at this Node"""
+        if self.link_index is not None:
+            return self.link_index.get_outgoing(self.mtlx_name)
+        return [x for x in self.node_links if x[0] == self.mtlx_name]
+
     # MTLX Properties --------------------------------------------------------------------
 
     @property
@@ -0,0 +1,121 @@
+# ---------------------------------------------------------------------------------------#
+# ----------------------------------------------------------------------------- HEADER --#
+
+"""
+:author:
+    Jared Webber
+
+:synopsis:
+    Process wide LRU cache of parsed MaterialX Documents
+
+:description:
+    Reading the same library file again used to run mx.createDocument() and
+    mx.readFromXmlFile() from scratch every time. Parsed Documents are now kept in an
+    LRU cache, together with their DocumentIndex, keyed by absolute path. Each entry
+    remembers the modification time and size of the file it was parsed from. An entry
+    whose file has changed since then is dropped and the file is parsed again.
+
+    The cache is bounded by conf.document_cache_entries entries and by
+    conf.document_cache_bytes, the summed size of the cached files, which stands in for
+    their memory use. Least recently used entries are evicted first. invalidate() drops
+    one file or every file. Hits, misses and evictions are counted in cache_stats and
+    shown in the MaterialX panel.
+
+:applications:
+    Blender 3D
+
+:see_also:
+    ./document_index.py
+    ./materialx_network.py -- load_read_document()
+
+:license:
+    see license.txt and EULA.txt
+
+"""
+
+# ---------------------------------------------------------------------------------------#
+# ---------------------------------------------------------------------------- IMPORTS --#
+try:
+    import MaterialX as mx
+except ImportError:
+    mx = None
+    print("MaterialX document_cache.py module could not load MaterialX library")
+# Standard Imports
+import os
+import threading
+from collections import OrderedDict
+from ... import conf
+from ...utils.io import IO
+from .document_index import DocumentIndex
+
+# absolute path -> ((mtime, size), document, index), least recently used first
+document_cache = OrderedDict()
+cache_stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+cache_lock = threading.RLock()
+
+# ---------------------------------------------------------------------------------------#
+# -------------------------------------------------------------------------- FUNCTIONS --#
+def get_file_key(filepath):
+    stat = os.stat(filepath)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def get_document(filepath):
+    """
+    Return the parsed Document of a .mtlx file and its DocumentIndex, parsing the file
+    only if it is not cached or changed on disk
+
+    :return: (document, index)
+    :rtype: tuple
+    """
+    filepath = os.path.abspath(filepath)
+    with cache_lock:
+        file_key = get_file_key(filepath)
+        entry = document_cache.get(filepath)
+        if entry is not None and entry[0] == file_key:
+            cache_stats['hits'] += 1
+            document_cache.move_to_end(filepath)
+            return entry[1], entry[2]
+        cache_stats['misses'] += 1
+        document_cache.pop(filepath, None)
+        document = mx.createDocument()
+        mx.readFromXmlFile(document, filepath)
+        index = DocumentIndex(document)
+        document_cache[filepath] = (file_key, document, index)
+        evict(conf.document_cache_entries, conf.document_cache_bytes)
+        return document, index
+
+
+def get_cache_bytes():
+    """Summed file size of the cached Documents"""
+    return sum(entry[0][1] for entry in document_cache.values())
+
+
+def evict(max_entries, max_bytes):
+    """Drop least recently used Documents until the cache fits both bounds"""
+    with cache_lock:
+        total = get_cache_bytes()
+        while document_cache and (len(document_cache) > max_entries or
+                                  total > max_bytes):
+            filepath, entry = document_cache.popitem(last=False)
+            total -= entry[0][1]
+            cache_stats['evictions'] += 1
+            IO.debug("Evicted cached MaterialX Document: %s", filepath, subsystem='read')
+
+
+def invalidate(filepath=None):
+    """Drop the cached Document of a file, or of every file if filepath is None"""
+    with cache_lock:
+        if filepath is None:
+            document_cache.clear()
+        else:
+            document_cache.pop(os.path.abspath(filepath), None)
+
+
+def get_cache_info():
+    """Return the counters and the current size of the cache"""
+    with cache_lock:
+        info = dict(cache_stats)
+        info['entries'] = len(document_cache)
+        info['bytes'] = get_cache_bytes()
+    return info
@@ -0,0 +1,119 @@
+# ---------------------------------------------------------------------------------------#
+# ----------------------------------------------------------------------------- HEADER --#
+
+"""
+:author:
+    Jared Webber
+
+:synopsis:
+    One pass index over a MaterialX Document read from disk
+
+:description:
+    Importing a document used to ask the Document the same questions over and over,
+    and every question is a binding call: getNodeDef per node, getMatchingNodeDefs per
+    element, getChildIndex per edge and getConnectedNode per input.
+
+    A DocumentIndex answers these questions from dicts. It is built in one pass over
+    the NodeDefs and Node Graphs of a loaded Document:
+        node_defs           nodedef name -> NodeDef
+        node_defs_by_node   node string -> [NodeDef]
+        nodes_by_category   node category -> [Node]
+        node_graphs         node graph name -> NodeGraphIndex
+
+    Node names are only unique inside their Node Graph, so each Node Graph gets its own
+    NodeGraphIndex:
+        nodes               node name -> Node
+        upstream            node name -> [(input name, upstream node name)]
+        port_index          (node name, input name) -> child index of the input
+
+    Like the GraphIR of an export, an index is only valid for the Document it was built
+    from.
+
+:applications:
+    Blender 3D
+
+:see_also:
+    ./materialx_network.py -- read_network()
+    ./graph_ir.py
+
+:license:
+    see license.txt and EULA.txt
+
+"""
+
+# ---------------------------------------------------------------------------------------#
+# ---------------------------------------------------------------------------- CLASSES --#
+class NodeGraphIndex(object):
+    """Dict based lookups over the Nodes and connections of one Node Graph"""
+    __slots__ = ('name', 'nodes', 'upstream', 'port_index')
+
+    def __init__(self, node_graph):
+        self.name = node_graph.getName()
+        self.nodes = {node.getName(): node for node in node_graph.getNodes()}
+        self.upstream = {}
+        self.port_index = {}
+        for name, node in self.nodes.items():
+            upstream = []
+            for idx, child in enumerate(node.getChildren()):
+                child_name = child.getName()
+                self.port_index[(name, child_name)] = idx
+                if child.getCategory() != 'input':
+                    continue
+                # Inputs connect to nodes of their own Node Graph
+                up_name = child.getAttribute('nodename')
+                if up_name and up_name in self.nodes:
+                    upstream.append((child_name, up_name))
+            self.upstream[name] = upstream
+
+    def get_upstream(self, name):
+        """Return the [(input name, upstream node name)] connections of a node"""
+        return self.upstream.get(name, [])
+
+    def get_port_index(self, name, input_name):
+        """Return the child index of a node's input"""
+        return self.port_index[(name, input_name)]
+
+
+class DocumentIndex(object):
+    """Dict based lookups over the NodeDefs and Node Graphs of a Document"""
+    __slots__ = ('document', 'node_defs', 'node_defs_by_node', 'nodes_by_category',
+                 'node_graphs', 'node_def_values')
+
+    def __init__(self, document):
+        self.document = document
+        self.node_defs = {}
+        self.node_defs_by_node = {}
+        self.nodes_by_category = {}
+        self.node_graphs = {}
+        self.node_def_values = {} # nodedef name -> (inputs, parameters), filled on use
+        for node_def in document.getNodeDefs():
+            self.node_defs[node_def.getName()] = node_def
+            self.node_defs_by_node.setdefault(node_def.getNodeString(), []).append(node_def)
+        for node_graph in document.getNodeGraphs():
+            graph_index = NodeGraphIndex(node_graph)
+            self.node_graphs[graph_index.name] = graph_index
+            for node in graph_index.nodes.values():
+                self.nodes_by_category.setdefault(node.getCategory(), []).append(node)
+
+    def get_node_graph(self, name):
+        """Return the NodeGraphIndex of a Node Graph name, or None"""
+        return self.node_graphs.get(name)
+
+    def get_node_def(self, name):
+        """Return the NodeDef with the passed in name, or None"""
+        return self.node_defs.get(name)
+
+    def get_matching_node_defs(self, node_string):
+        """Return the NodeDefs for a node string, i.e. getMatchingNodeDefs()"""
+        return self.node_defs_by_node.get(node_string, [])
+
+    def get_node_def_values(self, name):
+        """Return the (inputs, parameters) of a NodeDef, read from the Document once"""
+        values = self.node_def_values.get(name)
+        if values is None:
+            node_def = self.node_defs.get(name)
+            if node_def is None:
+                return None
+            values = (node_def.getInputs(), node_def.getParameters())
+            self.node_def_values[name] = values
+        return values
@@ -0,0 +1,100 @@
+# ---------------------------------------------------------------------------------------#
+# ----------------------------------------------------------------------------- HEADER --#
+
+"""
+:author:
+    Jared Webber
+
+:synopsis:
+    In-memory side table of the socket names and engine tags of an export
+
+:description:
+    Exports used to write NodeSocket.mtlx_name and Node.render_engine on every socket
+    and node. Each RNA write is slow, dirties the .blend and sends update
+    notifications.
+
+    The names and engine tags of an export are now kept in two dicts keyed by the
+    as_pointer() of the socket or node:
+        socket_names    socket pointer -> export mtlx_name
+        node_engines    node pointer -> render engine class key, i.e. 'CYCLES'
+
+    The tables only hold one export. MaterialXNetwork.capture_graph() clears them when
+    an export starts, so they never grow over a session and a pointer Blender reused
+    for another socket never returns a stale name.
+
+    Lookups fall back to the RNA properties, so names persisted earlier are still
+    found. RNA is only written by persist(), which runs when the user persists the
+    names of a material.
+
+:applications:
+    Blender 3D
+
+:see_also:
+    ./materialx_network.py -- set_socket_names(), persist_names()
+    ./graph_ir.py -- SocketRecord.get_stable_name()
+
+:license:
+    see license.txt and EULA.txt
+
+"""
+
+# ---------------------------------------------------------------------------------------#
+# -------------------------------------------------------------------------- FUNCTIONS --#
+socket_names = {}
+node_engines = {}
+
+
+def get_socket_name(socket):
+    """Export mtlx_name of a bpy.types.NodeSocket, else its persisted mtlx_name"""
+    name = socket_names.get(socket.as_pointer())
+    if name is None:
+        name = socket.mtlx_name
+    return name
+
+
+def set_socket_name(pointer, name):
+    socket_names[pointer] = name
+
+
+def get_node_engine(node):
+    """Engine tag of a bpy.types.Node, else its persisted render_engine"""
+    engine = node_engines.get(node.as_pointer())
+    if engine is None:
+        engine = node.render_engine
+    return engine
+
+
+def set_node_engine(node, engine):
+    node_engines[node.as_pointer()] = engine
+
+
+def persist(graph, engine):
+    """
+    Write the names and engine tags of a captured node tree to their RNA properties.
+    Only properties holding a different value are written.
+
+    :param graph: node tree whose socket names were set by the network
+    :type graph: GraphIR
+
+    :param engine: render engine class key of the export
+    :type engine: str
+
+    :return: number of written properties
+    :rtype: int
+    """
+    written = 0
+    for record in graph.nodes:
+        if record.node.render_engine != (engine or ''):
+            record.node.render_engine = engine or ''
+            written += 1
+        for socket in record.sockets:
+            if socket.socket.mtlx_name != socket.mtlx_name:
+                socket.socket.mtlx_name = socket.mtlx_name
+                written += 1
+    return written
+
+
+def clear():
+    """Forget every export name and engine tag"""
+    socket_names.clear()
+    node_engines.clear()
@@ -46,7 +46,9 @@ import bpy
 from bpy.props import *
 
 from .materialx_network import MaterialXNetwork
+from .graph_ir import get_socket_base_name
 from .base_extensions import MtlxCustomNode
+from ..workers import mtlx_serializer
 # ---------------------------------------------------------------------------------------#
 # -------------------------------------------------------------------------- FUNCTIONS --#
 
@@ -107,6 +109,9 @@ class CyclesMtlxCustomNode_Shader(CyclesMtlxCustomNode):
         if self.doc.getNodeDef(self.mtlx_node_def_name) is not None:
             self.defined = True
             return
+        # Copy the Node Def if it was already built during a batch export
+        if self.copy_node_def():
+            return
 
         # Query API for parameters
         outputs = self.mtlx_outputs
@@ -115,15 +120,12 @@ class CyclesMtlxCustomNode_Shader(CyclesMtlxCustomNode):
         idname = self.idname
         node_type = self.mtlx_type
 
-        # Create a Custom Node Def for A Custom Shader Node
-        shader = self.doc.addNodeDef(name=idname, node=self.mtlx_node,
-                                     type='surfaceshader')
-        # Set CYCLES Node target
-        shader.setTarget('cycles')
-        # Create, Inputs, Outputs, and Parameters
-        self.create_mtlx_inputs(shader, inputs)
-        # self.create_mtlx_outputs(shader, outputs) #Shader Nodes only have 1 output
-        self.create_mtlx_parameters(shader, parameters)
+        # Create a Custom Node Def for A Custom Shader Node, targeting CYCLES
+        # Shader Nodes only have 1 output, the surfaceshader type of the NodeDef
+        shader = mtlx_serializer.add_node_def(self.doc, idname, self.mtlx_node,
+                                              node_type, 'cycles', inputs, outputs,
+                                              parameters, shader=True)
+        self.share_node_def(shader)
         # Set flag to true to avoid duplicate NodeDef creation
         self.defined = True
 
@@ -141,13 +143,15 @@ class CyclesMtlxCustomNode_Shader(CyclesMtlxCustomNode):
         # Any node with a BSDF or Shading type output socket should be queryed for any
         ## connections to the material output node.
         # Connect this node to the node graph output if it's linked in Blender
-        for link in self.node_links:
+        for link in self.outgoing_links:
             if link[0] == self.mtlx_name and link[2] == 'material_output':
-                if link[3] == 'Surface':
+                # Socket names are stable names, i.e. 'surface.material_output_in_surface'
+                out_name = get_socket_base_name(link[3])
+                if out_name == 'surface':
                     surf_out.setNodeName(self.mtlx_graph_node.getName())
-                if link[3] == 'Volume':
+                if out_name == 'volume':
                     vol_out.setNodeName(self.mtlx_graph_node.getName())
-                if link[3] == 'Displacement':
+                if out_name == 'displacement':
                     disp_out.setNodeName(self.mtlx_graph_node.getName())
 
 
@@ -60,6 +60,7 @@ from bpy.props import *
 import mathutils
 
 from ...utils.io import IO
+from . import export_names
 
 # Node Extensions
 from . import extend_cycles_nodes as ext_cycles #cycles
@@ -160,39 +161,20 @@ prman_node_list = ['PxrOSLPatternNode', 'PxrSeExprPatternNode',
 prman_nodes = {x for x in prman_node_list}
 
 
+"""---------------------Compiled Extension Registry----------------------"""
+
+# (class prefix, bl_idname) -> custom class, e.g. ('CMCN', 'ShaderNodeMath')
+node_class_registry = {}
+# (class prefix, lowercase nodedef name) -> custom class name, e.g. ('CMCN', 'shadernodemath')
+nodedef_class_registry = {}
+# lowercase nodedef name -> custom class name of the first module that defines it
+nodedef_class_names = {}
+# True once the dicts above are compiled, an empty registry is still a built one
+class_registry_built = False
+
+
 # ---------------------------------------------------------------------------------------#
 # -------------------------------------------------------------------------- FUNCTIONS --#
-def get_custom_classes(module_name, class_prefix):
-    """
-    Get all custom classes from the render_engines extension module, determined by prefix
-    :param module_name: the module we need classes from
-    :type module_name: 
-    
-    :param class_prefix: 'CMCN, RMCN', et al.
-    :type class_prefix: str
-    
-    :return: custom_classes
-    :rtype: list
-    """
-    classes = inspect.getmembers(module_name, inspect.isclass)
-    custom_classes = [str(x[0]).rsplit('_', 1)[1] for x in classes if
-                         '%s_'%(class_prefix) in x[0]]
-    return custom_classes
-
-
-def get_custom_module(prefix):
-    """Return the imported custom module based on the prefix"""
-    if prefix == 'CMCN':
-        return ext_cycles
-    elif prefix == 'RMCN':
-        return ext_prman
-    elif prefix == 'ARCN':
-        return ext_arnold
-    elif prefix == 'VRCN':
-        return ext_vray
-    elif prefix == 'RSCN':
-        return ext_rs
-
 def yield_custom_modules():
     """Yield all custom nodes for each module in tupled order"""
     yield from [
@@ -203,67 +185,83 @@ def yield_custom_modules():
             (ext_rs, 'RSCN'),
         ]
 
-def get_mtlx_data(node):
+def build_class_registry():
+    """
+    Compile the custom classes of every extension module into the lookup dicts above.
+    Called once from register(), so node lookups never scan the extension modules.
+    """
+    global class_registry_built
+    node_class_registry.clear()
+    nodedef_class_registry.clear()
+    nodedef_class_names.clear()
+    for cls_module, prefix in yield_custom_modules(): # yield mods and prefixes
+        if cls_module is None:
+            continue
+        for cls_name, cls in vars(cls_module).items():
+            if not (inspect.isclass(cls) and cls_name.startswith('%s_' % prefix)):
+                continue
+            name = cls_name.rsplit('_', 1)[1]
+            node_class_registry[(prefix, name)] = cls
+            nodedef_class_registry[(prefix, name.lower())] = name
+            nodedef_class_names.setdefault(name.lower(), name)
+    class_registry_built = True
+    IO.debug("Compiled %d MaterialX extension classes", len(node_class_registry))
+    return node_class_registry
+
+
+def get_class_registry():
+    """Return the compiled extension registry, compiling it once on first use"""
+    if not class_registry_built:
+        build_class_registry()
+    return node_class_registry
+
+
+def get_node_class(id_name, prefix):
+    """Return the custom class for an exact (prefix, bl_idname) pair, else None"""
+    return get_class_registry().get((prefix, id_name))
+
+
+def get_mtlx_data(node, engine=None):
     """
     Getter function for Blender Nodes that returns a class instance of that node's
     respective custom class
     :param node: the current node in blender
+    :param engine: render engine class key, i.e. 'CYCLES'. Defaults to the node's
+    engine tag, see export_names.get_node_engine()
     :return: class instance
     """
     # Get the Node's Blender idname for comparison to custom class name
     id_name = node.bl_idname
-    class_type = node.render_engine #CHECK MTLX_DATA FOR THIS
-    if class_type:
-        if class_type in class_dict.keys():
-            cls_prefix = str(class_dict[class_type])
-            cls_module = get_custom_module(cls_prefix)
-            module_name = cls_module
-            custom_classes = get_custom_classes(module_name, cls_prefix)
-            if any(id_name in x for x in custom_classes):
-                # Look for the matching class in this module
-                cls_name = "%s_%s" % (cls_prefix, str(id_name))
-                IO.info("MaterialX Node Data; IDNAME: %s" % cls_name)
-                # current_module = sys.modules[cls_module]
-                dynamic_class = getattr(cls_module, cls_name)
-                # Create and return an instance of that class
-                instance = dynamic_class(node)
-                return instance
-            elif not any(id_name in x for x in custom_classes):
-                if 'Output' in id_name:
-                    return None
-                class_list = getattr(cls_module, 'class_list')
-                if any(id_name in x for x in class_list):
-                    # Look for the matching class in this module
-                    cls_name = "%s_%s" % (cls_prefix, str(id_name))
-                    IO.info("MaterialX Node Data; IDNAME: %s" % cls_name)
-                    # current_module = sys.modules[cls_module]
-                    dynamic_class = getattr(cls_module, cls_name)
-                    # Create and return an instance of that class
-                    instance = dynamic_class(node)
-                    return instance
-    else:
-        return None
+    class_type = engine or export_names.get_node_engine(node)
+    if class_type and class_type in class_dict:
+        cls_prefix = class_dict[class_type]
+        dynamic_class = get_node_class(id_name, cls_prefix)
+        if dynamic_class is None:
+            if 'Output' not in id_name:
+                IO.debug("No MaterialX Node Data for IDNAME: %s_%s", cls_prefix, id_name,
+                         subsystem='extension')
+            return None
+        IO.debug("MaterialX Node Data; IDNAME: %s", dynamic_class.__name__,
+                 subsystem='extension')
+        # Create and return an instance of that class
+        return dynamic_class(node)
+    return None
 
 
 def get_node_class_name(idname, **kwargs):
     """Getter for the node class name of a nodedef idname parsed from a MTLX doc"""
+    get_class_registry()
     cls_prefix = kwargs.get('class_type', None)
     if cls_prefix is None:
-        for cls_module, prefix in yield_custom_modules(): # yield mods and prefixes
-            for name in get_custom_classes(cls_module, prefix):
-                if name.lower() == idname:
-                    return name
-    else:
-        cls_module = get_custom_module(cls_prefix)
-        for name in get_custom_classes(cls_module, cls_prefix):
-            if name.lower() == idname:
-                return name
+        return nodedef_class_names.get(idname)
+    return nodedef_class_registry.get((cls_prefix, idname))
 
 # ---------------------------------------------------------------------------------------#
 # ---------------------------------------------------------------------------- CLASSES --#
 
 def register():
     """Blender's register function. Injects methods and classes into Blender"""
+    build_class_registry() #compile the extension classes once
     bpy.types.Node.mtlx_data = get_mtlx_data #register the mtlx node constructor
     bpy.types.Node.render_engine = StringProperty()
     bpy.types.NodeSocket.mtlx_name = StringProperty(name='MTLX Name',
@@ -271,6 +269,12 @@ def register():
 
 def unregister():
     """Blender's unregister function. Removes methods and classes from Blender"""
+    global class_registry_built
+    export_names.clear()
+    node_class_registry.clear()
+    nodedef_class_registry.clear()
+    nodedef_class_names.clear()
+    class_registry_built = False
     del bpy.types.Node.mtlx_data
     del bpy.types.NodeSocket.mtlx_name
     del bpy.types.Node.render_engine
\ No newline at end of file
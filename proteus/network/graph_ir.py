@@ -0,0 +1,195 @@
+# ---------------------------------------------------------------------------------------#
+# ----------------------------------------------------------------------------- HEADER --#
+
+"""
+:author:
+    Jared Webber
+
+:synopsis:
+    Compact, per-export representation of a Blender Node Tree
+
+:description:
+    Every access to a Blender node, socket or link crosses the bpy boundary. The
+    MaterialXNetwork used to walk node_tree.nodes and node_tree.links again for every
+    question it asked about the tree.
+
+    A GraphIR is captured in a single pass over node_tree.nodes and node_tree.links at
+    the start of an export. The network derives its sockets, socket counts, links and
+    output links from the records below instead of from RNA.
+
+    The records keep references to the Blender data they were captured from, so a
+    GraphIR is only valid for the export it was captured for.
+
+:applications:
+    Blender 3D
+
+:see_also:
+    ./materialx_network.py
+
+:license:
+    see license.txt and EULA.txt
+
+"""
+
+# ---------------------------------------------------------------------------------------#
+# ---------------------------------------------------------------------------- IMPORTS --#
+from . import export_names
+
+# ---------------------------------------------------------------------------------------#
+# -------------------------------------------------------------------------- FUNCTIONS --#
+def to_mtlx_name(name):
+    """Creates a correct MTLX name. Mirrors StringResolver.to_mtlx_name"""
+    return (str(name).lower()).replace(" ", "_")
+
+
+def get_socket_base_name(mtlx_name):
+    """
+    The lowercase socket name of a MTLX socket name, i.e. 'surface' for
+    'surface.material_output_in_surface', see SocketRecord.get_stable_name()
+    """
+    return ((str(mtlx_name).split('.', 1)[0]).strip('()_.')).lower()
+
+# ---------------------------------------------------------------------------------------#
+# ---------------------------------------------------------------------------- CLASSES --#
+class SocketRecord(object):
+    """A captured Blender NodeSocket"""
+    __slots__ = ('socket', 'pointer', 'node', 'name', 'identifier', 'is_output', 'index',
+                 'mtlx_name')
+
+    def __init__(self, socket, node, is_output, index):
+        self.socket = socket # the blender socket
+        self.pointer = socket.as_pointer() # key of the socket in export_names
+        self.node = node # the NodeRecord this socket belongs to
+        self.name = socket.name
+        self.identifier = socket.identifier
+        self.is_output = is_output
+        self.index = index # position in node.inputs or node.outputs
+        self.mtlx_name = export_names.get_socket_name(socket)
+
+    def get_stable_name(self):
+        """
+        Deterministic MTLX name of the socket, i.e. 'base_color.principled_bsdf_in_color'.
+        The socket name comes first, so split('.', 1)[0] still yields it. The node name,
+        direction and identifier make it unique in the tree without counting sockets.
+        """
+        return "%s.%s_%s_%s" % (to_mtlx_name(self.name), self.node.mtlx_name,
+                                'out' if self.is_output else 'in',
+                                to_mtlx_name(self.identifier))
+
+
+class NodeRecord(object):
+    """A captured Blender Node"""
+    __slots__ = ('node', 'name', 'mtlx_name', 'bl_idname', 'location', 'inputs',
+                 'outputs', 'is_active_output')
+
+    def __init__(self, node):
+        self.node = node # the blender node
+        self.name = node.name
+        self.mtlx_name = to_mtlx_name(node.name)
+        self.bl_idname = node.bl_idname
+        self.location = tuple(node.location)
+        self.inputs = [SocketRecord(s, self, False, i) for i, s in enumerate(node.inputs)]
+        self.outputs = [SocketRecord(s, self, True, i) for i, s in enumerate(node.outputs)]
+        self.is_active_output = getattr(node, 'is_active_output', True)
+
+    @property
+    def sockets(self):
+        """Input and output sockets of this node"""
+        return self.inputs + self.outputs
+
+    @property
+    def is_output_node(self):
+        """Output nodes have no output sockets"""
+        return not self.outputs
+
+
+class LinkRecord(object):
+    """A captured, valid Blender NodeLink"""
+    __slots__ = ('from_socket', 'to_socket')
+
+    def __init__(self, from_socket, to_socket):
+        self.from_socket = from_socket # SocketRecord
+        self.to_socket = to_socket # SocketRecord
+
+    @property
+    def from_node(self):
+        return self.from_socket.node
+
+    @property
+    def to_node(self):
+        return self.to_socket.node
+
+    def as_tuple(self):
+        """The link in the pattern (from_node, from_socket, to_node, to_socket)"""
+        return (self.from_socket.node.mtlx_name, self.from_socket.mtlx_name,
+                self.to_socket.node.mtlx_name, self.to_socket.mtlx_name)
+
+
+class LinkIndex(object):
+    """
+    Adjacency index of the links of a GraphIR, keyed by the MTLX name of their nodes.
+    Looking up the links of a node is O(degree) instead of a scan over every link.
+    """
+    __slots__ = ('incoming', 'outgoing')
+
+    def __init__(self, links):
+        self.incoming = {} # to_node mtlx_name -> [LinkRecord]
+        self.outgoing = {} # from_node mtlx_name -> [LinkRecord]
+        for link in links:
+            self.outgoing.setdefault(link.from_socket.node.mtlx_name, []).append(link)
+            self.incoming.setdefault(link.to_socket.node.mtlx_name, []).append(link)
+
+    def get_incoming(self, name):
+        """Link tuples ending at the node with the passed in MTLX name"""
+        return [link.as_tuple() for link in self.incoming.get(name, ())]
+
+    def get_outgoing(self, name):
+        """Link tuples starting at the node with the passed in MTLX name"""
+        return [link.as_tuple() for link in self.outgoing.get(name, ())]
+
+    def get_links(self, name):
+        """Link tuples to or from the node with the passed in MTLX name"""
+        return self.get_incoming(name) + self.get_outgoing(name)
+
+
+class GraphIR(object):
+    """Nodes, sockets and links of a Node Tree captured in one pass"""
+    __slots__ = ('nodes', 'nodes_by_name', 'links', 'link_index', 'socket_count')
+
+    def __init__(self, node_tree):
+        self.nodes = []
+        self.nodes_by_name = {}
+        self.links = []
+        self.socket_count = 0
+        sockets = {} # socket pointer -> SocketRecord, only needed while capturing
+        for node in node_tree.nodes:
+            record = NodeRecord(node)
+            self.nodes.append(record)
+            self.nodes_by_name[record.name] = record
+            for socket in record.sockets:
+                sockets[socket.socket.as_pointer()] = socket
+            self.socket_count += len(record.inputs) + len(record.outputs)
+        for link in node_tree.links:
+            if not link.is_valid:
+                continue
+            from_socket = sockets.get(link.from_socket.as_pointer())
+            to_socket = sockets.get(link.to_socket.as_pointer())
+            if from_socket is not None and to_socket is not None:
+                self.links.append(LinkRecord(from_socket, to_socket))
+        self.link_index = LinkIndex(self.links)
+
+    def get_node(self, name):
+        """Return the NodeRecord of a Blender node name"""
+        return self.nodes_by_name.get(name)
+
+    def yield_sockets(self):
+        """Yield every SocketRecord in node order, inputs before outputs"""
+        for node in self.nodes:
+            yield from node.inputs
+            yield from node.outputs
+
+    def get_active_output(self):
+        """Return the NodeRecord of the active Material Output Node"""
+        for node in self.nodes:
+            if node.is_output_node and node.is_active_output:
+                return node
@@ -0,0 +1,202 @@
+# ---------------------------------------------------------------------------------------#
+# ----------------------------------------------------------------------------- HEADER --#
+
+"""
+:author:
+    Jared Webber
+
+:synopsis:
+    On-disk cache of resolved MaterialX import plans
+
+:description:
+    MaterialXNetwork.read_network() builds an ImportPlan of every operation it applies
+    to Blender: nodes to create, socket and parameter values to set, and links to make.
+    The plan is plain Python data, so it is stored as JSON next to the other cached
+    plans. Loading a plan never runs code, unlike unpickling a file.
+
+    Plans are keyed by the absolute path, modification time, size and SHA-1 of the
+    .mtlx file, together with the name of the imported material. Re-importing an
+    unchanged file replays the cached plan. XML parsing and graph traversal are skipped.
+
+    Plans live in a per user directory of the Blender user data, created with mode
+    0o700, or in conf.import_cache_dir. A directory that other users can write to is
+    refused and the cache is skipped. When the cache directory grows beyond
+    conf.import_cache_size bytes, the least recently used plans are evicted.
+
+:applications:
+    Blender 3D
+
+:see_also:
+    ./materialx_network.py -- read_network()
+    ./import_plan.py
+
+:license:
+    see license.txt and EULA.txt
+
+"""
+
+# ---------------------------------------------------------------------------------------#
+# ---------------------------------------------------------------------------- IMPORTS --#
+# Standard Imports
+import os
+import json
+import stat
+import hashlib
+from ... import conf
+from ...utils.io import IO
+
+# Bump when the layout of an import plan changes, so stale plans are never replayed
+plan_version = 4
+plan_extension = '.mtlxplan'
+
+# ---------------------------------------------------------------------------------------#
+# -------------------------------------------------------------------------- FUNCTIONS --#
+def get_cache_dir():
+    """
+    Return the plan cache directory, creating it private to the user on first use
+
+    :return: directory path, or None if the directory is not private to the user
+    :rtype: str
+    """
+    cache_dir = conf.import_cache_dir
+    if not cache_dir:
+        import bpy
+        # Blender 2.79 has no 'CACHE' user resource
+        cache_dir = bpy.utils.user_resource('DATAFILES', path='materialx_import_cache')
+    try:
+        os.makedirs(cache_dir, mode=0o700, exist_ok=True)
+        dir_stat = os.stat(cache_dir)
+    except OSError as e:
+        IO.warning("Cannot create the MaterialX import cache directory: %s", e)
+        return None
+    if not is_private(dir_stat):
+        IO.warning("MaterialX import cache directory %s is writable by other users. "
+                   "Skipping the import cache", cache_dir)
+        return None
+    return cache_dir
+
+
+def is_private(dir_stat):
+    """True if a directory is owned by the user and not writable by group or others"""
+    if not hasattr(os, 'getuid'):
+        # Windows, where the user resource directories are private to the user
+        return True
+    return (dir_stat.st_uid == os.getuid() and
+            not dir_stat.st_mode & (stat.S_IWGRP | stat.S_IWOTH))
+
+
+def hash_file(filepath, chunk_size=1 << 20):
+    """SHA-1 of a file's content"""
+    sha = hashlib.sha1()
+    with open(filepath, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def get_cache_key(filepath, material_name):
+    """
+    Build the cache key of an import
+
+    :param filepath: .mtlx file path
+    :type filepath: str
+
+    :param material_name: name of the imported MaterialX Material
+    :type material_name: str
+
+    :return: key, or None if the file cannot be read
+    :rtype: str
+    """
+    try:
+        filepath = os.path.abspath(filepath)
+        file_stat = os.stat(filepath)
+        content_hash = hash_file(filepath)
+    except OSError:
+        return None
+    key = "%s|%d|%d|%s|%s|%d" % (filepath, file_stat.st_mtime_ns, file_stat.st_size,
+                                 content_hash, material_name, plan_version)
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+
+def get_plan_path(key):
+    """Return the file path of a cached plan, or None if there is no cache directory"""
+    cache_dir = get_cache_dir()
+    if cache_dir is None:
+        return None
+    return os.path.join(cache_dir, key + plan_extension)
+
+
+def load_plan(key):
+    """Return the cached plan of a key, or None on a miss"""
+    if key is None:
+        return None
+    plan_path = get_plan_path(key)
+    if plan_path is None:
+        return None
+    try:
+        with open(plan_path, 'r', encoding='utf-8') as f:
+            plan = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(plan, dict) or plan.get('version') != plan_version:
+        return None
+    os.utime(plan_path, None) # mark as recently used
+    return plan
+
+
+def store_plan(key, plan):
+    """Write a plan to the cache and evict old plans over the size cap"""
+    if key is None:
+        return
+    plan_path = get_plan_path(key)
+    if plan_path is None:
+        return
+    temp_path = "%s.%d.tmp" % (plan_path, os.getpid())
+    try:
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(plan, f, separators=(',', ':'))
+        os.replace(temp_path, plan_path)
+    except (OSError, TypeError, ValueError) as e:
+        IO.warning("Could not cache MaterialX import plan: %s", e)
+        return
+    evict(conf.import_cache_size)
+
+
+def iter_cached_plans():
+    """Yield (path, size, mtime) of every cached plan"""
+    cache_dir = get_cache_dir()
+    if cache_dir is None:
+        return
+    for name in os.listdir(cache_dir):
+        if not name.endswith(plan_extension):
+            continue
+        path = os.path.join(cache_dir, name)
+        try:
+            plan_stat = os.stat(path)
+        except OSError:
+            continue
+        yield path, plan_stat.st_size, plan_stat.st_mtime
+
+
+def get_cache_size():
+    """Total size in bytes of the cached plans"""
+    return sum(size for _path, size, _mtime in iter_cached_plans())
+
+
+def evict(max_size):
+    """Remove the least recently used plans until the cache fits in max_size bytes"""
+    plans = sorted(iter_cached_plans(), key=lambda plan: plan[2])
+    total = sum(plan[1] for plan in plans)
+    for path, size, _mtime in plans:
+        if total <= max_size:
+            break
+        try:
+            os.remove(path)
+            total -= size
+        except OSError:
+            continue
+
+
+def clear_cache():
+    """Remove every cached plan"""
+    evict(0)
@@ -0,0 +1,309 @@
+# ---------------------------------------------------------------------------------------#
+# ----------------------------------------------------------------------------- HEADER --#
+
+"""
+:author:
+    Jared Webber
+
+:synopsis:
+    Pure data import plans built from a read MaterialX Document
+
+:description:
+    Importing a MaterialX Material used to interleave parsing, graph traversal, name
+    resolution, value parsing and bpy mutations. An import is now done in two steps.
+
+    An ImportPlanner turns a MaterialX Material of a DocumentIndex into an ImportPlan.
+    A plan holds plain Python data:
+        nodes       node name -> (bl_idname, location), upstream nodes first
+        values      [(node name, input values, parameter values)]
+        links       unique (from node, output index, to node, input index)
+        outputs     locations of the Material Output node
+        images      filename values of the textures to load
+        stats       counters of the traversal
+
+    The planner never touches bpy, so it can be timed on its own. plan_materials() runs
+    it in conf.import_plan_workers worker threads, off the main thread.
+    MaterialXNetwork.apply_import_plan() then executes the plans against Blender
+    Materials in one batch, on the main thread. Plans round trip through to_data() and
+    from_data(), which is how the import cache stores them.
+
+:applications:
+    Blender 3D
+
+:see_also:
+    ./materialx_network.py -- read_network(), apply_import_plan()
+    ./document_index.py
+    ./import_cache.py
+
+:license:
+    see license.txt and EULA.txt
+
+"""
+
+# ---------------------------------------------------------------------------------------#
+# ---------------------------------------------------------------------------- IMPORTS --#
+# Standard Imports
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from ... import conf
+from ...utils.io import IO
+from . import value_dispatch
+
+# Plan node name standing for the Material Output node of the applied material
+output_node = None
+
+# ---------------------------------------------------------------------------------------#
+# ---------------------------------------------------------------------------- CLASSES --#
+class ImportPlan(object):
+    """Everything an import does to Blender, as plain Python data"""
+    __slots__ = ('material', 'nodes', 'values', 'links', 'outputs', 'images', 'stats')
+
+    def __init__(self, material):
+        self.material = material
+        self.nodes = OrderedDict()
+        self.values = []
+        self.links = OrderedDict() # link -> None, keeps the first of duplicate links
+        self.outputs = []
+        self.images = set()
+        self.stats = {'nodes': 0, 'edges': 0, 'cycles': 0, 'duplicate_links': 0}
+
+    def add_node(self, name, idname, location):
+        self.nodes[name] = (idname, location)
+
+    def add_values(self, name, in_values, param_values):
+        self.values.append((name, in_values, param_values))
+        for _name, mtlx_type, value in param_values:
+            if mtlx_type == 'filename' and value:
+                self.images.add(value)
+
+    def add_link(self, from_node, from_idx, to_node, to_idx):
+        """Add a link by socket index. Links already planned are counted and skipped"""
+        key = (from_node, from_idx, to_node, to_idx)
+        if key in self.links:
+            self.stats['duplicate_links'] += 1
+            return
+        self.links[key] = None
+
+    def to_data(self):
+        """Return the plan as a dict of builtin types"""
+        return {'material': self.material,
+                'nodes': list(self.nodes.items()),
+                'values': self.values,
+                'links': list(self.links),
+                'outputs': self.outputs,
+                'images': sorted(self.images),
+                'stats': self.stats}
+
+    @classmethod
+    def from_data(cls, data):
+        """Rebuild a plan from to_data(), also after a JSON round trip"""
+        plan = cls(data['material'])
+        plan.nodes = OrderedDict((name, tuple(node)) for name, node in data['nodes'])
+        plan.values = data['values']
+        plan.links = OrderedDict((tuple(link), None) for link in data['links'])
+        plan.outputs = data['outputs']
+        plan.images = set(data['images'])
+        plan.stats = data['stats']
+        return plan
+
+
+class ImportPlanner(object):
+    """
+    Builds ImportPlans from the DocumentIndex of one read document. NodeDef values and
+    graph traversals are resolved once and shared by every plan of the planner.
+    Concurrent plan_material() calls may resolve the same entry twice, but never read a
+    partial one.
+    """
+    def __init__(self, index):
+        self.index = index
+        self.node_values = {} # nodedef name -> parsed (input values, parameter values)
+        self.graphs = {} # (node graph name, root node name) -> traverse_upstream() result
+        self.misses = [] # values that cannot be parsed
+
+    def plan_material(self, mtlx_mat):
+        """
+        Plan the node tree of a MaterialX Material of the indexed document
+
+        :param mtlx_mat: the MaterialX Material
+        :type mtlx_mat: MaterialX.Material
+
+        :rtype: ImportPlan
+        """
+        IO.debug("--- MTLX Material: %s ---", mtlx_mat, subsystem='read')
+        debug = IO.is_enabled('DEBUG', 'read')
+        plan = ImportPlan(mtlx_mat.getName())
+        plan_nodes = {} # MTLX element name -> (plan node name, bl_idname)
+        # Get Shader Refs
+        for shader_ref in mtlx_mat.getShaderRefs():
+            IO.debug("Shader Ref: %s", shader_ref, subsystem='read')
+            plan.outputs.append([float(shader_ref.getAttribute('xpos')),
+                                 float(shader_ref.getAttribute('ypos'))])
+
+            # Get the Surface Output
+            #TODO: Implement Support for Volume and Displacement semantics
+            for output in shader_ref.getReferencedOutputs():
+                if output.getName() != "ng_surface_out":
+                    continue
+
+                # Get Edge Connection, i.e. NodeGraph
+                connected_node = output.getConnectedNode()
+                if connected_node is None:
+                    continue
+
+                # Walk the Dataflow Graph once, upstream nodes first
+                IO.info("Traversing Dataflow Graph", subsystem='read')
+                graph_index = self.index.get_node_graph(
+                    connected_node.getParent().getName())
+                if graph_index is None:
+                    IO.warning("Node %s of MaterialX Material %s is not in a Node Graph. "
+                               "Skipping", connected_node.getName(), plan.material,
+                               subsystem='read')
+                    continue
+                order, edges, cycles = self.get_graph(graph_index,
+                                                      connected_node.getName())
+                for name in order:
+                    self.plan_node(plan, plan_nodes, graph_index.nodes[name])
+                root = self.plan_node(plan, plan_nodes, connected_node)
+                plan.add_link(root, 0, output_node, 0)
+                for up_name, down_name, input_name in edges:
+                    # Link Upstream Node TO Downstream Node
+                    down_port_idx = graph_index.get_port_index(down_name, input_name)
+                    if debug:
+                        IO.debug("New Connection: Upstream Node <%s> | TO | "
+                                 "Downstream Node <%s> & Socket <%s>",
+                                 up_name, down_name, down_port_idx, subsystem='read')
+                    plan.add_link(plan_nodes[up_name][0], 0,
+                                  plan_nodes[down_name][0], down_port_idx)
+                plan.stats['nodes'] += len(order)
+                plan.stats['edges'] += len(edges)
+                plan.stats['cycles'] += cycles
+        return plan
+
+    def plan_node(self, plan, plan_nodes, elem):
+        """
+        Plan the Blender node of a MaterialX Element and its values, once per plan
+
+        :return: the plan node name
+        :rtype: str
+        """
+        from .materialx_network import StringResolver
+        from .extension_defs import get_node_class_name
+        elem_name = elem.getName()
+        entry = plan_nodes.get(elem_name)
+        if entry is not None:
+            return entry[0]
+        name = StringResolver.normalize_node_name(
+            StringResolver.from_mtlx_name(elem_name))
+        # Get Blender Information using class id using nodedef name
+        node_def = self.index.get_matching_node_defs(
+            StringResolver.clean_name(elem_name))[0]
+        idname = get_node_class_name(node_def.getName())
+        plan.add_node(name, idname, [float(elem.getAttribute('xpos')),
+                                     float(elem.getAttribute('ypos'))])
+        in_values, param_values = self.get_node_def_values(idname)
+        plan.add_values(name, in_values, param_values)
+        plan_nodes[elem_name] = (name, idname)
+        return name
+
+    def get_node_def_values(self, b_node_id):
+        """
+        Parse the input and parameter values of the NodeDef of a Blender node idname.
+        Every NodeDef is parsed once per planner.
+
+        :return: ([(socket name, mtlx_type, value)], [(param name, mtlx_type, value)])
+        :rtype: tuple
+        """
+        node_def_name = str(b_node_id).lower()
+        values = self.node_values.get(node_def_name)
+        if values is None:
+            #TODO: node.getReferencedNodeDef() is deprecated
+            node_inputs, node_params = self.index.get_node_def_values(node_def_name)
+            in_values = [(to_socket_name(name), mtlx_type, value) for
+                         name, mtlx_type, value in
+                         value_dispatch.parse_values(node_inputs, self.misses)]
+            param_values = value_dispatch.parse_values(node_params, self.misses)
+            values = self.node_values[node_def_name] = (in_values, param_values)
+        return values
+
+    def get_graph(self, graph_index, root_name):
+        """Traverse the graph upstream of a node once per planner"""
+        key = (graph_index.name, root_name)
+        graph = self.graphs.get(key)
+        if graph is None:
+            graph = self.graphs[key] = traverse_upstream(graph_index, root_name)
+        return graph
+
+# ---------------------------------------------------------------------------------------#
+# -------------------------------------------------------------------------- FUNCTIONS --#
+def plan_materials(index, mtlx_mats, workers=None):
+    """
+    Plan MaterialX Materials of one indexed document in worker threads
+
+    :param index: index of the read document
+    :type index: DocumentIndex
+
+    :param mtlx_mats: MaterialX Materials of the document
+    :type mtlx_mats: list
+
+    :return: (ImportPlans in the order of mtlx_mats, [(name, reason)] value misses)
+    :rtype: tuple
+    """
+    planner = ImportPlanner(index)
+    workers = max(1, min(workers or conf.import_plan_workers, len(mtlx_mats)))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        plans = list(executor.map(planner.plan_material, mtlx_mats))
+    return plans, planner.misses
+
+
+def to_socket_name(name):
+    """Blender socket name of a MTLX input name"""
+    from .materialx_network import StringResolver
+    name = StringResolver.normalize_name(name)
+    if name == 'Ior':
+        name = 'IOR'
+    return name
+
+
+def traverse_upstream(graph_index, root_name):
+    """
+    Iteratively walk the nodes upstream of root_name through the index of its Node
+    Graph, visiting every node and every connected input exactly once. Edges that
+    close a cycle are reported and skipped.
+
+    :param graph_index: index of the Node Graph holding root_name
+    :type graph_index: NodeGraphIndex
+
+    :param root_name: name of the most downstream node of the graph
+    :type root_name: str
+
+    :return: (node names in topological order, upstream nodes first,
+              [(upstream node name, downstream node name, input name)],
+              number of skipped cycle edges)
+    :rtype: tuple
+    """
+    order = []
+    edges = []
+    cycles = 0
+    visiting = {root_name} # nodes on the current path
+    done = set()
+    stack = [(root_name, iter(graph_index.get_upstream(root_name)))]
+    while stack:
+        down_name, inputs = stack[-1]
+        for input_name, up_name in inputs:
+            if up_name in visiting:
+                IO.warning("Cycle in MaterialX graph: %s -> %s. Skipping",
+                           up_name, down_name, subsystem='read')
+                cycles += 1
+                continue
+            edges.append((up_name, down_name, input_name))
+            if up_name not in done:
+                visiting.add(up_name)
+                stack.append((up_name, iter(graph_index.get_upstream(up_name))))
+                break
+        else:
+            # Every input is handled, the node follows all of its upstream nodes
+            stack.pop()
+            visiting.discard(down_name)
+            done.add(down_name)
+            order.append(down_name)
+    return order, edges, cycles
@@ -33,25 +33,81 @@ except ImportError:
     print("MaterialX Network Module could not load MaterialX library")
 # Standard Imports
 import os
+import time
+import threading
 # Standard Blender Imports
 import bpy
 from bpy.props import *
+from ... import conf
 from ...utils.io import IO
-
-# Create the default MaterialX Library
+from .graph_ir import GraphIR, get_socket_base_name
+from . import document_cache
+from . import value_dispatch
+from . import texture_prefetch
+from . import import_cache
+from . import export_names
+from ..base_types.base_socket import invalidate_link_index
+from . import import_plan
+from .import_plan import ImportPlan
+
+# The default MaterialX Library, parsed on first use by get_mtlx_std_doc()
 uppath = lambda _path, n: os.sep.join(_path.split(os.sep)[:-n])
 addon_path = uppath(__file__, 3)
 mtlx_std_lib = os.path.join(addon_path, "lib", 'mtlx_lib', 'mx_stdlib_defs.mtlx')
-mtlx_std_doc = mx.createDocument()
-mx.readFromXmlFile(mtlx_std_doc, mtlx_std_lib)
-IO.info("MaterialX Standard Library Loaded. Filepath: %s" % mtlx_std_lib)
+mtlx_std_doc = None # shared by every MaterialXNetwork
+mtlx_std_load_time = None # seconds spent parsing mtlx_std_doc
+mtlx_std_lock = threading.Lock()
 
 # ---------------------------------------------------------------------------------------#
 # -------------------------------------------------------------------------- FUNCTIONS --#
+def get_mtlx_std_doc():
+    """
+    Return the MaterialX Standard Library Document, parsing it once on first use.
+    Safe to call from several threads at the same time.
+
+    :return: document, None if MaterialX is not installed
+    :rtype: MaterialX.Document
+    """
+    global mtlx_std_doc, mtlx_std_load_time
+    if mtlx_std_doc is not None:
+        return mtlx_std_doc
+    with mtlx_std_lock:
+        if mtlx_std_doc is None and mx is not None:
+            start = time.perf_counter()
+            std_doc = mx.createDocument()
+            mx.readFromXmlFile(std_doc, mtlx_std_lib)
+            mtlx_std_load_time = time.perf_counter() - start
+            mtlx_std_doc = std_doc
+            IO.info("MaterialX Standard Library Loaded in %.3fs. Filepath: %s",
+                    mtlx_std_load_time, mtlx_std_lib)
+            if mtlx_std_load_time > conf.std_lib_load_budget:
+                IO.warning("MaterialX Standard Library load exceeded its %.3fs budget",
+                           conf.std_lib_load_budget)
+        elif mx is None:
+            IO.warning("MaterialX is not installed. Standard Library unavailable")
+    return mtlx_std_doc
+
+
 def get_mtlx_net(material):
     """Generate a MaterialXNetwork() class"""
-    network = MaterialXNetwork(material)
+    network = MaterialXNetwork()
+    network.material = material
     return network
+
+def get_batch_materials(pattern=None):
+    """
+    Get every node based Blender Material, optionally filtered by name
+
+    :param pattern: fnmatch style pattern matched against the material names
+    :type pattern: str
+
+    :return: materials
+    :rtype: list
+    """
+    from fnmatch import fnmatchcase
+    return [mat for mat in bpy.data.materials
+            if mat.use_nodes and mat.node_tree is not None
+            and (not pattern or fnmatchcase(mat.name, pattern))]
 # ---------------------------------------------------------------------------------------#
 # ---------------------------------------------------------------------------- CLASSES --#
 class MaterialXNetwork(object):
@@ -86,6 +142,15 @@ class MaterialXNetwork(object):
         self.output_sockets = []
         self.ng_output_sockets = []
         self.mtlx_node_data = set()
+        self.node_data_map = {} # node name -> MtlxCustomNode of the last export
+        self.node_fingerprints = {} # node name -> fingerprint of the last export
+        self.exported_material = None # name of the material held in self.document
+        self.node_def_library = None # NodeDefs shared by every document of a batch
+        self.graph = None # GraphIR of the node tree, captured once per export
+        self.import_stats = None # counters of the last read
+        self.read_index = None # DocumentIndex of read_document
+        self.value_misses = [] # values a read could not apply, reported together
+        self.read_images = {} # filename value -> prefetched bpy.types.Image
         self._sockets = None
         self._socket_count = None
         self._render_engine = None
@@ -95,12 +160,33 @@ class MaterialXNetwork(object):
         """Synchronize any external data and store it in the class instance"""
         self.render_engine = bpy.context.scene.render.engine
 
-    def init_network(self):
-        """Initializes and returns a MaterialX Document() for a Blender Material"""
+    def capture_graph(self):
+        """
+        Capture the nodes, sockets and links of the material's node tree. Starts a new
+        export, so the export names of the previous export are dropped first.
+        """
+        invalidate_link_index(self.node_tree)
+        export_names.clear()
+        self.graph = GraphIR(self.node_tree)
+        return self.graph
+
+    def get_graph(self):
+        """The captured GraphIR, captured now if this network has none yet"""
+        return self.graph or self.capture_graph()
+
+    def init_network(self, keep_document=False):
+        """
+        Initializes and returns a MaterialX Document() for a Blender Material
+
+        :param keep_document: add the material to the current document instead of
+        clearing it first. Used to combine several materials into one document.
+        :type keep_document: bool
+        """
         # Create and Initialize a Document
         IO.info("Initiating Network")
         if self.document is not None:
-            self.document.initialize()
+            if not keep_document:
+                self.document.initialize()
         else:
             self.document = mx.createDocument()
             self.document.initialize()
@@ -108,25 +194,28 @@ class MaterialXNetwork(object):
         self.setup()
         # self.document.importLibrary(mtlx_std_doc.getDocument()) # import standard lib
         doc = self.document
-        IO.info("MaterialX Version: %s|%s" % (doc.getVersionString(),
-                                              mx.getVersionIntegers()))
+        IO.info("MaterialX Version: %s|%s", doc.getVersionString(),
+                mx.getVersionIntegers(), subsystem='write')
         # Every material should have a network
         if self.material:
-            IO.debug("Current Material: %s" % self.material.name)
+            IO.debug("Current Material: %s", self.material.name, subsystem='write')
             # Add a material to do document
             mtlx_mat = doc.addMaterial()
             mtlx_mat.setName(str(self.material.name))
+            self.capture_graph()
             # Grab the currently active output node and store it
             self.output_node = self.active_output
             # Create a custom node def for the Cycles Material Output Node
-            material_output = doc.addNodeDef(name='material_output_def',
-                                             node='material_output',
-                                             type='surfaceshader')
-            # Add inputs to the Node definition
-            surface = material_output.addInput(name='surface', type='surfaceshader')
-            volume = material_output.addInput(name='volume', type='volumeshader')
-            # Create custom TypeDef for displacement output
-            disp = material_output.addInput(name='displacement', type='float')
+            material_output = doc.getNodeDef('material_output_def')
+            if material_output is None:
+                material_output = doc.addNodeDef(name='material_output_def',
+                                                 node='material_output',
+                                                 type='surfaceshader')
+                # Add inputs to the Node definition
+                surface = material_output.addInput(name='surface', type='surfaceshader')
+                volume = material_output.addInput(name='volume', type='volumeshader')
+                # Create custom TypeDef for displacement output
+                disp = material_output.addInput(name='displacement', type='float')
             # Instance a Shader Ref. connect BindInputs to nodes
             mtlx_output = mtlx_mat.addShaderRef('mtlx_output', 'material_output')
             mtlx_output.setAttribute('xpos', str(self.output_node.location[0]))
@@ -141,15 +230,6 @@ class MaterialXNetwork(object):
             ng_disp_out = node_graph.addOutput(name='ng_disp_out', type='float')
             self.ng_output_sockets = [ng_surface_out, ng_volume_out, ng_disp_out]
 
-            # Iterate over each output link
-            for link in self.yield_output_links():
-                out_search = link[3] # look for the TO NODE socket in links
-                # search for the right name
-                out_name = ((str(out_search).split('.', 1)[0]).strip('()_.')).lower()
-                # Set Nodename (which creates a connection in MTLX) for the found socket
-                if out_name == 'surface': ng_surface_out.setNodeName(link[0])
-                elif out_name == 'volume': ng_volume_out.setNodeName(link[0])
-                elif out_name == 'displacement': ng_disp_out.setNodeName(link[0])
             self.node_graph = node_graph
 
             # Add and Connect BindInputs for the MTLX ShaderRef
@@ -167,41 +247,269 @@ class MaterialXNetwork(object):
             # Clear any old node data
             if self.mtlx_node_data:
                 self.mtlx_node_data.clear()
-            self.reset_mtlx_names()
+            self.node_data_map.clear()
+            self.node_fingerprints.clear()
+            self.exported_material = self.material.name
             self.sockets = self.get_sockets()
-            self.socket_count = self.get_socket_count()
-            count = self.socket_count
 
             # Set Node's data: Current Material, and pass in current mtlx doc
             IO.info("Setting Node Data")
-            for node in self.yield_nodes(nodes=self.nodes):
-                self.set_data(node, count)
+            for record in self.graph.nodes:
+                data = self.set_data(record.node)
+                if data is not None:
+                    self.node_data_map[record.name] = data
+            # Output links carry socket names only once every socket has been named
+            self.connect_output_links()
 
         # Return the encoded document
         return doc
 
 
-    def update_network(self):
-        """Update the MaterialXNetwork by re-running its initilization"""
-        self.init_network()
-        IO.info("Updating Network")
-        # Instantiate each node into the Node Graph
-        IO.debug("Instantiating Nodes")
-        data_list = []
-        for data in self.mtlx_node_data:
-            if hasattr(data, 'instantiate'):
-                data.instantiate(self.node_graph)
-                data_list.append(data)
-
-        # Connect each node
-        IO.debug("Connecting Nodes")
-        for data in data_list:
-            self.connect_nodes(data)
+    def update_network(self, incremental=False):
+        """
+        Update the MaterialXNetwork and write it to disk
 
+        :param incremental: only re-emit the nodes that changed since the last export
+        of this material, leaving the rest of the cached document untouched. Falls back
+        to a full rebuild when there is no cached document for the material.
+        :type incremental: bool
+        """
+        self.build_network(incremental=incremental)
         # Write the MaterialXNetwork to disk
         self.write_network()
 
 
+    def build_network(self, incremental=False, keep_document=False):
+        """Build the MaterialX Document of the current material without writing it"""
+        if incremental and self.is_incremental():
+            self.update_changed_nodes()
+        else:
+            self.init_network(keep_document=keep_document)
+            IO.info("Updating Network")
+            # Instantiate each node into the Node Graph
+            IO.debug("Instantiating Nodes")
+            data_list = []
+            for data in self.mtlx_node_data:
+                if hasattr(data, 'instantiate'):
+                    data.instantiate(self.node_graph)
+                    data_list.append(data)
+
+            # Connect each node
+            IO.debug("Connecting Nodes")
+            for data in data_list:
+                self.connect_nodes(data)
+
+            # Fingerprint each node for the next incremental export
+            links = self.get_links_by_node()
+            for name, data in self.node_data_map.items():
+                self.node_fingerprints[name] = self.get_node_fingerprint(
+                    self.graph.get_node(name), data.mtlx_inputs, data.mtlx_outputs,
+                    data.mtlx_params, links.get(data.mtlx_name, ()))
+
+
+    def export_batch(self, materials, filepath=None, directory=None):
+        """
+        Export several Blender Materials in one pass.
+
+        Every NodeDef is only built once per batch. With a filepath all materials are
+        combined into a single document, with a directory every material is written to
+        its own '<material name>.mtlx' file and receives a copy of the shared NodeDefs
+        it uses.
+
+        :param materials: Blender Materials to export
+        :type materials: list
+
+        :param filepath: file path of the combined document
+        :type filepath: str
+
+        :param directory: output directory for one document per material
+        :type directory: str
+
+        :return: written file paths
+        :rtype: list
+        """
+        if not filepath and not directory:
+            raise ValueError("A filepath or a directory is required for batch exports")
+        IO.info("Batch Exporting %d Materials", len(materials), subsystem='write')
+        written = []
+        self.node_def_library = mx.createDocument()
+        try:
+            for idx, material in enumerate(materials):
+                self.material = material
+                if filepath:
+                    # Later materials are added to the first material's document
+                    self.build_network(keep_document=idx > 0)
+                else:
+                    self.build_network()
+                    path = os.path.join(directory, "%s.mtlx" % material.name)
+                    self.write_network(path)
+                    written.append(path)
+            if filepath and materials:
+                self.write_network(filepath)
+                written.append(filepath)
+        finally:
+            self.node_def_library = None
+            # The document no longer holds a single material to update incrementally
+            self.exported_material = None
+        return written
+
+
+
+    def snapshot_network(self):
+        """
+        Capture the current material's node tree as plain Python data.
+
+        The snapshot holds no Blender or MaterialX objects, so it can be turned into a
+        MaterialX Document outside of Blender's main thread.
+        See proteus/workers/mtlx_export_worker.py for its layout.
+
+        :return: snapshot
+        :rtype: dict
+        """
+        self.setup()
+        self.capture_graph()
+        self.output_node = self.active_output
+        engine_classes = self.get_engine_classes()
+        nodes = []
+        for record in self.graph.nodes:
+            node = record.node
+            export_names.set_node_engine(node, engine_classes)
+            self.set_socket_names(node)
+            data = node.mtlx_data(engine_classes)
+            if data is not None:
+                data.material = self.material
+                data.mtlx_network = self
+                nodes.append(data.snapshot())
+        return {
+            'material': str(self.material.name),
+            'output_location': tuple(self.output_node.location),
+            'output_links': [(link[0], link[3]) for link in self.yield_output_links()],
+            'links': sorted(self.iter_node_links()),
+            'nodes': nodes,
+        }
+
+
+    def is_incremental(self):
+        """Check if the cached document can be updated in place for this material"""
+        return (self.document is not None and self.node_graph is not None
+                and self.material is not None
+                and self.exported_material == self.material.name
+                and self.render_engine == bpy.context.scene.render.engine)
+
+
+    def update_changed_nodes(self):
+        """
+        Re-emit the nodedefs, graph nodes and connections of every node whose fingerprint
+        changed since the last export. Unchanged nodes are left as they are in the cached
+        MaterialX document.
+        """
+        IO.info("Updating Network Incrementally")
+        self.setup()
+        self.capture_graph()
+        self.output_node = self.active_output
+        self.mtlx_output.setAttribute('xpos', str(self.output_node.location[0]))
+        self.mtlx_output.setAttribute('ypos', str(self.output_node.location[1]))
+
+        # Socket names have to be resolved before links can be compared
+        for record in self.graph.nodes:
+            self.set_socket_names(record.node)
+        links = self.get_links_by_node()
+
+        # Fingerprint every node and collect the ones that changed
+        engine_classes = self.get_engine_classes()
+        fingerprints = {}
+        changed = []
+        for record in self.graph.nodes:
+            node = record.node
+            export_names.set_node_engine(node, engine_classes)
+            data = node.mtlx_data(engine_classes)
+            if data is None:
+                continue
+            fingerprint = self.get_node_fingerprint(
+                record, data.get_inputs(), data.get_outputs(), data.get_params(),
+                links.get(data.mtlx_name, ()))
+            fingerprints[node.name] = fingerprint
+            if self.node_fingerprints.get(node.name) != fingerprint:
+                changed.append(data)
+        removed = [name for name in self.node_fingerprints if name not in fingerprints]
+        IO.debug("Changed Nodes: %d | Removed Nodes: %d", len(changed), len(removed),
+                 subsystem='write')
+
+        # Drop stale graph nodes. Removed nodes are only referenced by name, their
+        # Blender data no longer exists.
+        stale_defs = set()
+        for name in removed + [data.node.name for data in changed]:
+            mtlx_name = self.to_mtlx_name(name)
+            if self.node_graph.getNode(mtlx_name) is not None:
+                self.node_graph.removeNode(mtlx_name)
+            old_data = self.node_data_map.pop(name, None)
+            if old_data is not None:
+                stale_defs.add(old_data.mtlx_node_def_name)
+
+        # Drop stale nodedefs so they are re-emitted from the changed nodes, and the
+        # nodedefs no remaining node uses any more
+        used_defs = {data.mtlx_node_def_name for data in self.node_data_map.values()}
+        stale_defs = (stale_defs - used_defs) | {data.idname for data in changed}
+        for def_name in stale_defs:
+            if self.document.getNodeDef(def_name) is not None:
+                self.document.removeNodeDef(def_name)
+
+        # Re-emit the changed nodes, then connect them once every graph node exists
+        for data in changed:
+            self.set_mtlx_data(data)
+            self.node_data_map[data.node.name] = data
+        for data in changed:
+            data.instantiate(self.node_graph)
+        for data in changed:
+            self.connect_nodes(data)
+        self.connect_output_links()
+
+        self.mtlx_node_data = set(self.node_data_map.values())
+        self.node_fingerprints = fingerprints
+
+
+    def connect_output_links(self):
+        """Connect the Node Graph outputs to the nodes linked to the Material Output"""
+        ng_surface_out, ng_volume_out, ng_disp_out = self.ng_output_sockets
+        for ng_out in self.ng_output_sockets:
+            if ng_out.hasAttribute('nodename'):
+                ng_out.removeAttribute('nodename')
+        # Iterate over each output link
+        for link in self.yield_output_links():
+            out_search = link[3] # look for the TO NODE socket in links
+            # search for the right name
+            out_name = get_socket_base_name(out_search)
+            # Set Nodename (which creates a connection in MTLX) for the found socket
+            if out_name == 'surface': ng_surface_out.setNodeName(link[0])
+            elif out_name == 'volume': ng_volume_out.setNodeName(link[0])
+            elif out_name == 'displacement': ng_disp_out.setNodeName(link[0])
+
+
+    def get_links_by_node(self):
+        """Group the node links of this Material by the MTLX names of their nodes"""
+        graph = self.get_graph()
+        return {record.mtlx_name: graph.link_index.get_links(record.mtlx_name)
+                for record in graph.nodes}
+
+
+    def get_node_fingerprint(self, record, inputs, outputs, params, links):
+        """
+        Fingerprint a node by its type, location, socket values, parameters and links
+
+        :param record: the node's record in the captured GraphIR
+        :type record: NodeRecord
+
+        :return: fingerprint
+        :rtype: tuple
+        """
+        return (record.bl_idname,
+                record.location,
+                tuple(inputs),
+                tuple(outputs),
+                tuple(params),
+                tuple(sorted(links)))
+
+
     def sort_network(self):
         """Topologically Sort the MaterialXNetwork"""
         # doc = self.document
@@ -211,275 +519,169 @@ class MaterialXNetwork(object):
         pass
 
 
-    def write_network(self):
+    def write_network(self, filepath=None):
         """Write the MaterialXNework to a specified path on disk"""
         IO.info("Writing Network to MaterialX")
-        mx.writeToXmlFile(self.document, self.material.mtlx_props.doc_write)
+        if filepath is None:
+            filepath = self.material.mtlx_props.doc_write
+        mx.writeToXmlFile(self.document, filepath)
 
 
     def read_network(self):
         """
         Read and Create a MaterialX Network from a .mtlx file on disk
         Creates a new Blender Material with the same node graph as from it's source
-        :return: 
+        :return: import statistics, see new_import_stats()
+        :rtype: dict
         """
         if self.read_material is None:
             self.new_material()
 
         # Material Setup
         mat_output = self.reset_material()
-        IO.debug("Reading MTLX from file")
-        # Read document & get material ref
-        self.read_document = mx.createDocument()
-        mx.readFromXmlFile(self.read_document, self.material.mtlx_props.doc_read)
-        mtlx_mat = self.read_document.getMaterial(self.material.name)
-        IO.debug("--- MTLX Material: %s ---" % mtlx_mat)
-        # Get Shader Refs
-        shader_refs = mtlx_mat.getShaderRefs()
-        for shader_ref in shader_refs:
-            IO.debug("Shader Ref: %s" % shader_ref)
-            out_loc = [float(shader_ref.getAttribute('xpos')),
-                       float(shader_ref.getAttribute('ypos'))]
-            self.set_node_location(self.read_material, mat_output, out_loc)
-
-            # Get inputs, outputs, and parameters
-            inputs = shader_ref.getBindInputs()  # unused, should point to outputs
-            params = shader_ref.getBindParams()  # for special properties
-            outputs = shader_ref.getReferencedOutputs()
-
-            # Get the Surface Output
-            #TODO: Implement Support for Volume and Displacement semantics
-            for output in outputs:
-                if output.getName() != "ng_surface_out":
-                    continue
-
-                # Get Edge Connection, i.e. NodeGraph
-                connected_node = output.getConnectedNode()
-                if connected_node is None:
-                    continue
-
-                b_node = self.get_bnode(connected_node)
-                b_node_id = b_node.bl_idname
-                IO.debug(connected_node)
-                #TODO: node.getReferencedNodeDef() is deprecated
-                node_def = self.get_node_def(self.read_document, b_node_id)
-                node_inputs = node_def.getInputs()
-                node_params = node_def.getParameters()
-                self.set_bnode_inputs(node_inputs, b_node)
-                self.set_bnode_params(node_params, b_node)
-                self.read_material.node_tree.links.new(
-                    b_node.outputs[0], mat_output.inputs[0]
-                )
-                # Graph Iterator:
-                IO.info("Traversing Dataflow Graph")
-                for t_edge in connected_node.traverseGraph(mtlx_mat):
-                    IO.info("--- Edge ---")
-
-                    # Get Edge Elements
-                    elem_down = t_edge.getDownstreamElement()
-                    elem_up = t_edge.getUpstreamElement()
-                    elem_connect = t_edge.getConnectingElement()
-
-                    # Print Element Names
-                    IO.debug('Upstream: %s' % elem_up)
-                    IO.debug("Downstream: %s" % elem_down)
-                    IO.debug("Connecting: %s" % elem_connect)
-
-                    # Get Upstream Node And Downstream Node names
-                    down_name = self.normalize_node_name(
-                        self.from_mtlx_name(elem_down.getName())
-                    )
-                    up_name = self.normalize_node_name(
-                        self.from_mtlx_name(elem_up.getName())
-                    )
-                    connect_name = self.normalize_name(elem_connect.getName())
-
-                    # Print Element Names
-                    IO.debug("--- Normalized Element Names ---")
-                    IO.debug(down_name)
-                    IO.debug(up_name)
-                    IO.debug(connect_name)
-
-                    # Find or create new nodes
-                    down_node = self.get_bnode(elem_down)
-                    up_node = self.get_bnode(elem_up)
-                    down_port_idx = int(elem_down.getChildIndex(
-                        elem_connect.getName()))
-
-                    # Print Connection Data
-                    IO.debug("--- Blender Nodes and Connection ---")
-                    IO.debug("New Connection: \n "
-                             "Upstream Node <%s> & Socket <%s> | TO | "
-                             "Downstream Node <%s> & Socket <%s> " %
-                             (
-                                 up_node.name,
-                                 up_node.outputs[0].name,
-                                 down_node.name,
-                                 down_node.inputs[down_port_idx].name)
-                             )
-                    IO.debug("--- Connection Data ---")
-                    IO.debug("Connection Input Name: %s" % elem_connect.getName())
-                    IO.debug("Connection Input Index: %s" % down_port_idx)
-
-                    # Link Upstream Node TO Downstream Node
-                    self.read_material.node_tree.links.new(
-                        up_node.outputs[0],
-                        down_node.inputs[down_port_idx]
-                    )
-                    self.iter_upstream(elem_connect, mtlx_mat)
-
-        IO.info("MaterialX Document Imported")
-
-    def iter_upstream(self, elem, mtlx_mat):
-        """
-        
-        :param elem: Connecting Element (Input) 
-        :param mtlx_mat: 
-        :return: 
-        """
-        connected_node = elem.getConnectedNode()
-        if connected_node is None:
-            return
-        b_node = self.get_bnode(connected_node)
-        b_node_id = b_node.bl_idname
-        IO.debug(connected_node)
-        # TODO: node.getReferencedNodeDef() is deprecated
-        node_def = self.get_node_def(self.read_document, b_node_id)
-        node_inputs = node_def.getInputs()
-        node_params = node_def.getParameters()
-        self.set_bnode_inputs(node_inputs, b_node)
-        self.set_bnode_params(node_params, b_node)
-        for t_edge in elem.traverseGraph(mtlx_mat):
-            IO.info("--- Edge ---")
-            # Get Edge Elements
-            elem_down = t_edge.getDownstreamElement()
-            elem_up = t_edge.getUpstreamElement()
-            elem_connect = t_edge.getConnectingElement()
-            # Print Element Data
-            IO.debug('Upstream: %s' % elem_up)
-            IO.debug("Downstream: %s" % elem_down)
-            IO.debug("Connecting: %s" % elem_connect)
-            # Get Upstream Node And Downstream Node names
-            down_name = self.normalize_node_name(
-                self.from_mtlx_name(elem_down.getName())
-            )
-            up_name = self.normalize_node_name(
-                self.from_mtlx_name(elem_up.getName())
-            )
-            connect_name = self.normalize_name(elem_connect.getName())
-
-            # Print Element Names
-            IO.debug("--- Normalized Element Names ---")
-            IO.debug(down_name)
-            IO.debug(up_name)
-            IO.debug(connect_name)
-
-            # Find or create new nodes
-            down_node = self.get_bnode(elem_down)
-            up_node = self.get_bnode(elem_up)
-            down_port_idx = int(elem_down.getChildIndex(
-                elem_connect.getName()))
-
-            # Print Connection Data
-            IO.debug("--- Blender Nodes and Connection ---")
-            IO.debug("New Connection: \n "
-                     "Upstream Node <%s> & Socket <%s> | TO | "
-                     "Downstream Node <%s> & Socket <%s> " %
-                     (
-                         up_node.name,
-                         up_node.outputs[0].name,
-                         down_node.name,
-                         down_node.inputs[down_port_idx].name)
-                     )
-            IO.debug("--- Connection Data ---")
-            IO.debug("Connection Input Name: %s" % elem_connect.getName())
-            IO.debug("Connection Input Index: %s" % down_port_idx)
-
-            self.read_material.node_tree.links.new(
-                up_node.outputs[0],
-                down_node.inputs[down_port_idx])
-            self.iter_upstream(elem_connect, mtlx_mat)
-
-
-    def set_bnode_inputs(self, inputs, bnode):
-        """
-        Set socket values for input sockets of a Blender Node
-        :param inputs: input_sockets
-        :type inputs: bpy.types.NodeSocket
-        
-        :param bnode: Blender Node
-        :type bnode: bpy.types.Node
-        
-        :return: 
+        self.value_misses = []
+        filepath = bpy.path.abspath(self.material.mtlx_props.doc_read)
+        # Replay the cached plan of an unchanged document
+        plan = None
+        cache_key = None
+        if self.material.mtlx_props.use_import_cache:
+            cache_key = import_cache.get_cache_key(filepath, self.material.name)
+            cached = import_cache.load_plan(cache_key)
+            if cached is not None:
+                IO.info("Replaying cached MaterialX import plan", subsystem='read')
+                try:
+                    plan = ImportPlan.from_data(cached['plan'])
+                except (KeyError, TypeError, ValueError):
+                    IO.warning("Ignoring malformed cached MaterialX import plan",
+                               subsystem='read')
+        self.import_stats = self.new_import_stats(cached=plan is not None)
+        start = time.perf_counter()
+        if plan is None:
+            self.load_read_document(filepath)
+            mtlx_mat = self.read_document.getMaterial(self.material.name)
+            plans, misses = import_plan.plan_materials(self.read_index, [mtlx_mat])
+            plan = plans[0]
+            self.value_misses.extend(misses)
+            if cache_key is not None:
+                import_cache.store_plan(cache_key, {'version': import_cache.plan_version,
+                                                    'material': self.material.name,
+                                                    'plan': plan.to_data()})
+        self.import_stats['plan_time'] = time.perf_counter() - start
+        self.prefetch_textures(plan.images, filepath)
+        self.apply_import_plan(plan, mat_output)
+        self.import_stats['value_misses'] = len(self.value_misses)
+        value_dispatch.report_misses(self.value_misses)
+        IO.info("MaterialX Document Imported. Visited %d nodes and %d edges, "
+                "created %d links, skipped %d duplicates. Planned in %.3fs, "
+                "applied in %.3fs",
+                self.import_stats['nodes'], self.import_stats['edges'],
+                self.import_stats['links'], self.import_stats['duplicate_links'],
+                self.import_stats['plan_time'], self.import_stats['apply_time'],
+                subsystem='read')
+        return self.import_stats
+
+    def read_materials(self, filepath, pattern=None):
         """
-        for node_in in inputs:
-            self.set_socket_value(node_in, bnode)
+        Import the MaterialX Materials of one document, each into a new Blender Material.
+        The document is parsed and indexed once, every material is planned in worker
+        threads before any is applied, and the textures of all plans are prefetched
+        together.
 
+        :param filepath: .mtlx file path
+        :type filepath: str
 
-    def set_bnode_params(self, params, bnode):
-        """
-        Set parameter values for parameters of a Blender Node
-        :param params: input_sockets
-        :type params: bpy.types.NodeSocket
+        :param pattern: fnmatch style pattern matched against the MaterialX material names
+        :type pattern: str
 
-        :param bnode: Blender Node
-        :type bnode: bpy.types.Node
+        :return: import statistics summed over every material, see new_import_stats()
+        :rtype: dict
+        """
+        from fnmatch import fnmatchcase
+        filepath = bpy.path.abspath(filepath)
+        self.import_stats = self.new_import_stats(cached=False)
+        start = time.perf_counter()
+        self.load_read_document(filepath)
+        mtlx_mats = [mtlx_mat for mtlx_mat in self.read_document.getMaterials()
+                     if not pattern or fnmatchcase(mtlx_mat.getName(), pattern)]
+        plans, misses = import_plan.plan_materials(self.read_index, mtlx_mats)
+        self.import_stats['plan_time'] = time.perf_counter() - start
+        self.value_misses = list(misses)
+        self.prefetch_textures(set().union(*(plan.images for plan in plans)), filepath)
+        for plan in plans:
+            self.read_material = bpy.data.materials.new("mtlx_%s" % plan.material)
+            self.read_material.use_nodes = True
+            self.apply_import_plan(plan, self.reset_material())
+        self.import_stats['materials'] = len(plans)
+        self.import_stats['value_misses'] = len(self.value_misses)
+        value_dispatch.report_misses(self.value_misses)
+        IO.info("Imported %d MaterialX Materials from %s", len(plans), filepath,
+                subsystem='read')
+        return self.import_stats
+
+    def load_read_document(self, filepath):
+        """Get the parsed and indexed .mtlx document"""
+        IO.debug("Reading MTLX from file", subsystem='read')
+        self.read_document, self.read_index = document_cache.get_document(filepath)
 
-        :return: 
+    @staticmethod
+    def new_import_stats(cached):
+        """Counters reported by read_network()"""
+        return {'cached': cached, 'materials': 1, 'nodes': 0, 'edges': 0, 'cycles': 0,
+                'links': 0, 'duplicate_links': 0, 'value_misses': 0,
+                'textures': 0, 'broken_textures': 0, 'plan_time': 0.0, 'apply_time': 0.0}
+
+    def prefetch_textures(self, filenames, filepath):
+        """Validate and load the textures of a read before any node is created"""
+        self.read_images, broken = texture_prefetch.prefetch_textures(
+            filenames, os.path.dirname(filepath))
+        self.import_stats['textures'] = len(self.read_images)
+        self.import_stats['broken_textures'] = len(broken)
+
+    def apply_import_plan(self, plan, mat_output):
         """
-        for node_param in params:
-            self.set_param_value(node_param, bnode)
+        Execute an ImportPlan against read_material in one batch: create the nodes, set
+        their values, then create every link
 
+        :param plan: plan built by an ImportPlanner or loaded from the import cache
+        :type plan: ImportPlan
 
-    def get_bnode(self, elem):
-        """
-        Find or create a blender node from a passed in MaterialX Element
-        
-        :param elem: element
-        :type elem: MaterialX.Element
-        
-        :return: Blender Node
-        :rtype: bpy.types.Node
-        """
-        from .extension_defs import get_node_class_name
-        nodes = self.read_material.node_tree.nodes
-        # Check for an existing node in the node tree
-        b_node = nodes.get(self.normalize_node_name(
-            self.from_mtlx_name(elem.getName())), None)
-        if b_node is None:
-            # Get Blender Information using class id using nodedef name
-            node_def = self.read_document.getMatchingNodeDefs(
-                self.clean_name(elem.getName()))[0]
-            # Get the node's idname
-            node_idname = get_node_class_name(node_def.getName())
-            # Create a new node
-            b_node = self.create_bnode(node_idname, elem)
-        return b_node
-
-
-    def create_bnode(self, idname, elem):
+        :param mat_output: the Material Output node of read_material
+        :type mat_output: bpy.types.Node
         """
-        Create a new Blender Node from a passed in MaterialX.Element
-        
-        :param idname: Blender Node bl_idname
-        :type idname: str
-        
-        :param elem: element
-        :type elem: MaterialX.Element
-        
-        :return: Blender Node
-        :rtype: bpy.types.Node
-        """
-        IO.debug("Creating new node")
-        # Create Node
-        b_node = self.read_material.node_tree.nodes.new(idname)
-        # Set Node Name
-        b_node.name = self.normalize_node_name(self.from_mtlx_name(elem.getName()))
-        # Set Graph Position
-        b_node.location = [float(elem.getAttribute('xpos')),
-                           float(elem.getAttribute('ypos'))]
-
-        return b_node
+        start = time.perf_counter()
+        debug = IO.is_enabled('DEBUG', 'read')
+        node_tree = self.read_material.node_tree
+        nodes = node_tree.nodes
+        b_nodes = {import_plan.output_node: mat_output}
+        for location in plan.outputs:
+            self.set_node_location(self.read_material, mat_output, location)
+        for name, (idname, location) in plan.nodes.items():
+            # Reuse a node of the same name already in the node tree
+            b_node = nodes.get(name)
+            if b_node is None:
+                if debug:
+                    IO.debug("Creating new node: %s", name, subsystem='read')
+                b_node = nodes.new(idname)
+                b_node.name = name
+                b_node.location = location
+            b_nodes[name] = b_node
+        for name, in_values, param_values in plan.values:
+            self.apply_bnode_values(b_nodes[name], in_values, param_values)
+        links = node_tree.links
+        for from_name, from_idx, to_name, to_idx in plan.links:
+            links.new(b_nodes[from_name].outputs[from_idx],
+                      b_nodes[to_name].inputs[to_idx])
+        stats = self.import_stats
+        for key, count in plan.stats.items():
+            stats[key] += count
+        stats['links'] += len(plan.links)
+        stats['apply_time'] += time.perf_counter() - start
+
+    def apply_bnode_values(self, b_node, in_values, param_values):
+        """Write parsed input and parameter values to a Blender node"""
+        value_dispatch.apply_socket_values(b_node, in_values, self.value_misses)
+        value_dispatch.apply_param_values(b_node, param_values, self.value_misses,
+                                          self.read_images)
 
 
     def copy_network(self):
@@ -534,27 +736,49 @@ class MaterialXNetwork(object):
     def socket_count(self, value):
         self._socket_count = value
 
-    def set_data(self, node, total_count):
+    def set_data(self, node):
         """Setup the node, and add it to the MaterialXNetwork()"""
-        render_engine_classes = None
         # self.set_unique_socket_name(node)
+        engine_classes = self.get_engine_classes()
+        export_names.set_node_engine(node, engine_classes)
+        self.set_socket_names(node)
+        data = node.mtlx_data(engine_classes)
+        # Check to see if this node has a MTLX Implementation
+        return self.set_mtlx_data(data)
+
+    def get_engine_classes(self):
+        """The render engine key of the custom node classes for the current engine"""
+        render_engine_classes = None
         self.check_engine() # check to make sure our render engine was properly setup
         if self.render_engine == 'CYCLES':
             render_engine_classes = 'CYCLES'
         elif self.render_engine == 'PRMAN_RENDER':
             render_engine_classes = 'PRMAN'
-        node.render_engine = render_engine_classes
-        node_sockets = list(node.inputs) + list(node.outputs)
-        for socket in node_sockets:
-            # current_count = self.socket_count
-            # IO.debug("Current Count: %d" % current_count)
-            s_idx = self.increment_socket(self.socket_count)
-            self.socket_count -= 1
-            socket_name = "%s.%s" % (self.to_mtlx_name(socket.name), s_idx)
-            socket.mtlx_name = socket_name
-        data = node.mtlx_data()
-        # Check to see if this node has a MTLX Implementation
-        self.set_mtlx_data(data)
+        return render_engine_classes
+
+    def set_socket_names(self, node):
+        """
+        Assign a unique mtlx_name to each socket of the node. Names only depend on the
+        socket and its node, see SocketRecord.get_stable_name()
+        """
+        record = self.get_graph().get_node(node.name)
+        for socket in record.sockets:
+            socket.mtlx_name = socket.get_stable_name()
+            export_names.set_socket_name(socket.pointer, socket.mtlx_name)
+
+    def persist_names(self):
+        """
+        Write the export socket names and engine tags of the material's node tree to
+        their RNA properties, so they are saved with the .blend
+
+        :return: number of written properties
+        :rtype: int
+        """
+        self.setup()
+        self.capture_graph()
+        for record in self.graph.nodes:
+            self.set_socket_names(record.node)
+        return export_names.persist(self.graph, self.get_engine_classes())
 
     def set_mtlx_data(self, data):
         """Set a node's MTLX data"""
@@ -562,8 +786,9 @@ class MaterialXNetwork(object):
             IO.debug("Data Created")
             # Set the Custom Node's Material, doc, and pass this class to the node
             data.material = self.material
-            data.doc = data.init_doc()
             data.mtlx_network = self
+            data.link_index = self.get_graph().link_index
+            data.doc = data.init_doc()
             data.setup()
             self.add_data(data)
             return data
@@ -593,37 +818,38 @@ class MaterialXNetwork(object):
 
     def connect_nodes(self, node_data):
         """Read a Node's Data and create the proper Node Links for that Node"""
-        IO.info("Connecting Current Node: %s" % node_data.mtlx_name)
-        # First get active output node and setup it's node links
-        output_node = self.active_output
-        for link in node_data.node_links:
+        IO.debug("Connecting Current Node: %s", node_data.mtlx_name, subsystem='write')
+        debug = IO.is_enabled('DEBUG', 'write')
+        for link in node_data.incoming_links:
             if link[2] == node_data.mtlx_name:
                 # If this is the TO Node
                 graph_node = node_data.mtlx_node_graph.getNode(link[0])
-                IO.debug("'--From' Node & Node Link--")
-                IO.debug("From Node: %s" % graph_node)
-                IO.debug("Link: %s:" % repr(link))
-                IO.debug("To Node: %s" % node_data.mtlx_graph_node)
-                IO.debug("Graph Node Inputs: %s" %
-                         [i.getName() for i in node_data.mtlx_graph_node.getInputs()])
                 # socket_name = (str(link[3]).replace(" ", "_")).lower()
                 socket_name = str(link[3])
-                IO.debug("--Current Socket & Name--")
-                IO.debug("Socket Name: %s" % socket_name)
                 socket = node_data.mtlx_graph_node.getInput(socket_name)
-                IO.debug("Socket: %s" % socket)
+                if debug:
+                    IO.debug("'--From' Node & Node Link--", subsystem='write')
+                    IO.debug("From Node: %s", graph_node, subsystem='write')
+                    IO.debug("Link: %r:", link, subsystem='write')
+                    IO.debug("To Node: %s", node_data.mtlx_graph_node, subsystem='write')
+                    IO.debug("Graph Node Inputs: %s",
+                             [i.getName() for i in node_data.mtlx_graph_node.getInputs()],
+                             subsystem='write')
+                    IO.debug("--Current Socket & Name--", subsystem='write')
+                    IO.debug("Socket Name: %s", socket_name, subsystem='write')
+                    IO.debug("Socket: %s", socket, subsystem='write')
                 socket.setConnectedNode(graph_node)
 
     def iter_node_links(self):
         """Iterate through all node links for this Material"""
-        return {node_link for node_link in self.yield_node_links(self.node_links)}
+        return {node_link for node_link in self.yield_node_links(None)}
 
     def yield_node_links(self, links):
-        """Yield node links for the blender Material"""
+        """Yield node links for the blender Material, from the GraphIR by default"""
         if links is not None:
             yield from self.build_links(links)
         else:
-            yield from self.build_links(self.node_links)
+            yield from (link.as_tuple() for link in self.get_graph().links)
 
     def build_links(self, links):
         """
@@ -636,27 +862,23 @@ class MaterialXNetwork(object):
         for link in links:
             if link.is_valid:
                 link_tuple = (self.to_mtlx_name(link.from_node.name),
-                              link.from_socket.mtlx_name,
+                              export_names.get_socket_name(link.from_socket),
                               self.to_mtlx_name(link.to_node.name),
-                              link.to_socket.mtlx_name)
+                              export_names.get_socket_name(link.to_socket))
                 yield link_tuple
             else:
                 continue
 
     def get_active_output(self):
         """Get the active Material Output Node"""
-        for node in self.yield_nodes(nodes=None):
-            if node.is_output_node is True:
-                if hasattr(node, 'is_active_output'):
-                    if node.is_active_output is True:
-                        return node
-                else:
-                    return node
+        record = self.get_graph().get_active_output()
+        if record is not None:
+            return record.node
 
     def yield_output_links(self):
         """Generator to get all links for the Material Output Node"""
-        yield from [link for link in self.iter_node_links()
-                    if link[2] == self.to_mtlx_name(self.active_output.name)]
+        graph = self.get_graph()
+        yield from graph.link_index.get_incoming(graph.get_active_output().mtlx_name)
 
     '''------------------------------Socket/Connection Methods-------------------------'''
 
@@ -671,8 +893,8 @@ class MaterialXNetwork(object):
 
     def yield_sockets(self):
         """Yield a combined list of all sockets"""
-        sockets = [([i for i in list(node.inputs)]) + ([o for o in list(node.outputs)])
-                   for node in self.nodes]
+        sockets = [[socket.socket for socket in record.sockets]
+                   for record in self.get_graph().nodes]
         yield sockets
 
     def yield_socket_names(self, node, type):
@@ -687,139 +909,20 @@ class MaterialXNetwork(object):
 
     def get_sockets(self):
         """Return a list of sockets in the pattern (node, name, type)"""
-        sockets = []
-        for node in self.nodes:
-            # Loop through sockets, append socket.mtlx_name to lists
-            for socket_name in self.yield_socket_names(node, 'inputs'):
-                sockets.append((node, socket_name, 'input'))
-            for socket_name in self.yield_socket_names(node, 'outputs'):
-                sockets.append((node, socket_name, 'output'))
-        return sockets
-
-    def increment_socket(self, count):
-        """Increment the Node Socket name based on the current count"""
-        idx = ""
-        if count == 0:
-            idx = '000'
-        elif count < 10:
-            idx = str('{}{}').format('00', str(count))
-        elif count < 100:
-            idx = str('{}{}').format('0', str(count))
-        elif count > 100:
-            idx = str(count)
-        if count == 0:
-            idx = str(count)
-        return idx
+        return [(socket.node.node, socket.name, 'output' if socket.is_output else 'input')
+                for socket in self.get_graph().yield_sockets()]
 
     def get_socket_count(self):
-        """Count the total number of sockets in the node tree to create unique sockets"""
-        count = 0
-        for node in self.nodes:
-            if len(node.inputs) > 0:
-                for i_socket in node.inputs:
-                    count += 1
-            if len(node.outputs) > 0:
-                for o_socket in node.outputs:
-                    count += 1
-        return count
-
-
-
-    def set_socket_value(self, node_in, b_node):
-        """
-        Set the socket value of a Blender node based on th MTLX Input() information
-        Args:
-            node_in: MTLX Node Input()
-            b_node: Blender Node
-
-        Returns:
-            None
-        """
-        # Pull info from the MaterialX Input()
-        in_value = node_in.getValue()
-        in_type = node_in.getType()
-        in_name = self.normalize_name(node_in.getName())
-        # in_name = (str(node_in.getName()).replace("_", " ")).title()
-        # Set Socket Value
-        if in_name =='Ior':
-            in_name = 'IOR'
-        if in_type == 'float':
-            try:
-                b_node.inputs[in_name].default_value = float(in_value)
-            except KeyError:
-                print("Blender Node Input not found")
-                # b_node.inputs[(in_name.upper())].default_value = float(in_value)
-        elif "vector" in in_type or "color" in in_type:
-            value = [float(x) for x in str(in_value).split(',')]
-            for i, v in enumerate(value):
-                try:
-                    b_node.inputs[in_name].default_value[i] = v
-                except KeyError:
-                    print("Blender Node Input not found")
-                    # b_node.inputs[(in_name.upper())].default_value[i] = v
-
-    def set_param_value(self, node_param, b_node):
-        """
-        Set the param value of a Blender node based on th MTLX Input() information
-        Args:
-            node_param: MTLX Parameter()
-            b_node: Blender Node
-
-        Returns:
-            None
-        """
-        # Check if the Node has the passed in node_param attribute
-        if hasattr(b_node, node_param.getName()):
-            param_name = node_param.getName()
-            param_type = node_param.getType()
-            param_value = node_param.getValue()
-            # Set the Blender Node parameter
-            if param_type == 'string':
-                try:
-                    setattr(b_node, param_name, param_value)
-                except TypeError:
-                    IO.error("Cannot set the Node's attribute. \n "
-                          "Node: %s.%s; Continuing..." %
-                          (b_node.name, param_name))
-                    pass
-            elif 'float' in param_type:
-                setattr(b_node, param_name,
-                        float(param_value))
-                return
-            elif 'vector' in param_type:
-                setattr(b_node, param_name,
-                        [float(x) for x in param_value])
-                return
-            elif 'color' in param_type:
-                setattr(b_node, param_name,
-                        [float(x) for x in param_value])
-                return
-            elif param_type == 'filename':
-                if param_value == '':
-                    IO.warning("%s.%s is null. "
-                               "Skipping image load" %
-                        (b_node.name, param_name))
-                    return
-                else:
-                    IO.warning("Need to load external file: %s" %
-                           os.path.basename(param_value))
-
-                    image = bpy.data.images.load(param_value, check_existing=True)
-                    b_node.image = image
-                    return
-        else:
-            IO.warning("Parameter {} not found for node {}".format(
-                node_param.getName(), b_node.name))
+        """Count the total number of sockets in the node tree"""
+        return self.get_graph().socket_count
 
     '''-----------------------------------Special Methods--------------------------------'''
 
     def reset_mtlx_names(self):
         """Reset all assigned mtlx_names"""
-        for node in self.nodes:
-            for input in node.inputs:
-                input.mtlx_name = ""
-            for output in node.outputs:
-                output.mtlx_name = ""
+        for socket in self.get_graph().yield_sockets():
+            export_names.set_socket_name(socket.pointer, "")
+            socket.mtlx_name = ""
 
     @staticmethod
     def join_document(cls, mtlx_doc):
@@ -841,6 +944,11 @@ class MaterialXNetwork(object):
 
     '''-----------------------------------Property API---------------------------------'''
 
+    @property
+    def std_doc(self):
+        """The shared MaterialX Standard Library Document"""
+        return get_mtlx_std_doc()
+
     @property
     def node_tree(self):
         """The Blender Material ShaderNodeTree"""
@@ -0,0 +1,210 @@
+# ---------------------------------------------------------------------------------------#
+# ----------------------------------------------------------------------------- HEADER --#
+
+"""
+:author:
+    Jared Webber
+
+:synopsis:
+    Exports Blender Materials to MaterialX with a pool of worker processes
+
+:description:
+    A parallel export runs in two stages:
+        1. Blender's main thread snapshots the node tree of every material into plain
+           Python data through MaterialXNetwork.snapshot_network().
+        2. A persistent pool of worker processes turns the snapshots into MaterialX
+           Documents and writes them to disk.
+
+    The pool is created on first use and kept warm between exports. Every worker
+    receives the nodedef names of the custom shader nodes once, in its initializer,
+    which is all of the extension registry that writing a snapshot needs. Documents are
+    written without the MaterialX Standard Library, so the workers never load it.
+    The worker module is loaded as a top level module, so the workers never import bpy
+    or this addon.
+
+:applications:
+    Blender 3D
+
+:see_also:
+    ../workers/mtlx_export_worker.py
+
+:license:
+    see license.txt and EULA.txt
+
+"""
+
+# ---------------------------------------------------------------------------------------#
+# ---------------------------------------------------------------------------- IMPORTS --#
+# Standard Imports
+import os
+import sys
+import multiprocessing
+# Standard Blender Imports
+import bpy
+from ...utils.io import IO
+from .materialx_network import MaterialXNetwork
+
+# Directory holding the bpy-free worker modules
+worker_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'workers')
+# The persistent worker pool and its number of processes
+export_pool = None
+export_pool_size = 0
+
+# ---------------------------------------------------------------------------------------#
+# -------------------------------------------------------------------------- FUNCTIONS --#
+def get_worker_module():
+    """Import the export worker as a top level module that worker processes can load"""
+    if worker_path not in sys.path:
+        sys.path.append(worker_path)
+    import mtlx_export_worker
+    return mtlx_export_worker
+
+
+def get_shader_def_names():
+    """Nodedef names of the custom shader nodes, which define a surfaceshader output"""
+    from .extension_defs import get_class_registry
+    from .extend_cycles_nodes import CyclesMtlxCustomNode_Shader
+    return frozenset(
+        name.lower() for (prefix, name), cls in get_class_registry().items()
+        if prefix == 'CMCN' and issubclass(cls, CyclesMtlxCustomNode_Shader))
+
+
+def get_default_workers():
+    """Leave one core to Blender's main thread"""
+    return max(1, (os.cpu_count() or 2) - 1)
+
+
+def get_export_pool(workers=None):
+    """
+    Return the warm worker pool, creating it on first use or when its size changes
+
+    :param workers: number of worker processes, defaults to the number of cores - 1
+    :type workers: int
+
+    :return: pool
+    :rtype: multiprocessing.pool.Pool
+    """
+    global export_pool, export_pool_size
+    workers = workers or get_default_workers()
+    if export_pool is not None and export_pool_size == workers:
+        return export_pool
+    shutdown_export_pool()
+    worker = get_worker_module()
+    # Workers are spawned with Blender's Python, not with the Blender executable
+    context = multiprocessing.get_context('spawn')
+    python = getattr(bpy.app, 'binary_path_python', None)
+    if python:
+        context.set_executable(python)
+    IO.info("Starting MaterialX Export Pool with %d workers", workers, subsystem='write')
+    export_pool = context.Pool(processes=workers,
+                               initializer=worker.init_worker,
+                               initargs=(get_shader_def_names(),))
+    export_pool_size = workers
+    return export_pool
+
+
+def shutdown_export_pool():
+    """Stop the worker pool"""
+    global export_pool, export_pool_size
+    if export_pool is not None:
+        export_pool.terminate()
+        export_pool.join()
+    export_pool = None
+    export_pool_size = 0
+
+
+def snapshot_materials(materials):
+    """
+    Snapshot the node trees of the passed in materials on the main thread
+
+    :return: snapshots
+    :rtype: list
+    """
+    network = MaterialXNetwork()
+    snapshots = []
+    for material in materials:
+        network.material = material
+        snapshots.append(network.snapshot_network())
+    return snapshots
+
+
+def export_parallel(materials, directory, workers=None, streaming=False):
+    """
+    Export every material to '<directory>/<material name>.mtlx' with the worker pool
+
+    :param materials: Blender Materials to export
+    :type materials: list
+
+    :param directory: output directory
+    :type directory: str
+
+    :param workers: number of worker processes
+    :type workers: int
+
+    :param streaming: write the XML directly instead of building MaterialX Documents
+    :type streaming: bool
+
+    :return: written file paths
+    :rtype: list
+    """
+    snapshots = snapshot_materials(materials)
+    IO.info("Snapshotted %d Materials", len(snapshots), subsystem='write')
+    if not snapshots:
+        return []
+    worker = get_worker_module()
+    jobs = [(snapshot, os.path.join(directory, "%s.mtlx" % snapshot['material']),
+             streaming) for snapshot in snapshots]
+    return get_export_pool(workers).starmap(worker.export_snapshot, jobs)
+
+
+def export_streaming(materials, directory, compress=False, validate=False,
+                     mismatches=None):
+    """
+    Stream every material to '<directory>/<material name>.mtlx' on the main thread.
+    Each material is snapshotted and written before the next one is captured, so memory
+    use does not grow with the number of materials.
+
+    :param compress: write gzip compressed '.mtlx.gz' files
+    :type compress: bool
+
+    :param validate: compare every streamed file with the MaterialX Document path
+    :type validate: bool
+
+    :param mismatches: collects the names of the validated materials whose streamed XML
+                       differs from the MaterialX Document output
+    :type mismatches: list
+
+    :return: written file paths
+    :rtype: list
+    """
+    worker = get_worker_module()
+    import mtlx_xml_writer
+    shader_defs = get_shader_def_names()
+    if validate:
+        if worker.mx is None:
+            raise ValueError("Validating streamed XML requires the MaterialX library")
+        worker.init_worker(shader_defs)
+    if mismatches is None:
+        mismatches = []
+    network = MaterialXNetwork()
+    extension = '.mtlx.gz' if compress else '.mtlx'
+    written = []
+    for material in materials:
+        network.material = material
+        snapshot = network.snapshot_network()
+        if validate and not worker.validate_snapshot(snapshot):
+            IO.warning("Streamed XML of Material %s differs from its MaterialX Document",
+                       snapshot['material'], subsystem='write')
+            mismatches.append(snapshot['material'])
+        filepath = os.path.join(directory, snapshot['material'] + extension)
+        written.append(mtlx_xml_writer.write_snapshot(snapshot, filepath, shader_defs,
+                                                      compress=compress))
+    if validate:
+        IO.info("Validated %d streamed Materials, %d mismatches", len(written),
+                len(mismatches), subsystem='write')
+    return written
+
+
+def unregister():
+    """Blender's unregister function. Stops the worker pool"""
+    shutdown_export_pool()
@@ -0,0 +1,124 @@
+# ---------------------------------------------------------------------------------------#
+# ----------------------------------------------------------------------------- HEADER --#
+
+"""
+:author:
+    Jared Webber
+
+:synopsis:
+    Validates and loads the textures of a MaterialX import before any node is created
+
+:description:
+    Filename parameters used to be loaded with bpy.data.images.load() the moment the
+    import reached them. One missing texture, or a slow network mount, stalled the
+    whole import.
+
+    An import now collects every filename value first, from the ImportPlan of the
+    material being read. The files are resolved and deduplicated
+    by their real path. A thread pool then stats them and reads their first bytes
+    concurrently. Missing, empty and unreadable files are reported up front. The valid
+    files are loaded in one batch on the main thread, since bpy is not thread safe.
+
+:applications:
+    Blender 3D
+
+:see_also:
+    ./value_dispatch.py -- set_param_image()
+    ./materialx_network.py -- read_network()
+
+:license:
+    see license.txt and EULA.txt
+
+"""
+
+# ---------------------------------------------------------------------------------------#
+# ---------------------------------------------------------------------------- IMPORTS --#
+# Standard Imports
+import os
+from concurrent.futures import ThreadPoolExecutor
+# Standard Blender Imports
+import bpy
+from ... import conf
+from ...utils.io import IO
+
+# Leading bytes of the image formats Blender reads most often
+image_signatures = (
+    b'\x89PNG',         # png
+    b'\xff\xd8\xff',    # jpeg
+    b'v/1\x01',         # openexr
+    b'II*\x00',         # tiff, little endian
+    b'MM\x00*',         # tiff, big endian
+    b'#?RADIANCE',      # hdr
+    b'#?RGBE',          # hdr
+    b'DDS ',            # dds
+    b'BM',              # bmp
+)
+header_size = 16
+
+# ---------------------------------------------------------------------------------------#
+# -------------------------------------------------------------------------- FUNCTIONS --#
+def resolve_path(filename, doc_dir):
+    """Resolve a filename value, relative paths are relative to the .mtlx document"""
+    if filename.startswith('//'):
+        path = bpy.path.abspath(filename)
+    elif os.path.isabs(filename):
+        path = filename
+    else:
+        path = os.path.join(doc_dir, filename)
+    return os.path.normcase(os.path.realpath(path))
+
+
+def probe_file(path):
+    """
+    Stat a texture and read its header. Runs in the prefetch threads, never touches bpy
+
+    :return: (path, error), error is None for a valid texture
+    :rtype: tuple
+    """
+    try:
+        if os.stat(path).st_size == 0:
+            return path, "empty file"
+        with open(path, 'rb') as f:
+            header = f.read(header_size)
+    except OSError as e:
+        return path, e.strerror or str(e)
+    if not header.startswith(image_signatures):
+        IO.debug("Unrecognized image header, leaving it to Blender: %s", path,
+                 subsystem='read')
+    return path, None
+
+
+def prefetch_textures(filenames, doc_dir, workers=None):
+    """
+    Validate every texture concurrently, then load the valid ones in one batch
+
+    :param filenames: filename values of the import, see ImportPlan.images
+    :type filenames: set
+
+    :param doc_dir: directory of the read .mtlx document
+    :type doc_dir: str
+
+    :return: ({filename value: bpy.types.Image}, {filename value: error})
+    :rtype: tuple
+    """
+    resolved = {filename: resolve_path(filename, doc_dir) for filename in filenames}
+    paths = set(resolved.values()) # dedupe values that point at the same file
+    if not paths:
+        return {}, {}
+    workers = min(workers or conf.texture_prefetch_workers, len(paths))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        errors = {path: error for path, error in executor.map(probe_file, paths)}
+    broken = {filename: errors[path] for filename, path in resolved.items()
+              if errors[path] is not None}
+    if broken:
+        IO.warning("%d MaterialX textures cannot be loaded:", len(broken),
+                   subsystem='read')
+        for filename, error in sorted(broken.items()):
+            IO.warning("    %s: %s", filename, error, subsystem='read')
+    # Load each valid file once, on the main thread
+    loaded = {path: bpy.data.images.load(path, check_existing=True)
+              for path, error in errors.items() if error is None}
+    IO.info("Prefetched %d MaterialX textures", len(loaded), subsystem='read')
+    images = {filename: loaded[path] for filename, path in resolved.items()
+              if path in loaded}
+    return images, broken
@@ -0,0 +1,202 @@
+# ---------------------------------------------------------------------------------------#
+# ----------------------------------------------------------------------------- HEADER --#
+
+"""
+:author:
+    Jared Webber
+
+:synopsis:
+    Dispatch tables that parse and apply imported MaterialX values to Blender nodes
+
+:description:
+    The inputs and parameters of a NodeDef are parsed once, from their value strings,
+    into plain Python values. Those values are then written to a Blender node through
+    setters looked up in two tables:
+        socket_setters  (MaterialX type family, NodeSocket.type) -> setter
+        param_setters   (MaterialX type family, RNA property type) -> setter
+
+    Vector and color values are written as one slice assignment instead of one write per
+    component. Filename parameters take the images prefetched by texture_prefetch.
+    Values without a socket, property or setter are collected as misses and reported
+    together by report_misses() at the end of an import.
+
+:applications:
+    Blender 3D
+
+:see_also:
+    ./materialx_network.py -- read_network()
+
+:license:
+    see license.txt and EULA.txt
+
+"""
+
+# ---------------------------------------------------------------------------------------#
+# ---------------------------------------------------------------------------- IMPORTS --#
+from ...utils.io import IO
+
+# ---------------------------------------------------------------------------------------#
+# -------------------------------------------------------------------------- FUNCTIONS --#
+def get_type_family(mtlx_type):
+    """Collapse a MaterialX type, i.e. 'color3' or 'vector2', to its type family"""
+    if 'vector' in mtlx_type:
+        return 'vector'
+    if 'color' in mtlx_type:
+        return 'color'
+    return mtlx_type
+
+
+def parse_float(value):
+    return float(value)
+
+
+def parse_floats(value):
+    return tuple(float(x) for x in value.split(','))
+
+
+def parse_string(value):
+    return value
+
+
+"""Parsers of MaterialX value strings, keyed by type family"""
+
+value_parsers = {
+    'float'     : parse_float,
+    'vector'    : parse_floats,
+    'color'     : parse_floats,
+    'string'    : parse_string,
+    'filename'  : parse_string,
+}
+
+
+def parse_values(elements, misses):
+    """
+    Parse the value strings of MaterialX Inputs or Parameters
+
+    :param elements: MaterialX Inputs or Parameters
+    :type elements: list
+
+    :param misses: collects (element name, reason) for values that cannot be parsed
+    :type misses: list
+
+    :return: [(name, mtlx_type, value)]
+    :rtype: list
+    """
+    parsed = []
+    for elem in elements:
+        name = elem.getName()
+        mtlx_type = elem.getType()
+        parser = value_parsers.get(get_type_family(mtlx_type))
+        if parser is None:
+            continue
+        try:
+            parsed.append((name, mtlx_type, parser(elem.getValueString())))
+        except ValueError:
+            misses.append((name, "cannot parse %s value" % mtlx_type))
+    return parsed
+
+
+def set_socket_scalar(socket, value):
+    socket.default_value = value
+
+
+def set_socket_array(socket, value):
+    """Write as many components as both the socket and the value have, in one write"""
+    size = min(len(socket.default_value), len(value))
+    socket.default_value[:size] = value[:size]
+
+
+def set_param_attr(b_node, name, value, images):
+    setattr(b_node, name, value)
+
+
+def set_param_image(b_node, name, value, images):
+    """Assign the prefetched image of a filename parameter to the node's image pointer"""
+    if value == '':
+        IO.warning("%s.%s is null. Skipping image load", b_node.name, name,
+                   subsystem='read')
+        return
+    image = images.get(value)
+    if image is None:
+        raise ValueError("texture not loaded: %s" % value)
+    b_node.image = image
+
+
+"""Setters of Blender node input sockets, keyed by (type family, NodeSocket.type)"""
+
+socket_setters = {
+    ('float', 'VALUE')      : set_socket_scalar,
+    ('vector', 'VECTOR')    : set_socket_array,
+    ('vector', 'RGBA')      : set_socket_array,
+    ('color', 'RGBA')       : set_socket_array,
+    ('color', 'VECTOR')     : set_socket_array,
+}
+
+"""Setters of Blender node properties, keyed by (type family, RNA property type)"""
+
+param_setters = {
+    ('string', 'STRING')    : set_param_attr,
+    ('string', 'ENUM')      : set_param_attr,
+    ('float', 'FLOAT')      : set_param_attr,
+    ('vector', 'FLOAT')     : set_param_attr,
+    ('color', 'FLOAT')      : set_param_attr,
+    ('filename', 'STRING')  : set_param_attr,
+    ('filename', 'POINTER') : set_param_image,
+}
+
+
+def apply_socket_values(b_node, values, misses):
+    """
+    Write parsed [(socket name, mtlx_type, value)] to the input sockets of a node
+
+    :param misses: collects (node name, socket name, reason) for values not applied
+    :type misses: list
+    """
+    inputs = b_node.inputs
+    for name, mtlx_type, value in values:
+        socket = inputs.get(name)
+        if socket is None:
+            misses.append((b_node.name, name, "input not found"))
+            continue
+        setter = socket_setters.get((get_type_family(mtlx_type), socket.type))
+        if setter is None:
+            misses.append((b_node.name, name, "no setter for %s on a %s socket" %
+                           (mtlx_type, socket.type)))
+            continue
+        setter(socket, value)
+
+
+def apply_param_values(b_node, values, misses, images=None):
+    """
+    Write parsed [(property name, mtlx_type, value)] to the properties of a node
+
+    :param misses: collects (node name, property name, reason) for values not applied
+    :type misses: list
+
+    :param images: prefetched images keyed by filename value
+    :type images: dict
+    """
+    properties = b_node.bl_rna.properties
+    for name, mtlx_type, value in values:
+        prop = properties.get(name)
+        if prop is None:
+            misses.append((b_node.name, name, "parameter not found"))
+            continue
+        setter = param_setters.get((get_type_family(mtlx_type), prop.type))
+        if setter is None:
+            misses.append((b_node.name, name, "no setter for %s on a %s property" %
+                           (mtlx_type, prop.type)))
+            continue
+        try:
+            setter(b_node, name, value, images or {})
+        except (TypeError, ValueError) as e:
+            misses.append((b_node.name, name, str(e)))
+
+
+def report_misses(misses):
+    """Report every value an import could not apply, in one block"""
+    if not misses:
+        return
+    IO.warning("%d imported values could not be applied", len(misses), subsystem='read')
+    for miss in misses:
+        IO.warning("    %s", ': '.join(miss), subsystem='read')
@@ -26,6 +26,7 @@
 import bpy
 from bpy.props import *
 from ...base_types.base_node import CustomCyclesNode, GroupNodeStruct
+from ...base_types.base_node import refresh_node_type_table
 import nodeitems_utils
 from nodeitems_utils import NodeCategory, NodeItem
 from ....utils.io import IO
@@ -133,9 +134,11 @@ node_categories = [
 
 def register():
     nodeitems_utils.register_node_categories("SH_MDL_NODES", node_categories)
+    refresh_node_type_table()
 
 
 
 def unregister():
     nodeitems_utils.unregister_node_categories("SH_MDL_NODES")
+    refresh_node_type_table()
 
@@ -25,6 +25,10 @@
 # ---------------------------------------------------------------------------- IMPORTS --#
 
 import bpy
+from bpy.props import *
+from ..network import import_cache
+from ..network import document_cache
+from ..network.materialx_network import MaterialXNetwork
 
 # ---------------------------------------------------------------------------------------#
 # -------------------------------------------------------------------------- FUNCTIONS --#
@@ -42,6 +46,82 @@ class MtlxReadOperator(bpy.types.Operator):
         network = material.mtlx_network
         # network.read_material = None
         network.material = material
-        network.read_network()
+        stats = network.read_network()
+        self.report({'INFO'}, "Imported %s%s: %d nodes, %d edges visited, "
+                              "%d links created, %d duplicates skipped" %
+                    (material.name, " from the plan cache" if stats['cached'] else "",
+                     stats['nodes'], stats['edges'], stats['links'],
+                     stats['duplicate_links']))
+        if stats['cycles']:
+            self.report({'WARNING'}, "Skipped %d cyclic connections" % stats['cycles'])
+        if stats['broken_textures']:
+            self.report({'WARNING'}, "%d textures are missing or unreadable" %
+                        stats['broken_textures'])
+        if stats['value_misses']:
+            self.report({'WARNING'}, "%d values could not be applied, see the console" %
+                        stats['value_misses'])
 
+        return {'FINISHED'}
+
+
+class MtlxBatchReadOperator(bpy.types.Operator):
+    bl_idname = 'mtlx_operator.batch_read'
+    bl_label = 'Batch Read MaterialX'
+
+    filepath = StringProperty(
+        name='File Path',
+        description='MaterialX Document holding the materials to import',
+        subtype='FILE_PATH'
+    )
+    name_filter = StringProperty(
+        name='Filter',
+        description='Only import materials whose name matches this pattern, i.e. "hero_*"',
+        default=''
+    )
+
+    def invoke(self, context, event):
+        material = context.active_object.active_material
+        if material is not None and not self.filepath:
+            self.filepath = material.mtlx_props.doc_read
+        return context.window_manager.invoke_props_dialog(self)
+
+    def draw(self, context):
+        layout = self.layout
+        layout.prop(self, 'filepath')
+        layout.prop(self, 'name_filter')
+
+    def execute(self, context):
+        if not self.filepath:
+            self.report({'ERROR'}, "A MaterialX Document is required")
+            return {'CANCELLED'}
+        network = MaterialXNetwork()
+        stats = network.read_materials(self.filepath, self.name_filter)
+        self.report({'INFO'}, "Imported %d Materials: %d nodes, %d links created" %
+                    (stats['materials'], stats['nodes'], stats['links']))
+        if stats['broken_textures']:
+            self.report({'WARNING'}, "%d textures are missing or unreadable" %
+                        stats['broken_textures'])
+        return {'FINISHED'}
+
+
+class MtlxInvalidateDocumentCacheOperator(bpy.types.Operator):
+    bl_idname = 'mtlx_operator.invalidate_document_cache'
+    bl_label = 'Invalidate Document Cache'
+
+    def execute(self, context):
+        entries = len(document_cache.document_cache)
+        document_cache.invalidate()
+        self.report({'INFO'}, "Dropped %d cached MaterialX Documents" % entries)
+        return {'FINISHED'}
+
+
+class MtlxClearImportCacheOperator(bpy.types.Operator):
+    bl_idname = 'mtlx_operator.clear_import_cache'
+    bl_label = 'Clear Import Cache'
+
+    def execute(self, context):
+        size = import_cache.get_cache_size()
+        import_cache.clear_cache()
+        self.report({'INFO'}, "Cleared %.1f MB of cached import plans" %
+                    (size / (1024.0 * 1024.0)))
         return {'FINISHED'}
\ No newline at end of file
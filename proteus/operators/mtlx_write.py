@@ -25,6 +25,9 @@
 # ---------------------------------------------------------------------------- IMPORTS --#
 
 import bpy
+from bpy.props import *
+from ..network.materialx_network import MaterialXNetwork, get_batch_materials
+from ..network.parallel_export import export_parallel, export_streaming
 
 # ---------------------------------------------------------------------------------------#
 # -------------------------------------------------------------------------- FUNCTIONS --#
@@ -41,7 +44,126 @@ class MtlxWriteOperator(bpy.types.Operator):
         material = context.active_object.material_slots[mat_idx].material
         network = material.mtlx_network
         network.material = material
-        network.init_network()
-        network.update_network()
+        network.update_network(incremental=material.mtlx_props.incremental_export)
 
+        return {'FINISHED'}
+
+
+class MtlxPersistNamesOperator(bpy.types.Operator):
+    bl_idname = 'mtlx_operator.persist_names'
+    bl_label = 'Persist MTLX Names'
+
+    def execute(self, context):
+        mat_idx = context.active_object.active_material_index
+        material = context.active_object.material_slots[mat_idx].material
+        network = material.mtlx_network
+        network.material = material
+        written = network.persist_names()
+        self.report({'INFO'}, "Persisted %d MTLX names of %s" % (written, material.name))
+        return {'FINISHED'}
+
+
+class MtlxBatchWriteOperator(bpy.types.Operator):
+    bl_idname = 'mtlx_operator.batch_write'
+    bl_label = 'Batch Write MaterialX'
+
+    name_filter = StringProperty(
+        name='Filter',
+        description='Only export materials whose name matches this pattern, i.e. "hero_*"',
+        default=''
+    )
+    mode = EnumProperty(
+        name='Mode',
+        items=[('COMBINED', 'Combined', 'Write every material to one document'),
+               ('PER_MATERIAL', 'Per Material', 'Write one document per material')],
+        default='COMBINED'
+    )
+    filepath = StringProperty(
+        name='File Path',
+        description='Combined MaterialX Document Write Filepath',
+        subtype='FILE_PATH'
+    )
+    directory = StringProperty(
+        name='Directory',
+        description='Output directory for one MaterialX Document per material',
+        subtype='DIR_PATH'
+    )
+    use_processes = BoolProperty(
+        name='Parallel',
+        description='Write the documents with a pool of worker processes',
+        default=False
+    )
+    workers = IntProperty(
+        name='Workers',
+        description='Number of worker processes, 0 uses every core but one',
+        default=0,
+        min=0
+    )
+    use_streaming = BoolProperty(
+        name='Stream XML',
+        description='Write the XML directly instead of building MaterialX Documents',
+        default=False
+    )
+    compress = BoolProperty(
+        name='Compress',
+        description='Write gzip compressed .mtlx.gz files when streaming',
+        default=False
+    )
+    validate = BoolProperty(
+        name='Validate',
+        description='Compare the streamed XML with the MaterialX Document output',
+        default=False
+    )
+
+    def invoke(self, context, event):
+        return context.window_manager.invoke_props_dialog(self)
+
+    def draw(self, context):
+        layout = self.layout
+        layout.prop(self, 'name_filter')
+        layout.prop(self, 'mode', expand=True)
+        if self.mode == 'COMBINED':
+            layout.prop(self, 'filepath')
+        else:
+            layout.prop(self, 'directory')
+            row = layout.row()
+            row.prop(self, 'use_processes')
+            row.prop(self, 'workers')
+            row = layout.row()
+            row.prop(self, 'use_streaming')
+            if self.use_streaming and not self.use_processes:
+                row.prop(self, 'compress')
+                row.prop(self, 'validate')
+
+    def execute(self, context):
+        materials = get_batch_materials(self.name_filter)
+        network = MaterialXNetwork()
+        mismatches = []
+        try:
+            if self.mode == 'COMBINED':
+                written = network.export_batch(materials,
+                                               filepath=bpy.path.abspath(self.filepath))
+            elif self.use_processes:
+                if not self.directory:
+                    raise ValueError("A directory is required for parallel exports")
+                written = export_parallel(materials, bpy.path.abspath(self.directory),
+                                          workers=self.workers or None,
+                                          streaming=self.use_streaming)
+            elif self.use_streaming:
+                if not self.directory:
+                    raise ValueError("A directory is required for streaming exports")
+                written = export_streaming(materials, bpy.path.abspath(self.directory),
+                                           compress=self.compress, validate=self.validate,
+                                           mismatches=mismatches)
+            else:
+                written = network.export_batch(materials,
+                                               directory=bpy.path.abspath(self.directory))
+        except ValueError as e:
+            self.report({'ERROR'}, str(e))
+            return {'CANCELLED'}
+        if mismatches:
+            self.report({'WARNING'}, "Streamed XML differs from the MaterialX Document "
+                        "for %d Materials: %s" % (len(mismatches), ', '.join(mismatches)))
+        self.report({'INFO'}, "Exported %d Materials to %d Files" %
+                    (len(materials), len(written)))
         return {'FINISHED'}
\ No newline at end of file
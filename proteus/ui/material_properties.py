@@ -27,6 +27,9 @@
 import bpy
 from bpy.props import *
 from ...utils.io import catch_registration_error
+from ..network import document_cache
+from ..base_types.base_socket import get_socket_registry_size
+from ... import conf
 # ---------------------------------------------------------------------------------------#
 # -------------------------------------------------------------------------- FUNCTIONS --#
 
@@ -48,11 +51,21 @@ class MaterialXProperties(bpy.types.PropertyGroup):
             description='MaterialX Document Write Filepath',
             subtype='FILE_PATH'
         )
+        cls.incremental_export = bpy.props.BoolProperty(
+            name='Incremental Export',
+            description='Only re-export the nodes that changed since the last export',
+            default=False
+        )
         cls.doc_read = bpy.props.StringProperty(
             name='Read Path',
             description='MaterialX Document Read Filepath',
             subtype='FILE_PATH'
         )
+        cls.use_import_cache = bpy.props.BoolProperty(
+            name='Use Import Cache',
+            description='Replay the cached import of unchanged MaterialX Documents',
+            default=False
+        )
 
     @classmethod
     @catch_registration_error
@@ -75,7 +88,27 @@ class MaterialXPanel(bpy.types.Panel):
         row = layout.row()
         row.prop(material.mtlx_props, 'doc_read', text='Read Path')
         row = layout.row()
+        row.prop(material.mtlx_props, 'incremental_export')
+        row.operator('mtlx_operator.persist_names')
+        row = layout.row()
         row.operator('mtlx_operator.write')
+        row.operator('mtlx_operator.batch_write')
+        row = layout.row()
+        row.prop(material.mtlx_props, 'use_import_cache')
+        row.operator('mtlx_operator.clear_import_cache')
         row = layout.row()
         row.operator('mtlx_operator.read')
+        row.operator('mtlx_operator.batch_read')
+        info = document_cache.get_cache_info()
+        row = layout.row()
+        row.label("Document Cache: %d hits, %d misses, %d/%d entries" %
+                  (info['hits'], info['misses'], info['entries'],
+                   conf.document_cache_entries))
+        row.operator('mtlx_operator.invalidate_document_cache', text='',
+                     icon='FILE_REFRESH')
+        registries = get_socket_registry_size()
+        row = layout.row()
+        row.label("Socket Registries: %d alt ids, %d color overrides, %d pruned" %
+                  (registries['alt_socket_ids'], registries['socket_color_override'],
+                   registries['pruned']))
 
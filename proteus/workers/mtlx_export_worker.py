@@ -0,0 +1,182 @@
+# ---------------------------------------------------------------------------------------#
+# ----------------------------------------------------------------------------- HEADER --#
+
+"""
+:author:
+    Jared Webber
+
+:synopsis:
+    Builds and writes MaterialX Documents from node tree snapshots in worker processes
+
+:description:
+    This module runs outside of Blender. It must only import the standard library and
+    MaterialX, so it can be loaded by the worker processes of a parallel export.
+
+    The main thread captures each material's node tree as plain Python data with
+    MaterialXNetwork.snapshot_network(). The functions in this module turn those
+    snapshots into MaterialX Documents, following the same steps as MaterialXNetwork.
+    NodeDefs and graph nodes are written by mtlx_serializer, the serializer MtlxCustomNode
+    uses inside Blender.
+
+    Snapshot layout:
+        {'material': material name,
+         'output_location': (x, y) of the active Material Output node,
+         'output_links': [(from_node, to_socket)] links to the Material Output node,
+         'links': [(from_node, from_socket, to_node, to_socket)],
+         'nodes': [{'name', 'idname', 'node', 'type', 'target', 'location',
+                    'inputs', 'outputs', 'params'}]}
+
+:applications:
+    Blender 3D
+
+:see_also:
+    ../network/parallel_export.py
+
+:license:
+    see license.txt and EULA.txt
+
+"""
+
+# ---------------------------------------------------------------------------------------#
+# ---------------------------------------------------------------------------- IMPORTS --#
+try:
+    import MaterialX as mx
+except ImportError:
+    mx = None
+    print("MaterialX export worker could not load MaterialX library")
+# Loaded from the package inside Blender, as a top level module in worker processes
+try:
+    from . import mtlx_serializer
+    from . import mtlx_xml_writer
+except ImportError:
+    import mtlx_serializer
+    import mtlx_xml_writer
+
+# Per process state, set up once by init_worker()
+shader_defs = frozenset() # nodedef names of the custom shader nodes
+
+# ---------------------------------------------------------------------------------------#
+# -------------------------------------------------------------------------- FUNCTIONS --#
+def init_worker(shader_def_names):
+    """
+    Worker process initializer. Receives the extension registry once, so every export
+    handled by this process starts warm.
+
+    :param shader_def_names: nodedef names of the custom shader node classes
+    :type shader_def_names: frozenset
+    """
+    global shader_defs
+    shader_defs = frozenset(shader_def_names)
+
+
+def export_snapshot(snapshot, filepath, streaming=False):
+    """
+    Write the MaterialX Document of a snapshot to filepath
+
+    :param streaming: write the XML directly with mtlx_xml_writer instead of building a
+                      MaterialX Document
+    :type streaming: bool
+    """
+    if streaming:
+        return mtlx_xml_writer.write_snapshot(snapshot, filepath, shader_defs)
+    doc = build_document(snapshot)
+    mx.writeToXmlFile(doc, filepath)
+    return filepath
+
+
+def validate_snapshot(snapshot):
+    """
+    Compare the streamed XML of a snapshot with the XML of its MaterialX Document.
+    Callers report mismatches, this module does not log.
+
+    :return: True if both writers produce the same text
+    :rtype: bool
+    """
+    expected = mx.writeToXmlString(build_document(snapshot))
+    return mtlx_xml_writer.to_string(snapshot, shader_defs) == expected
+
+
+def build_document(snapshot):
+    """
+    Build a MaterialX Document from a node tree snapshot
+
+    :param snapshot: snapshot created by MaterialXNetwork.snapshot_network()
+    :type snapshot: dict
+
+    :return: document
+    :rtype: MaterialX.Document
+    """
+    doc = mx.createDocument()
+    doc.initialize()
+    node_graph = create_material(doc, snapshot)
+    # NodeDefs first, then graph nodes, then the connections between them
+    for node in snapshot['nodes']:
+        create_node_def(doc, node)
+    for node in snapshot['nodes']:
+        create_graph_node(node_graph, node)
+    for link in snapshot['links']:
+        connect_link(node_graph, link)
+    return doc
+
+
+def create_material(doc, snapshot):
+    """Add the Material, the material_output NodeDef and the Node Graph to doc"""
+    material_name = snapshot['material']
+    mtlx_mat = doc.addMaterial()
+    mtlx_mat.setName(material_name)
+    material_output = doc.addNodeDef(name='material_output_def',
+                                     node='material_output',
+                                     type='surfaceshader')
+    material_output.addInput(name='surface', type='surfaceshader')
+    material_output.addInput(name='volume', type='volumeshader')
+    material_output.addInput(name='displacement', type='float')
+    mtlx_output = mtlx_mat.addShaderRef('mtlx_output', 'material_output')
+    mtlx_output.setAttribute('xpos', str(snapshot['output_location'][0]))
+    mtlx_output.setAttribute('ypos', str(snapshot['output_location'][1]))
+    # Node Graph and its outputs
+    node_graph = doc.addNodeGraph("ng_%s" % material_name)
+    node_graph.setNodeDef(material_output)
+    ng_outputs = {
+        'surface': node_graph.addOutput(name='ng_surface_out', type='surfaceshader'),
+        'volume': node_graph.addOutput(name='ng_volume_out', type='volumeshader'),
+        'displacement': node_graph.addOutput(name='ng_disp_out', type='float'),
+    }
+    for from_node, to_socket in snapshot['output_links']:
+        out_name = ((str(to_socket).split('.', 1)[0]).strip('()_.')).lower()
+        if out_name in ng_outputs:
+            ng_outputs[out_name].setNodeName(from_node)
+    # BindInputs of the ShaderRef
+    for bind_name, bind_type, ng_name in (('surface', 'surfaceshader', 'surface'),
+                                         ('volume', 'volumeshader', 'volume'),
+                                         ('displacement', 'float', 'displacement')):
+        bind_input = mtlx_output.addBindInput(bind_name, bind_type)
+        bind_input.setNodeGraphString(node_graph.getName())
+        bind_input.setConnectedOutput(ng_outputs[ng_name])
+    return node_graph
+
+
+def create_node_def(doc, node):
+    """Add the NodeDef of a snapshot node to doc, unless it is already defined"""
+    if doc.getNodeDef(node['idname']) is not None:
+        return
+    mtlx_serializer.add_node_def(doc, node['idname'], node['node'], node['type'],
+                                 node['target'], node['inputs'], node['outputs'],
+                                 node['params'], shader=node['idname'] in shader_defs)
+
+
+def create_graph_node(node_graph, node):
+    """Instantiate a snapshot node into the Node Graph"""
+    return mtlx_serializer.add_graph_node(node_graph, node['node'], node['name'],
+                                          node['type'], node['location'],
+                                          node['inputs'], node['params'])
+
+
+def connect_link(node_graph, link):
+    """Connect a (from_node, from_socket, to_node, to_socket) link in the Node Graph"""
+    to_node = node_graph.getNode(link[2])
+    from_node = node_graph.getNode(link[0])
+    if to_node is None or from_node is None:
+        return
+    socket = to_node.getInput(str(link[3]))
+    if socket is not None:
+        socket.setConnectedNode(from_node)
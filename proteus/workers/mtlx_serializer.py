@@ -0,0 +1,122 @@
+# ---------------------------------------------------------------------------------------#
+# ----------------------------------------------------------------------------- HEADER --#
+
+"""
+:author:
+    Jared Webber
+
+:synopsis:
+    Writes captured node data into MaterialX NodeDefs and Node Graph nodes
+
+:description:
+    The one serializer of custom node data, shared by MtlxCustomNode inside Blender and
+    by the export workers outside of it. Like the rest of this package it only imports
+    the standard library, so worker processes can load it as a top level module.
+
+    Node data is passed in the layout of MtlxCustomNode:
+        inputs      [(socket name, mtlx type, value, mtlx_name)]
+        outputs     [(socket name, mtlx type, value, mtlx_name)]
+        parameters  [(param name, mtlx type, value)]
+
+    Problems are logged to the 'materialx.write' logger, the 'write' subsystem of IO.
+
+:applications:
+    Blender 3D
+
+:see_also:
+    ../network/base_extensions.py -- MtlxCustomNode
+    ./mtlx_export_worker.py
+
+:license:
+    see license.txt and EULA.txt
+
+"""
+
+# ---------------------------------------------------------------------------------------#
+# ---------------------------------------------------------------------------- IMPORTS --#
+# Standard Imports
+import logging
+
+logger = logging.getLogger('materialx.write')
+
+# ---------------------------------------------------------------------------------------#
+# -------------------------------------------------------------------------- FUNCTIONS --#
+def add_node_def(doc, name, node, node_type, target, inputs, outputs, parameters,
+                 shader=False):
+    """
+    Add the NodeDef of a custom node to a MaterialX Document
+
+    :param shader: shader nodes only define their inputs, their output is the
+                   surfaceshader type of the NodeDef
+    :type shader: bool
+
+    :return: node_def
+    :rtype: MaterialX.NodeDef
+    """
+    node_def = doc.addNodeDef(name=name, node=node,
+                              type='surfaceshader' if shader else node_type)
+    node_def.setTarget(target)
+    create_inputs(node_def, inputs)
+    if not shader:
+        create_outputs(node_def, outputs)
+    create_parameters(node_def, parameters)
+    return node_def
+
+
+def create_inputs(element, inputs):
+    """Add inputs, with their values, to a NodeDef"""
+    for input in inputs:
+        in_value, in_mtlx_name = input[2], input[3]
+        try:
+            mtlx_input = element.addInput(name=in_mtlx_name, type=input[1])
+        except LookupError:
+            logger.warning("Input %s of %s is not unique. Skipping",
+                           in_mtlx_name, element.getName())
+            continue
+        if in_value is not None:
+            try:
+                mtlx_input.setValue(in_value, input[1])
+            except IndexError:
+                continue
+
+
+def create_outputs(node_def, outputs):
+    """Add outputs to a NodeDef. Nodes with several outputs are 'multioutput'"""
+    if len(outputs) > 1:
+        node_def.setType('multioutput')
+    for output in outputs:
+        node_def.addOutput(name=output[3], type=output[1])
+
+
+def create_parameters(element, parameters):
+    """Add parameters, with their values, to a NodeDef or a Node"""
+    for parameter in parameters or ():
+        element.addParameter(name=parameter[0], type=parameter[1])
+        element.setParameterValue(parameter[0], parameter[2], parameter[1])
+
+
+def add_graph_node(node_graph, node, name, node_type, location, inputs, parameters):
+    """
+    Instantiate a custom node into a MaterialX Node Graph
+
+    :return: graph_node
+    :rtype: MaterialX.Node
+    """
+    graph_node = node_graph.addNode(node, name=name, typeString=node_type)
+    graph_node.setAttribute('xpos', str(location[0]))
+    graph_node.setAttribute('ypos', str(location[1]))
+    create_graph_inputs(graph_node, inputs)
+    create_parameters(graph_node, parameters)
+    return graph_node
+
+
+def create_graph_inputs(graph_node, inputs):
+    """Add inputs bound to the interface of the same name to a Node Graph node"""
+    for input in inputs:
+        try:
+            new_input = graph_node.addInput(name=input[3], type=input[1])
+        except LookupError:
+            logger.warning("Input %s of %s is not unique. Skipping",
+                           input[3], graph_node.getName())
+            continue
+        new_input.setInterfaceName(input[3])
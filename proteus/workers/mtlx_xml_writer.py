@@ -0,0 +1,264 @@
+# ---------------------------------------------------------------------------------------#
+# ----------------------------------------------------------------------------- HEADER --#
+
+"""
+:author:
+    Jared Webber
+
+:synopsis:
+    Streams MaterialX XML straight from node tree snapshots
+
+:description:
+    Building a MaterialX Document costs one Python to C++ binding call for every
+    NodeDef, Input, value and attribute, followed by a call to mx.writeToXmlFile.
+    For large batch exports those calls take most of the export time.
+
+    This writer skips the Document. It walks a snapshot created by
+    MaterialXNetwork.snapshot_network() and yields the .mtlx text element by element,
+    in the order mtlx_export_worker.build_document() creates the elements. The text is
+    formatted the way the MaterialX XML writer (pugixml) formats it:
+        - an '<?xml version="1.0"?>' declaration
+        - two space indentation
+        - attributes in the order they were set
+        - empty elements closed with ' />'
+    Only one element is held in memory at a time. Output goes to a buffered file, or
+    to a gzip stream for '.gz' paths.
+
+    The Document path in mtlx_export_worker is still the reference implementation.
+    Use mtlx_export_worker.validate_snapshot() to compare the two for a snapshot.
+
+    Like mtlx_export_worker, this module only imports the standard library, so worker
+    processes can load it.
+
+:applications:
+    Blender 3D
+
+:see_also:
+    ./mtlx_export_worker.py
+    ../network/parallel_export.py
+
+:license:
+    see license.txt and EULA.txt
+
+"""
+
+# ---------------------------------------------------------------------------------------#
+# ---------------------------------------------------------------------------- IMPORTS --#
+import io
+import gzip
+
+# Root attributes written by Document.initialize()
+mtlx_version = '1.35'
+# Write buffer size of the output stream
+buffer_size = 1 << 16
+# Characters escaped in attribute values, matching pugixml
+xml_escapes = str.maketrans({'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;'})
+
+# The ShaderRef BindInputs of a material: (name, type, node graph output)
+bind_inputs = (('surface', 'surfaceshader', 'ng_surface_out'),
+               ('volume', 'volumeshader', 'ng_volume_out'),
+               ('displacement', 'float', 'ng_disp_out'))
+
+# ---------------------------------------------------------------------------------------#
+# -------------------------------------------------------------------------- FUNCTIONS --#
+def format_value(value):
+    """Format a value the way MaterialX stores it as a string"""
+    if isinstance(value, str):
+        return value
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, float):
+        return '%g' % value
+    if hasattr(value, '__len__'):
+        return ', '.join(format_value(v) for v in value)
+    return str(value)
+
+
+def element(tag, attributes, depth, empty=True):
+    """Return one XML element line, self closed when empty"""
+    attrs = ''.join(' %s="%s"' % (name, str(value).translate(xml_escapes))
+                    for name, value in attributes)
+    return '%s<%s%s%s>\n' % ('  ' * depth, tag, attrs, ' /' if empty else '')
+
+
+def close(tag, depth):
+    """Return the closing tag of a non empty element"""
+    return '%s</%s>\n' % ('  ' * depth, tag)
+
+
+def get_output_nodes(snapshot):
+    """Map the node graph outputs to the nodes linked to the Material Output node"""
+    outputs = {}
+    for from_node, to_socket in snapshot['output_links']:
+        out_name = ((str(to_socket).split('.', 1)[0]).strip('()_.')).lower()
+        for name, _type, ng_output in bind_inputs:
+            if out_name == name:
+                outputs[ng_output] = from_node
+    return outputs
+
+
+def get_connections(snapshot):
+    """Map (to_node, to_socket) to from_node, mirroring connect_link()"""
+    node_names = {node['name'] for node in snapshot['nodes']}
+    connections = {}
+    for from_node, _from_socket, to_node, to_socket in snapshot['links']:
+        if from_node in node_names and to_node in node_names:
+            connections[(to_node, str(to_socket))] = from_node
+    return connections
+
+
+def iter_inputs(inputs, depth, interface=False, connections=None, node_name=None):
+    """Yield (name, type, value, mtlx_name) inputs, skipping non unique names"""
+    names = set()
+    for input in inputs:
+        in_type, in_value, in_mtlx_name = input[1], input[2], input[3]
+        if in_mtlx_name in names:
+            continue
+        names.add(in_mtlx_name)
+        attributes = [('name', in_mtlx_name), ('type', in_type)]
+        if interface:
+            attributes.append(('interfacename', in_mtlx_name))
+            from_node = connections.get((node_name, in_mtlx_name))
+            if from_node is not None:
+                attributes.append(('nodename', from_node))
+        elif in_value is not None:
+            attributes.append(('value', format_value(in_value)))
+        yield element('input', attributes, depth)
+
+
+def iter_parameters(parameters, depth):
+    """Yield (name, type, value) parameters"""
+    for parameter in parameters or ():
+        yield element('parameter', [('name', parameter[0]), ('type', parameter[1]),
+                                    ('value', format_value(parameter[2]))], depth)
+
+
+def iter_material(snapshot, depth):
+    """Yield the Material, its ShaderRef and BindInputs"""
+    material_name = snapshot['material']
+    location = snapshot['output_location']
+    yield element('material', [('name', material_name)], depth, empty=False)
+    yield element('shaderref', [('name', 'mtlx_output'), ('node', 'material_output'),
+                                ('xpos', location[0]), ('ypos', location[1])],
+                  depth + 1, empty=False)
+    for name, bind_type, ng_output in bind_inputs:
+        yield element('bindinput', [('name', name), ('type', bind_type),
+                                    ('nodegraph', "ng_%s" % material_name),
+                                    ('output', ng_output)], depth + 2)
+    yield close('shaderref', depth + 1)
+    yield close('material', depth)
+
+
+def iter_material_output_def(depth):
+    """Yield the material_output NodeDef"""
+    yield element('nodedef', [('name', 'material_output_def'), ('type', 'surfaceshader'),
+                              ('node', 'material_output')], depth, empty=False)
+    for name, bind_type, _ng_output in bind_inputs:
+        yield element('input', [('name', name), ('type', bind_type)], depth + 1)
+    yield close('nodedef', depth)
+
+
+def iter_node_graph(snapshot, depth):
+    """Yield the Node Graph, its outputs and nodes"""
+    output_nodes = get_output_nodes(snapshot)
+    connections = get_connections(snapshot)
+    yield element('nodegraph', [('name', "ng_%s" % snapshot['material']),
+                                ('nodedef', 'material_output_def')], depth, empty=False)
+    for _name, bind_type, ng_output in bind_inputs:
+        attributes = [('name', ng_output), ('type', bind_type)]
+        if ng_output in output_nodes:
+            attributes.append(('nodename', output_nodes[ng_output]))
+        yield element('output', attributes, depth + 1)
+    for node in snapshot['nodes']:
+        empty = not (node['inputs'] or node['params'])
+        yield element(node['node'], [('name', node['name']), ('type', node['type']),
+                                     ('xpos', node['location'][0]),
+                                     ('ypos', node['location'][1])], depth + 1, empty)
+        if empty:
+            continue
+        yield from iter_inputs(node['inputs'], depth + 2, interface=True,
+                               connections=connections, node_name=node['name'])
+        yield from iter_parameters(node['params'], depth + 2)
+        yield close(node['node'], depth + 1)
+    yield close('nodegraph', depth)
+
+
+def iter_node_def(node, depth, shader_defs):
+    """Yield the NodeDef of a snapshot node, mirroring create_node_def()"""
+    is_shader = node['idname'] in shader_defs
+    outputs = [] if is_shader else node['outputs']
+    if is_shader:
+        def_type = 'surfaceshader'
+    elif len(outputs) > 1:
+        def_type = 'multioutput'
+    else:
+        def_type = node['type']
+    empty = not (node['inputs'] or outputs or node['params'])
+    yield element('nodedef', [('name', node['idname']), ('type', def_type),
+                              ('node', node['node']), ('target', node['target'])],
+                  depth, empty)
+    if empty:
+        return
+    yield from iter_inputs(node['inputs'], depth + 1)
+    for output in outputs:
+        yield element('output', [('name', output[3]), ('type', output[1])], depth + 1)
+    yield from iter_parameters(node['params'], depth + 1)
+    yield close('nodedef', depth)
+
+
+def iter_document(snapshot, shader_defs=frozenset()):
+    """
+    Yield the .mtlx text of a snapshot, one element at a time
+
+    :param snapshot: snapshot created by MaterialXNetwork.snapshot_network()
+    :type snapshot: dict
+
+    :param shader_defs: nodedef names of the custom shader node classes
+    :type shader_defs: frozenset
+
+    :return: generator of str
+    """
+    yield '<?xml version="1.0"?>\n'
+    yield element('materialx', [('version', mtlx_version)], 0, empty=False)
+    yield from iter_material(snapshot, 1)
+    yield from iter_material_output_def(1)
+    yield from iter_node_graph(snapshot, 1)
+    defined = {'material_output_def'}
+    for node in snapshot['nodes']:
+        if node['idname'] in defined:
+            continue
+        defined.add(node['idname'])
+        yield from iter_node_def(node, 1, shader_defs)
+    yield close('materialx', 0)
+
+
+def open_stream(filepath, compress=None):
+    """Open a buffered text stream, gzip compressed for '.gz' paths"""
+    if compress is None:
+        compress = filepath.endswith('.gz')
+    if compress:
+        raw = gzip.open(filepath, 'wb')
+    else:
+        raw = io.open(filepath, 'wb', buffering=buffer_size)
+    return io.TextIOWrapper(raw, encoding='utf-8', newline='\n')
+
+
+def write_snapshot(snapshot, filepath, shader_defs=frozenset(), compress=None):
+    """
+    Stream the .mtlx text of a snapshot to filepath
+
+    :param compress: gzip the output, defaults to True for '.gz' paths
+    :type compress: bool
+
+    :return: filepath
+    :rtype: str
+    """
+    with open_stream(filepath, compress) as stream:
+        for chunk in iter_document(snapshot, shader_defs):
+            stream.write(chunk)
+    return filepath
+
+
+def to_string(snapshot, shader_defs=frozenset()):
+    """Return the .mtlx text of a snapshot"""
+    return ''.join(iter_document(snapshot, shader_defs))
@@ -0,0 +1,121 @@
+# ---------------------------------------------------------------------------------------#
+# ----------------------------------------------------------------------------- HEADER --#
+
+"""
+:author:
+    Jared Webber
+
+:synopsis:
+    Benchmark of the Node.mtlx_type getter
+
+:description:
+    Times reading Node.mtlx_type through the per bl_idname table of base_node.py against
+    the previous getter, which walked the node categories on every read.
+
+    Run it inside Blender, with the MaterialX add-on enabled in the user preferences:
+        blender --background --python test/bench_node_type.py -- [repeat]
+
+    A material with one node of every shader node type is created. Every node's type is
+    read repeat times with both getters, then the cost per node read is printed.
+
+:applications:
+    Blender 3D
+
+:see_also:
+    ../proteus/base_types/base_node.py -- set_materialx_node_type()
+
+:license:
+    see license.txt and EULA.txt
+
+"""
+
+# ---------------------------------------------------------------------------------------#
+# ---------------------------------------------------------------------------- IMPORTS --#
+# Standard Imports
+import sys
+import time
+# Standard Blender Imports
+import bpy
+from nodeitems_utils import node_categories_iter
+
+# ---------------------------------------------------------------------------------------#
+# -------------------------------------------------------------------------- FUNCTIONS --#
+def iter_node_bpy_types():
+    for cat in node_categories_iter(context=None):
+        if '_NEW_' in cat.identifier:
+            yield from cat.items(context=None)
+
+
+def legacy_node_type(node):
+    """
+    The Node.mtlx_type getter before the per bl_idname table. Its Image check only
+    matches 'Image', the table keeps that classification, so no type should differ.
+    """
+    for item in iter_node_bpy_types():
+        if ('Image' or 'Environment') in node.bl_idname:
+            mtlx_type = 'image'
+        elif 'Bsdf' in node.bl_idname:
+            mtlx_type = repr(('shader', node.bl_idname))
+        elif node.bl_idname == 'ShaderNodeAddShader' \
+                or node.bl_idname == 'ShaderNodeMixShader':
+            mtlx_type = repr(('shader', node.bl_idname))
+        else:
+            if len(node.outputs) > 0:
+                mtlx_type = node.outputs[0].mtlx_type
+            else:
+                mtlx_type = 'shader'
+        return mtlx_type
+    return 'shader'
+
+
+def table_node_type(node):
+    return node.mtlx_type
+
+
+def build_material():
+    """Create a material holding one node of every shader node type"""
+    material = bpy.data.materials.new("mtlx_bench_node_type")
+    material.use_nodes = True
+    nodes = material.node_tree.nodes
+    for item in iter_node_bpy_types():
+        bl_idname = getattr(item, 'nodetype', None)
+        if not bl_idname:
+            continue
+        try:
+            nodes.new(bl_idname)
+        except RuntimeError:
+            continue
+    return material
+
+
+def time_reads(nodes, getter, repeat):
+    """Seconds per node read of a getter"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for node in nodes:
+            getter(node)
+    return (time.perf_counter() - start) / (repeat * len(nodes))
+
+
+def main(repeat=100):
+    if not hasattr(bpy.types.Node, 'mtlx_type'):
+        print("Enable the MaterialX add-on before running this benchmark")
+        return
+    material = build_material()
+    nodes = list(material.node_tree.nodes)
+    mismatches = [node.bl_idname for node in nodes
+                  if legacy_node_type(node) != table_node_type(node)]
+    legacy = time_reads(nodes, legacy_node_type, repeat)
+    table = time_reads(nodes, table_node_type, repeat)
+    print("Node.mtlx_type over %d nodes, %d reads each" % (len(nodes), repeat))
+    print("    category walk: %.2f us per node" % (legacy * 1e6))
+    print("    type table:    %.2f us per node" % (table * 1e6))
+    print("    speedup:       %.1fx" % (legacy / table))
+    if mismatches:
+        print("    types differ for: %s" % ', '.join(sorted(set(mismatches))))
+    bpy.data.materials.remove(material)
+
+
+if __name__ == '__main__':
+    args = sys.argv[sys.argv.index('--') + 1:] if '--' in sys.argv else []
+    main(int(args[0]) if args else 100)
@@ -0,0 +1,113 @@
+# ---------------------------------------------------------------------------------------#
+# ----------------------------------------------------------------------------- HEADER --#
+
+"""
+:author:
+    Jared Webber
+
+:synopsis:
+    Tests of the entry and byte bounds of the parsed Document cache
+
+:description:
+    Entries are put into the cache directly, with placeholder Documents and indexes, so
+    the eviction order is tested without parsing MaterialX files.
+
+:applications:
+    Blender 3D
+
+:see_also:
+    ../proteus/network/document_cache.py
+
+:license:
+    see license.txt and EULA.txt
+
+"""
+
+# ---------------------------------------------------------------------------------------#
+# ---------------------------------------------------------------------------- IMPORTS --#
+# Standard Imports
+import os
+import shutil
+import tempfile
+import unittest
+from ..proteus.network import document_cache
+
+# ---------------------------------------------------------------------------------------#
+# ---------------------------------------------------------------------------- CLASSES --#
+class TestDocumentCache(unittest.TestCase):
+
+    def setUp(self):
+        self.stats = dict(document_cache.cache_stats)
+        self.cached = document_cache.document_cache.copy()
+        document_cache.document_cache.clear()
+        for counter in document_cache.cache_stats:
+            document_cache.cache_stats[counter] = 0
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+        document_cache.document_cache.clear()
+        document_cache.document_cache.update(self.cached)
+        document_cache.cache_stats.update(self.stats)
+
+    def add_entry(self, name, size):
+        """Cache a placeholder Document for a file of size bytes"""
+        filepath = os.path.join(self.directory, name)
+        with open(filepath, 'wb') as mtlx_file:
+            mtlx_file.write(b' ' * size)
+        document = object()
+        document_cache.document_cache[filepath] = (document_cache.get_file_key(filepath),
+                                                   document, None)
+        return filepath, document
+
+    def get_cached(self):
+        return [os.path.basename(path) for path in document_cache.document_cache]
+
+    def test_entry_bound(self):
+        for name in ('a.mtlx', 'b.mtlx', 'c.mtlx', 'd.mtlx'):
+            self.add_entry(name, 10)
+        document_cache.evict(2, 1 << 20)
+        self.assertEqual(self.get_cached(), ['c.mtlx', 'd.mtlx'])
+        self.assertEqual(document_cache.get_cache_info()['evictions'], 2)
+
+    def test_byte_bound(self):
+        self.add_entry('a.mtlx', 100)
+        self.add_entry('b.mtlx', 300)
+        self.add_entry('c.mtlx', 200)
+        document_cache.evict(8, 500)
+        self.assertEqual(self.get_cached(), ['b.mtlx', 'c.mtlx'])
+        self.assertEqual(document_cache.get_cache_bytes(), 500)
+        document_cache.evict(8, 499)
+        self.assertEqual(self.get_cached(), ['c.mtlx'])
+        self.assertEqual(document_cache.get_cache_info()['evictions'], 2)
+
+    def test_within_bounds(self):
+        self.add_entry('a.mtlx', 100)
+        self.add_entry('b.mtlx', 100)
+        document_cache.evict(2, 200)
+        self.assertEqual(self.get_cached(), ['a.mtlx', 'b.mtlx'])
+        self.assertEqual(document_cache.get_cache_info()['evictions'], 0)
+
+    def test_oversized_document(self):
+        # A Document larger than the byte bound is not kept
+        self.add_entry('a.mtlx', 100)
+        document_cache.evict(8, 50)
+        self.assertEqual(self.get_cached(), [])
+
+    def test_hit_is_most_recent(self):
+        path_a, document_a = self.add_entry('a.mtlx', 10)
+        self.add_entry('b.mtlx', 10)
+        self.add_entry('c.mtlx', 10)
+        self.assertIs(document_cache.get_document(path_a)[0], document_a)
+        document_cache.evict(2, 1 << 20)
+        self.assertEqual(self.get_cached(), ['c.mtlx', 'a.mtlx'])
+        info = document_cache.get_cache_info()
+        self.assertEqual((info['hits'], info['misses']), (1, 0))
+
+    def test_invalidate(self):
+        path_a = self.add_entry('a.mtlx', 10)[0]
+        self.add_entry('b.mtlx', 10)
+        document_cache.invalidate(path_a)
+        self.assertEqual(self.get_cached(), ['b.mtlx'])
+        document_cache.invalidate()
+        self.assertEqual(self.get_cached(), [])
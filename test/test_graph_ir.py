@@ -0,0 +1,153 @@
+# ---------------------------------------------------------------------------------------#
+# ----------------------------------------------------------------------------- HEADER --#
+
+"""
+:author:
+    Jared Webber
+
+:synopsis:
+    Tests of the GraphIR capture and its LinkIndex
+
+:description:
+    Node trees are built from plain Python stand-ins of the Blender nodes, sockets and
+    links, so the tests run without Blender.
+
+:applications:
+    Blender 3D
+
+:see_also:
+    ../proteus/network/graph_ir.py
+
+:license:
+    see license.txt and EULA.txt
+
+"""
+
+# ---------------------------------------------------------------------------------------#
+# ---------------------------------------------------------------------------- IMPORTS --#
+# Standard Imports
+import itertools
+import unittest
+from ..proteus.network import export_names
+from ..proteus.network import graph_ir
+
+# Fake RNA pointers
+pointers = itertools.count(1)
+
+# ---------------------------------------------------------------------------------------#
+# ---------------------------------------------------------------------------- CLASSES --#
+class FakeSocket(object):
+    """Stand-in of a bpy.types.NodeSocket"""
+    def __init__(self, name):
+        self.name = name
+        self.identifier = name
+        self.mtlx_name = name.lower()
+        self.pointer = next(pointers)
+
+    def as_pointer(self):
+        return self.pointer
+
+
+class FakeNode(object):
+    """Stand-in of a bpy.types.Node"""
+    def __init__(self, name, inputs=(), outputs=(), bl_idname='ShaderNodeMath'):
+        self.name = name
+        self.bl_idname = bl_idname
+        self.location = (0.0, 0.0)
+        self.inputs = [FakeSocket(socket) for socket in inputs]
+        self.outputs = [FakeSocket(socket) for socket in outputs]
+
+
+class FakeLink(object):
+    """Stand-in of a bpy.types.NodeLink"""
+    def __init__(self, from_socket, to_socket, is_valid=True):
+        self.from_socket = from_socket
+        self.to_socket = to_socket
+        self.is_valid = is_valid
+
+
+class FakeNodeTree(object):
+    """Stand-in of a bpy.types.NodeTree"""
+    def __init__(self, nodes, links):
+        self.nodes = nodes
+        self.links = links
+
+
+class TestLinkIndex(unittest.TestCase):
+
+    def setUp(self):
+        # value -> math -> output, value -> mix
+        self.value = FakeNode('Value', outputs=['Value'])
+        self.math = FakeNode('Math', inputs=['A', 'B'], outputs=['Value'])
+        self.mix = FakeNode('Mix RGB', inputs=['Fac'], outputs=['Color'])
+        self.output = FakeNode('Material Output', inputs=['Surface'],
+                               bl_idname='ShaderNodeOutputMaterial')
+        self.links = [FakeLink(self.value.outputs[0], self.math.inputs[0]),
+                      FakeLink(self.value.outputs[0], self.math.inputs[1]),
+                      FakeLink(self.value.outputs[0], self.mix.inputs[0]),
+                      FakeLink(self.math.outputs[0], self.output.inputs[0])]
+        self.nodes = [self.value, self.math, self.mix, self.output]
+
+    def tearDown(self):
+        export_names.clear()
+
+    def get_index(self):
+        return graph_ir.GraphIR(FakeNodeTree(self.nodes, self.links)).link_index
+
+    def test_incoming(self):
+        self.assertEqual(self.get_index().get_incoming('math'),
+                         [('value', 'value', 'math', 'a'),
+                          ('value', 'value', 'math', 'b')])
+
+    def test_outgoing(self):
+        self.assertEqual(self.get_index().get_outgoing('value'),
+                         [('value', 'value', 'math', 'a'),
+                          ('value', 'value', 'math', 'b'),
+                          ('value', 'value', 'mix_rgb', 'fac')])
+
+    def test_links(self):
+        self.assertEqual(self.get_index().get_links('math'),
+                         [('value', 'value', 'math', 'a'),
+                          ('value', 'value', 'math', 'b'),
+                          ('math', 'value', 'material_output', 'surface')])
+
+    def test_unknown_node(self):
+        index = self.get_index()
+        self.assertEqual(index.get_incoming('value'), [])
+        self.assertEqual(index.get_outgoing('material_output'), [])
+        self.assertEqual(index.get_links('missing'), [])
+
+    def test_matches_link_scan(self):
+        graph = graph_ir.GraphIR(FakeNodeTree(self.nodes, self.links))
+        links = [link.as_tuple() for link in graph.links]
+        for record in graph.nodes:
+            name = record.mtlx_name
+            self.assertEqual(graph.link_index.get_incoming(name),
+                             [link for link in links if link[2] == name])
+            self.assertEqual(graph.link_index.get_outgoing(name),
+                             [link for link in links if link[0] == name])
+
+    def test_invalid_links_skipped(self):
+        self.links[2].is_valid = False
+        self.assertEqual(self.get_index().get_incoming('mix_rgb'), [])
+
+    def test_links_outside_tree_skipped(self):
+        stray = FakeNode('Stray', outputs=['Value'])
+        self.links.append(FakeLink(stray.outputs[0], self.mix.inputs[0]))
+        self.assertEqual(self.get_index().get_incoming('mix_rgb'),
+                         [('value', 'value', 'mix_rgb', 'fac')])
+
+    def test_export_socket_names(self):
+        export_names.set_socket_name(self.math.inputs[0].as_pointer(), 'a.math_in_a')
+        self.assertEqual(self.get_index().get_incoming('math')[0],
+                         ('value', 'value', 'math', 'a.math_in_a'))
+
+    def test_socket_base_name(self):
+        stable_name = 'surface.material_output_in_surface'
+        self.assertEqual(graph_ir.get_socket_base_name(stable_name), 'surface')
+        self.assertEqual(graph_ir.get_socket_base_name('Displacement'), 'displacement')
+        self.assertEqual(graph_ir.get_socket_base_name(''), '')
+
+    def test_active_output(self):
+        graph = graph_ir.GraphIR(FakeNodeTree(self.nodes, self.links))
+        self.assertIs(graph.get_active_output().node, self.output)
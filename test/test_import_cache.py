@@ -0,0 +1,120 @@
+# ---------------------------------------------------------------------------------------#
+# ----------------------------------------------------------------------------- HEADER --#
+
+"""
+:author:
+    Jared Webber
+
+:synopsis:
+    Tests of the import plan cache and its eviction
+
+:description:
+    conf.import_cache_dir points the cache at a temporary directory, so the tests run
+    without Blender's user resource directories.
+
+:applications:
+    Blender 3D
+
+:see_also:
+    ../proteus/network/import_cache.py
+
+:license:
+    see license.txt and EULA.txt
+
+"""
+
+# ---------------------------------------------------------------------------------------#
+# ---------------------------------------------------------------------------- IMPORTS --#
+# Standard Imports
+import os
+import logging
+import shutil
+import tempfile
+import unittest
+from .. import conf
+from ..proteus.network import import_cache
+
+# ---------------------------------------------------------------------------------------#
+# ---------------------------------------------------------------------------- CLASSES --#
+class TestImportCache(unittest.TestCase):
+
+    def setUp(self):
+        self.cache_dir = conf.import_cache_dir
+        self.cache_size = conf.import_cache_size
+        self.directory = tempfile.mkdtemp()
+        conf.import_cache_dir = os.path.join(self.directory, 'plans')
+
+    def tearDown(self):
+        conf.import_cache_dir = self.cache_dir
+        conf.import_cache_size = self.cache_size
+        shutil.rmtree(self.directory)
+
+    def store(self, key, mtime, padding=0):
+        """Cache a plan of a key, last used at mtime"""
+        plan = {'version': import_cache.plan_version, 'key': key,
+                'padding': 'x' * padding}
+        import_cache.store_plan(key, plan)
+        os.utime(import_cache.get_plan_path(key), (mtime, mtime))
+        return plan
+
+    def get_cached(self):
+        return sorted(os.path.basename(path)[:-len(import_cache.plan_extension)]
+                      for path, _size, _mtime in import_cache.iter_cached_plans())
+
+    def test_round_trip(self):
+        plan = self.store('a', 1000)
+        self.assertEqual(import_cache.load_plan('a'), plan)
+        self.assertIsNone(import_cache.load_plan('b'))
+        self.assertIsNone(import_cache.load_plan(None))
+
+    def test_private_directory(self):
+        import_cache.store_plan('a', {'version': import_cache.plan_version})
+        mode = os.stat(conf.import_cache_dir).st_mode & 0o777
+        self.assertFalse(mode & 0o077)
+
+    @unittest.skipUnless(hasattr(os, 'getuid'), "POSIX permissions only")
+    def test_shared_directory_skipped(self):
+        os.makedirs(conf.import_cache_dir)
+        os.chmod(conf.import_cache_dir, 0o777)
+        logging.disable(logging.WARNING)
+        try:
+            self.assertIsNone(import_cache.get_cache_dir())
+            import_cache.store_plan('a', {'version': import_cache.plan_version})
+        finally:
+            logging.disable(logging.NOTSET)
+        self.assertEqual(os.listdir(conf.import_cache_dir), [])
+
+    def test_stale_plans_ignored(self):
+        import_cache.store_plan('old', {'version': import_cache.plan_version - 1})
+        self.assertIsNone(import_cache.load_plan('old'))
+        with open(import_cache.get_plan_path('bad'), 'w') as plan_file:
+            plan_file.write('{"version": ')
+        self.assertIsNone(import_cache.load_plan('bad'))
+
+    def test_evict_least_recently_used(self):
+        for idx, key in enumerate(('a', 'b', 'c', 'd')):
+            self.store(key, 1000 + idx, padding=100)
+        size = os.path.getsize(import_cache.get_plan_path('a'))
+        import_cache.evict(size * 2)
+        self.assertEqual(self.get_cached(), ['c', 'd'])
+        self.assertLessEqual(import_cache.get_cache_size(), size * 2)
+
+    def test_load_marks_recently_used(self):
+        for idx, key in enumerate(('a', 'b', 'c')):
+            self.store(key, 1000 + idx, padding=100)
+        import_cache.load_plan('a')
+        import_cache.evict(os.path.getsize(import_cache.get_plan_path('a')) * 2)
+        self.assertEqual(self.get_cached(), ['a', 'c'])
+
+    def test_store_evicts_over_size(self):
+        self.store('a', 1000, padding=100)
+        conf.import_cache_size = os.path.getsize(import_cache.get_plan_path('a'))
+        self.store('b', 2000, padding=100)
+        self.assertEqual(self.get_cached(), ['b'])
+
+    def test_clear_cache(self):
+        self.store('a', 1000)
+        self.store('b', 1001)
+        import_cache.clear_cache()
+        self.assertEqual(self.get_cached(), [])
+        self.assertEqual(import_cache.get_cache_size(), 0)
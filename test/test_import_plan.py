@@ -0,0 +1,129 @@
+# ---------------------------------------------------------------------------------------#
+# ----------------------------------------------------------------------------- HEADER --#
+
+"""
+:author:
+    Jared Webber
+
+:synopsis:
+    Tests of the upstream traversal of import plans
+
+:description:
+    traverse_upstream() walks a Node Graph through the get_upstream() lookups of its
+    index. The graphs below are plain dicts behind the same lookup.
+
+:applications:
+    Blender 3D
+
+:see_also:
+    ../proteus/network/import_plan.py -- traverse_upstream()
+
+:license:
+    see license.txt and EULA.txt
+
+"""
+
+# ---------------------------------------------------------------------------------------#
+# ---------------------------------------------------------------------------- IMPORTS --#
+# Standard Imports
+import logging
+import unittest
+from ..proteus.network import import_plan
+
+# ---------------------------------------------------------------------------------------#
+# ---------------------------------------------------------------------------- CLASSES --#
+class FakeGraphIndex(object):
+    """Stand-in of a NodeGraphIndex, node name -> [(input name, upstream node name)]"""
+    name = 'ng_material'
+
+    def __init__(self, upstream):
+        self.upstream = upstream
+        self.lookups = []
+
+    def get_upstream(self, name):
+        self.lookups.append(name)
+        return self.upstream.get(name, [])
+
+
+class TestTraverseUpstream(unittest.TestCase):
+
+    def setUp(self):
+        # Cycle warnings are expected, keep them out of the test output
+        logging.disable(logging.WARNING)
+
+    def tearDown(self):
+        logging.disable(logging.NOTSET)
+
+    def assert_upstream_first(self, order, edges):
+        position = {name: idx for idx, name in enumerate(order)}
+        for up_name, down_name, _input_name in edges:
+            self.assertLess(position[up_name], position[down_name])
+
+    def test_single_node(self):
+        self.assertEqual(import_plan.traverse_upstream(FakeGraphIndex({}), 'bsdf'),
+                         (['bsdf'], [], 0))
+
+    def test_chain(self):
+        index = FakeGraphIndex({'bsdf': [('base_color', 'image')],
+                                'image': [('vector', 'mapping')],
+                                'mapping': [('vector', 'coords')]})
+        order, edges, cycles = import_plan.traverse_upstream(index, 'bsdf')
+        self.assertEqual(order, ['coords', 'mapping', 'image', 'bsdf'])
+        self.assertEqual(edges, [('image', 'bsdf', 'base_color'),
+                                 ('mapping', 'image', 'vector'),
+                                 ('coords', 'mapping', 'vector')])
+        self.assertEqual(cycles, 0)
+
+    def test_shared_upstream_visited_once(self):
+        # A diamond, value feeds both inputs of mix
+        index = FakeGraphIndex({'bsdf': [('base_color', 'mix'), ('roughness', 'value')],
+                                'mix': [('color1', 'value'), ('color2', 'image')],
+                                'image': [('vector', 'value')]})
+        order, edges, cycles = import_plan.traverse_upstream(index, 'bsdf')
+        self.assertEqual(sorted(order), ['bsdf', 'image', 'mix', 'value'])
+        self.assertEqual(len(edges), 5)
+        self.assertEqual(len(set(edges)), 5)
+        self.assertEqual(cycles, 0)
+        self.assert_upstream_first(order, edges)
+        # Every node's inputs are looked up exactly once
+        self.assertEqual(sorted(index.lookups), sorted(order))
+
+    def test_cycle(self):
+        index = FakeGraphIndex({'bsdf': [('base_color', 'mix')],
+                                'mix': [('color1', 'math')],
+                                'math': [('value', 'mix')]})
+        order, edges, cycles = import_plan.traverse_upstream(index, 'bsdf')
+        self.assertEqual(order, ['math', 'mix', 'bsdf'])
+        self.assertEqual(edges, [('mix', 'bsdf', 'base_color'),
+                                 ('math', 'mix', 'color1')])
+        self.assertEqual(cycles, 1)
+
+    def test_self_loop(self):
+        index = FakeGraphIndex({'bsdf': [('base_color', 'math')],
+                                'math': [('value', 'math'), ('value_001', 'value')]})
+        order, edges, cycles = import_plan.traverse_upstream(index, 'bsdf')
+        self.assertEqual(order, ['value', 'math', 'bsdf'])
+        self.assertEqual(edges, [('math', 'bsdf', 'base_color'),
+                                 ('value', 'math', 'value_001')])
+        self.assertEqual(cycles, 1)
+
+    def test_cycle_through_root(self):
+        index = FakeGraphIndex({'bsdf': [('normal', 'bump')],
+                                'bump': [('height', 'bsdf')]})
+        order, edges, cycles = import_plan.traverse_upstream(index, 'bsdf')
+        self.assertEqual(order, ['bump', 'bsdf'])
+        self.assertEqual(edges, [('bump', 'bsdf', 'normal')])
+        self.assertEqual(cycles, 1)
+
+    def test_deep_chain(self):
+        # Deeper than the recursion limit, the walk is iterative
+        depth = 5000
+        upstream = {'node_%d' % idx: [('in', 'node_%d' % (idx + 1))]
+                    for idx in range(depth)}
+        order, edges, cycles = import_plan.traverse_upstream(FakeGraphIndex(upstream),
+                                                             'node_0')
+        self.assertEqual(len(order), depth + 1)
+        self.assertEqual(order[0], 'node_%d' % depth)
+        self.assertEqual(order[-1], 'node_0')
+        self.assertEqual(len(edges), depth)
+        self.assertEqual(cycles, 0)
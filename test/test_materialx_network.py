@@ -0,0 +1,67 @@
+# ---------------------------------------------------------------------------------------#
+# ----------------------------------------------------------------------------- HEADER --#
+
+"""
+:author:
+    Jared Webber
+
+:synopsis:
+    Tests of the MaterialXNetwork export of a Blender Material
+
+:description:
+    These tests build real Blender Materials, so they need Blender and MaterialX. Run
+    them from Blender's Python with the add-on enabled; elsewhere they are skipped.
+
+:applications:
+    Blender 3D
+
+:see_also:
+    ../proteus/network/materialx_network.py
+
+:license:
+    see license.txt and EULA.txt
+
+"""
+
+# ---------------------------------------------------------------------------------------#
+# ---------------------------------------------------------------------------- IMPORTS --#
+# Standard Imports
+import unittest
+# Check for Blender and MaterialX
+try:
+    import bpy
+    import MaterialX as mx
+except ImportError:
+    bpy = mx = None
+
+# ---------------------------------------------------------------------------------------#
+# ---------------------------------------------------------------------------- CLASSES --#
+@unittest.skipIf(bpy is None or mx is None, "Blender and MaterialX are required")
+class TestInitNetwork(unittest.TestCase):
+
+    def setUp(self):
+        from ..proteus.network.materialx_network import MaterialXNetwork
+        bpy.context.scene.render.engine = 'CYCLES'
+        # A new node material holds a Diffuse BSDF linked to a Material Output
+        self.material = bpy.data.materials.new("mtlx_test_init_network")
+        self.material.use_nodes = True
+        self.network = MaterialXNetwork()
+        self.network.material = self.material
+
+    def tearDown(self):
+        bpy.data.materials.remove(self.material)
+
+    def get_output_nodes(self):
+        return {output.getName(): output.getNodeName()
+                for output in self.network.node_graph.getOutputs()}
+
+    def test_output_links_connected(self):
+        self.network.init_network()
+        self.assertEqual(self.get_output_nodes(),
+                         {'ng_surface_out': 'diffuse_bsdf',
+                          'ng_volume_out': '',
+                          'ng_disp_out': ''})
+
+    def test_full_export_connected(self):
+        self.network.build_network()
+        self.assertEqual(self.get_output_nodes()['ng_surface_out'], 'diffuse_bsdf')
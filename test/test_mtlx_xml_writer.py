@@ -0,0 +1,140 @@
+# ---------------------------------------------------------------------------------------#
+# ----------------------------------------------------------------------------- HEADER --#
+
+"""
+:author:
+    Jared Webber
+
+:synopsis:
+    Checks the streaming XML writer against the MaterialX Document writer
+
+:description:
+    Every document of std_docs is read back into a node tree snapshot. The NodeDefs
+    streamed by mtlx_xml_writer must match the NodeDefs of the document, which were
+    written by MaterialX, byte for byte. When the MaterialX library is installed, the
+    whole streamed text must also match mx.writeToXmlString() of the Document that
+    mtlx_export_worker builds from the same snapshot.
+
+    Run it from the directory holding the add-on package:
+        python -m pytest -q test
+
+:applications:
+    Blender 3D
+
+:see_also:
+    ../proteus/workers/mtlx_xml_writer.py
+    ../proteus/workers/mtlx_export_worker.py -- validate_snapshot()
+
+:license:
+    see license.txt and EULA.txt
+
+"""
+
+# ---------------------------------------------------------------------------------------#
+# ---------------------------------------------------------------------------- IMPORTS --#
+# Standard Imports
+import os
+import glob
+import unittest
+import xml.etree.ElementTree as ElementTree
+from ..proteus.workers import mtlx_export_worker
+from ..proteus.workers import mtlx_xml_writer
+
+# Documents written by MaterialX
+std_docs = sorted(glob.glob(os.path.join(os.path.dirname(__file__), 'std_docs',
+                                         '*.mtlx')))
+# Material Output socket of each node graph output
+output_sockets = {'ng_surface_out': 'surface',
+                  'ng_volume_out': 'volume',
+                  'ng_disp_out': 'displacement'}
+
+# ---------------------------------------------------------------------------------------#
+# -------------------------------------------------------------------------- FUNCTIONS --#
+def read_snapshot(filepath):
+    """
+    Rebuild the node tree snapshot of a std_docs document
+
+    :return: (snapshot, nodedef names of the shader nodes)
+    :rtype: tuple
+    """
+    root = ElementTree.parse(filepath).getroot()
+    shader_ref = root.find('material/shaderref')
+    node_graph = root.find('nodegraph')
+    node_defs = {node_def.get('node'): node_def for node_def in root.findall('nodedef')}
+    snapshot = {'material': root.find('material').get('name'),
+                'output_location': (shader_ref.get('xpos'), shader_ref.get('ypos')),
+                'output_links': [], 'links': [], 'nodes': []}
+    shader_defs = set()
+    for elem in node_graph:
+        if elem.tag == 'output':
+            if elem.get('nodename'):
+                snapshot['output_links'].append((elem.get('nodename'),
+                                                 output_sockets[elem.get('name')]))
+            continue
+        node_def = node_defs[elem.tag]
+        if node_def.get('type') == 'surfaceshader':
+            shader_defs.add(node_def.get('name'))
+        for input in elem.findall('input'):
+            if input.get('nodename'):
+                snapshot['links'].append((input.get('nodename'), None, elem.get('name'),
+                                          input.get('name')))
+        snapshot['nodes'].append({
+            'name': elem.get('name'),
+            'idname': node_def.get('name'),
+            'node': elem.tag,
+            'type': elem.get('type'),
+            'target': node_def.get('target'),
+            'location': (elem.get('xpos'), elem.get('ypos')),
+            'inputs': [(input.get('name'), input.get('type'), input.get('value'),
+                        input.get('name')) for input in node_def.findall('input')],
+            'outputs': [(output.get('name'), output.get('type'), None, output.get('name'))
+                        for output in node_def.findall('output')],
+            'params': [(param.get('name'), param.get('type'), param.get('value'))
+                       for param in elem.findall('parameter')]})
+    return snapshot, frozenset(shader_defs)
+
+
+def get_node_def_blocks(text):
+    """Map the names of the NodeDefs of .mtlx text to their lines"""
+    blocks = {}
+    lines = None
+    for line in text.splitlines():
+        if line.startswith('  <nodedef '):
+            lines = blocks[line.split('name="', 1)[1].split('"', 1)[0]] = [line]
+        elif lines is not None:
+            lines.append(line)
+        if line == '  </nodedef>' or (line.startswith('  <nodedef ')
+                                      and line.endswith('/>')):
+            lines = None
+    return blocks
+
+# ---------------------------------------------------------------------------------------#
+# ---------------------------------------------------------------------------- CLASSES --#
+class TestMtlxXmlWriter(unittest.TestCase):
+
+    def test_std_docs_found(self):
+        self.assertTrue(std_docs)
+
+    def test_node_defs_match_std_docs(self):
+        for filepath in std_docs:
+            with open(filepath) as mtlx_file:
+                expected = get_node_def_blocks(mtlx_file.read())
+            snapshot, shader_defs = read_snapshot(filepath)
+            streamed = get_node_def_blocks(mtlx_xml_writer.to_string(snapshot,
+                                                                     shader_defs))
+            for node in snapshot['nodes']:
+                with self.subTest(document=os.path.basename(filepath),
+                                  node_def=node['idname']):
+                    self.assertEqual(streamed[node['idname']], expected[node['idname']])
+
+    @unittest.skipIf(mtlx_export_worker.mx is None, "MaterialX is not installed")
+    def test_std_docs_match_document_writer(self):
+        for filepath in std_docs:
+            snapshot, shader_defs = read_snapshot(filepath)
+            mtlx_export_worker.init_worker(shader_defs)
+            with self.subTest(document=os.path.basename(filepath)):
+                self.assertEqual(
+                    mtlx_xml_writer.to_string(snapshot, shader_defs),
+                    mtlx_export_worker.mx.writeToXmlString(
+                        mtlx_export_worker.build_document(snapshot)))
+                self.assertTrue(mtlx_export_worker.validate_snapshot(snapshot))
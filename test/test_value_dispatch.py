@@ -0,0 +1,173 @@
+# ---------------------------------------------------------------------------------------#
+# ----------------------------------------------------------------------------- HEADER --#
+
+"""
+:author:
+    Jared Webber
+
+:synopsis:
+    Tests of the import value parsers and setters
+
+:description:
+    MaterialX Inputs, Blender sockets and Blender nodes are replaced by plain Python
+    stand-ins, so the dispatch tables are tested without MaterialX or Blender.
+
+:applications:
+    Blender 3D
+
+:see_also:
+    ../proteus/network/value_dispatch.py
+
+:license:
+    see license.txt and EULA.txt
+
+"""
+
+# ---------------------------------------------------------------------------------------#
+# ---------------------------------------------------------------------------- IMPORTS --#
+# Standard Imports
+import logging
+import unittest
+from ..proteus.network import value_dispatch
+
+# ---------------------------------------------------------------------------------------#
+# ---------------------------------------------------------------------------- CLASSES --#
+class FakeElement(object):
+    """Stand-in of a MaterialX Input or Parameter"""
+    def __init__(self, name, mtlx_type, value):
+        self.name = name
+        self.mtlx_type = mtlx_type
+        self.value = value
+
+    def getName(self):
+        return self.name
+
+    def getType(self):
+        return self.mtlx_type
+
+    def getValueString(self):
+        return self.value
+
+
+class FakeSocket(object):
+    """Stand-in of a bpy.types.NodeSocket"""
+    def __init__(self, socket_type, default_value):
+        self.type = socket_type
+        self.default_value = default_value
+
+
+class FakeProperty(object):
+    """Stand-in of a bpy.types.Property"""
+    def __init__(self, prop_type):
+        self.type = prop_type
+
+
+class FakeRNA(object):
+    def __init__(self, properties):
+        self.properties = properties
+
+
+class FakeNode(object):
+    """Stand-in of a bpy.types.Node"""
+    def __init__(self, inputs=None, properties=None):
+        self.name = 'Node'
+        self.inputs = inputs or {}
+        self.bl_rna = FakeRNA(properties or {})
+
+
+class TestParsers(unittest.TestCase):
+
+    def test_type_family(self):
+        self.assertEqual(value_dispatch.get_type_family('color3'), 'color')
+        self.assertEqual(value_dispatch.get_type_family('color4'), 'color')
+        self.assertEqual(value_dispatch.get_type_family('vector2'), 'vector')
+        self.assertEqual(value_dispatch.get_type_family('vector3'), 'vector')
+        self.assertEqual(value_dispatch.get_type_family('float'), 'float')
+        self.assertEqual(value_dispatch.get_type_family('filename'), 'filename')
+
+    def test_parse_values(self):
+        elements = [FakeElement('roughness', 'float', '0.5'),
+                    FakeElement('base_color', 'color3', '0.8, 0.8, 0.8'),
+                    FakeElement('normal', 'vector3', '0.0,1.0,0.0'),
+                    FakeElement('distribution', 'string', 'GGX'),
+                    FakeElement('image', 'filename', 'textures/wood.png')]
+        misses = []
+        self.assertEqual(value_dispatch.parse_values(elements, misses),
+                         [('roughness', 'float', 0.5),
+                          ('base_color', 'color3', (0.8, 0.8, 0.8)),
+                          ('normal', 'vector3', (0.0, 1.0, 0.0)),
+                          ('distribution', 'string', 'GGX'),
+                          ('image', 'filename', 'textures/wood.png')])
+        self.assertEqual(misses, [])
+
+    def test_unknown_type_skipped(self):
+        misses = []
+        elements = [FakeElement('surface', 'surfaceshader', ''),
+                    FakeElement('use_clamp', 'boolean', 'False')]
+        self.assertEqual(value_dispatch.parse_values(elements, misses), [])
+        self.assertEqual(misses, [])
+
+    def test_bad_value_missed(self):
+        misses = []
+        elements = [FakeElement('roughness', 'float', ''),
+                    FakeElement('base_color', 'color3', '0.8, red, 0.8'),
+                    FakeElement('metallic', 'float', '1.0')]
+        self.assertEqual(value_dispatch.parse_values(elements, misses),
+                         [('metallic', 'float', 1.0)])
+        self.assertEqual(misses, [('roughness', "cannot parse float value"),
+                                  ('base_color', "cannot parse color3 value")])
+
+
+class TestSetters(unittest.TestCase):
+
+    def setUp(self):
+        # Null image warnings are expected, keep them out of the test output
+        logging.disable(logging.WARNING)
+
+    def tearDown(self):
+        logging.disable(logging.NOTSET)
+
+    def test_socket_values(self):
+        node = FakeNode(inputs={'Roughness': FakeSocket('VALUE', 0.0),
+                                'Base Color': FakeSocket('RGBA', [0.0, 0.0, 0.0, 1.0]),
+                                'Normal': FakeSocket('VECTOR', [0.0, 0.0, 0.0])})
+        misses = []
+        values = [('Roughness', 'float', 0.5),
+                  ('Base Color', 'color3', (0.8, 0.7, 0.6)),
+                  ('Normal', 'vector2', (1.0, 1.0))]
+        value_dispatch.apply_socket_values(node, values, misses)
+        self.assertEqual(node.inputs['Roughness'].default_value, 0.5)
+        self.assertEqual(node.inputs['Base Color'].default_value, [0.8, 0.7, 0.6, 1.0])
+        self.assertEqual(node.inputs['Normal'].default_value, [1.0, 1.0, 0.0])
+        self.assertEqual(misses, [])
+
+    def test_socket_misses(self):
+        node = FakeNode(inputs={'Shader': FakeSocket('SHADER', None)})
+        misses = []
+        value_dispatch.apply_socket_values(node, [('Shader', 'float', 1.0),
+                                                  ('Missing', 'float', 1.0)], misses)
+        self.assertEqual(misses,
+                         [('Node', 'Shader', "no setter for float on a SHADER socket"),
+                          ('Node', 'Missing', "input not found")])
+
+    def test_param_values(self):
+        node = FakeNode(properties={'distribution': FakeProperty('ENUM'),
+                                    'image': FakeProperty('POINTER')})
+        image = object()
+        misses = []
+        value_dispatch.apply_param_values(node, [('distribution', 'string', 'GGX'),
+                                                 ('image', 'filename', 'wood.png'),
+                                                 ('missing', 'string', 'x')],
+                                          misses, images={'wood.png': image})
+        self.assertEqual(node.distribution, 'GGX')
+        self.assertIs(node.image, image)
+        self.assertEqual(misses, [('Node', 'missing', "parameter not found")])
+
+    def test_image_misses(self):
+        node = FakeNode(properties={'image': FakeProperty('POINTER')})
+        misses = []
+        value_dispatch.apply_param_values(node, [('image', 'filename', 'wood.png')],
+                                          misses)
+        value_dispatch.apply_param_values(node, [('image', 'filename', '')], misses)
+        self.assertFalse(hasattr(node, 'image'))
+        self.assertEqual(misses, [('Node', 'image', "texture not loaded: wood.png")])
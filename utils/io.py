@@ -1,4 +1,19 @@
+import sys
 import random
+import logging
+
+# Name of the add-on's root logger, subsystems log to 'materialx.<subsystem>'
+logger_name = 'materialx'
+loggers = {} # subsystem -> logging.Logger
+configured_subsystems = set() # subsystems given a level by configure_logging()
+log_levels = {'DEBUG': logging.DEBUG, 'INFO': logging.INFO,
+              'WARNING': logging.WARNING, 'ERROR': logging.ERROR}
+
+# Console output of each level, as printed by IO before it was backed by logging
+level_templates = {logging.DEBUG: "  DEBUG: %s",
+                   logging.INFO: "\n  %s\n",
+                   logging.WARNING: "\n  WARNING: %s\n",
+                   logging.ERROR: "\n  ERROR: %s\n"}
 
 def getRandomString(length):
     random.seed()
@@ -30,92 +45,187 @@ def print_dict(rand_dict, indent=0):
     :param indent: How much to indent when printing the dictionary.
     :type: int
     """
+    for line in iter_dict_lines(rand_dict, indent):
+        print (line)
+
+def iter_dict_lines(rand_dict, indent=0):
+    """Yields the lines print_dict() prints"""
     for key, value in rand_dict.items():
-        print ('  ' * indent + str(key))
+        yield '  ' * indent + str(key)
         if isinstance(value, dict):
-            print_dict(value, indent+2)
+            yield from iter_dict_lines(value, indent+2)
         else:
-            print ('  ' * (indent+2) + str(value))
+            yield '  ' * (indent+2) + str(value)
+
+def get_logger(subsystem=None):
+    """
+    Returns the logger of a subsystem, i.e. 'read' or 'write', or the add-on's root
+    logger. The loggers are configured from conf on first use.
+    """
+    try:
+        return loggers[subsystem]
+    except KeyError:
+        pass
+    if not loggers:
+        configure_logging()
+    name = logger_name if subsystem is None else "%s.%s" % (logger_name, subsystem)
+    logger = loggers[subsystem] = logging.getLogger(name)
+    return logger
+
+def configure_logging():
+    """
+    (Re)apply conf.log_level, conf.log_levels and conf.log_file to the add-on's loggers.
+    Records are written to the console like IO always printed them, and to the log file
+    with a timestamp and the subsystem.
+    """
+    from .. import conf
+    root = logging.getLogger(logger_name)
+    root.propagate = False
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+        handler.close()
+    console = logging.StreamHandler(sys.stdout)
+    console.setFormatter(ConsoleFormatter())
+    root.addHandler(console)
+    log_file = getattr(conf, 'log_file', '')
+    if log_file:
+        file_handler = logging.FileHandler(log_file, encoding='utf-8')
+        file_handler.setFormatter(logging.Formatter(
+            "%(asctime)s %(name)s %(levelname)s: %(message)s"))
+        root.addHandler(file_handler)
+    root.setLevel(getattr(conf, 'log_level', 'INFO'))
+    # Subsystems without a level of their own follow the root logger
+    for subsystem in configured_subsystems:
+        logging.getLogger("%s.%s" % (logger_name, subsystem)).setLevel(logging.NOTSET)
+    configured_subsystems.clear()
+    for subsystem, level in getattr(conf, 'log_levels', {}).items():
+        logging.getLogger("%s.%s" % (logger_name, subsystem)).setLevel(level)
+        configured_subsystems.add(subsystem)
+    loggers[None] = root
+
+def close_log_file():
+    """Remove and close the log file handler of the add-on's root logger"""
+    root = logging.getLogger(logger_name)
+    for handler in list(root.handlers):
+        if isinstance(handler, logging.FileHandler):
+            root.removeHandler(handler)
+            handler.close()
 
 #----------------------------------------------------------------------------------------#
 #----------------------------------------------------------------------------- CLASSES --#
 
+class ConsoleFormatter(logging.Formatter):
+    """Formats records with the template of their level, see level_templates"""
+    def format(self, record):
+        template = getattr(record, 'template', None) or \
+                   level_templates.get(record.levelno, "%s")
+        return template % record.getMessage()
+
+
 class IO(object):
     """
     This class handles the outputting of printed information.
+
+    Messages go through the logging module. Arguments passed after the message are
+    only %-formatted into it if the level is enabled for the subsystem, so a disabled
+    debug call costs one level check. Guard loops that compute their arguments with
+    is_enabled().
     """
     @classmethod
-    def warning(cls, message):
+    def configure(cls):
+        """Apply the logging settings of conf"""
+        configure_logging()
+
+    @classmethod
+    def close(cls):
+        """Close the log file, console output continues"""
+        close_log_file()
+
+    @classmethod
+    def is_enabled(cls, level='DEBUG', subsystem=None):
+        """
+        Returns True if messages of a level are output for a subsystem.
+
+        :param level: 'DEBUG', 'INFO', 'WARNING' or 'ERROR'
+        :type: str
+        """
+        return get_logger(subsystem).isEnabledFor(log_levels[level])
+
+    @classmethod
+    def warning(cls, message, *args, subsystem=None):
         """
         Prints a message with the warning label attached.
 
-        :param message: The message to output.
+        :param message: The message to output, %-formatted with args.
         :type: str
         """
-        print ("\n  WARNING: %s\n" % message)
+        get_logger(subsystem).warning(message, *args)
 
     @classmethod
-    def info(cls, message):
+    def info(cls, message, *args, subsystem=None):
         """
         Prints a message.
 
-        :param message: The message to output.
+        :param message: The message to output, %-formatted with args.
         :type: str
         """
-        print ("\n  %s\n" % message)
+        get_logger(subsystem).info(message, *args)
 
     @classmethod
-    def debug(cls, message):
+    def debug(cls, message, *args, subsystem=None):
         """
         Prints a message with the debug label attached.
 
-        :param message: The message to output.
+        :param message: The message to output, %-formatted with args.
         :type: str
         """
-        print ("  DEBUG: %s" % message)
+        get_logger(subsystem).debug(message, *args)
 
     @classmethod
-    def error(cls, message):
+    def error(cls, message, *args, subsystem=None):
         """
         Prints a message with the error label attached.
 
-        :param message: The message to output.
+        :param message: The message to output, %-formatted with args.
         :type: str
         """
-        print ("\n  ERROR: %s\n" % message)
+        get_logger(subsystem).error(message, *args)
 
     @classmethod
-    def block(cls, message):
+    def block(cls, message, *args, subsystem=None):
         """
         Prints one line of a block of text.
 
-        :param message: The message to output.
+        :param message: The message to output, %-formatted with args.
         :type: str
         """
-        print ("  %s" % message)
+        get_logger(subsystem).info(message, *args, extra={'template': "  %s"})
 
     @classmethod
-    def list(cls, input_list):
+    def list(cls, input_list, subsystem=None):
         """
         Prints a list in a readable manner.
 
         :param input_list: The dictionary to print.
         :type: list
         """
-        print ("\n  LIST CONTENTS:")
-        for item in input_list:
-            print ("    %s" % item)
+        logger = get_logger(subsystem)
+        if logger.isEnabledFor(logging.INFO):
+            lines = ["\n  LIST CONTENTS:"] + ["    %s" % item for item in input_list]
+            logger.info('\n'.join(lines), extra={'template': "%s"})
 
     @classmethod
-    def dict(cls, input_dict):
+    def dict(cls, input_dict, subsystem=None):
         """
         Prints a dictionary in a readable manner.
 
         :param input_dict: The dictionary to print.
         :type: dict
         """
-        print ("\n  DICTIONARY CONTENTS:")
-        print_dict(input_dict)
+        logger = get_logger(subsystem)
+        if logger.isEnabledFor(logging.INFO):
+            lines = ["\n  DICTIONARY CONTENTS:"] + list(iter_dict_lines(input_dict))
+            logger.info('\n'.join(lines), extra={'template': "%s"})
 
 class Autovivification(dict):
     """Python implementation of Perl's Autovivification data structure"""